@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: acquire.py
+
+Background sensor acquisition for the Chicken-Pi
+
+Each sensor is polled on its own schedule by a worker thread, so that a slow
+or hung sensor never holds up the Tk main loop (and with it the GUI and the
+relay switching).  Every fresh reading is published, with its timestamp, to
+a :obj:`SensorSnapshot`; the GUI and the control logic only ever read the
+latest values from the snapshot.
+
+Sensors sharing an I2C bus (those with ``bus`` and ``buses`` attributes, see
+:class:`chicken.device.I2CBusManager`) are polled by a single thread for the
+bus, and the readings falling due in the same tick are taken back to back in
+one bus transaction.  The buses themselves are polled in parallel.
+
+The polling interval (seconds) for each sensor may be set in the
+``acquisition`` section of ``config.yaml``, keyed by sensor name::
+
+    acquisition:
+      inside: 10
+      cpu: 15
+
+"""
+
+# Built-In Libraries
+import collections
+import functools
+import threading
+import time
+
+# 3rd Party Libraries
+
+# Internal Imports
+from chicken import utils
+
+# Module Constants
+DEFAULT_INTERVAL_SECONDS = 10.0
+STALE_INTERVALS = 3
+# Readings due within this time of each other are batched on a bus
+BATCH_WINDOW_SECONDS = 0.5
+# The sensor property read for each quantity
+QUANTITY_PROPERTIES = {"temp": "temp", "humid": "humid", "lux": "level"}
+
+__all__ = ["SensorReading", "SensorSnapshot", "AcquisitionService"]
+
+SensorReading = collections.namedtuple("SensorReading", ["values", "timestamp"])
+SensorReading.__doc__ = """The latest reading from a sensor
+
+Parameters
+----------
+values : dict
+    Dictionary of quantity (e.g., ``"temp"``) / value pairs
+timestamp : float
+    The time of the reading (seconds since the epoch)
+"""
+
+
+class SensorSnapshot:
+    """The latest reading from each sensor
+
+    Each sensor's worker thread is the only writer of that sensor's entry,
+    and replaces it with a new (immutable) :obj:`SensorReading` in a single
+    assignment, which is atomic in Python.  Readers therefore never need a
+    lock, and always see a complete reading.
+
+    Parameters
+    ----------
+    names : list of str
+        The names of the sensors
+    """
+
+    def __init__(self, names):
+        self._latest = {name: None for name in names}
+
+    def publish(self, name, values, timestamp=None):
+        """Publish a new reading from a sensor
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+        values : dict
+            Dictionary of quantity / value pairs
+        timestamp : float, optional
+            The time of the reading (Default: None, now)
+        """
+        self._latest[name] = SensorReading(
+            dict(values), time.time() if timestamp is None else timestamp
+        )
+
+    def get(self, name):
+        """Return the latest reading from a sensor
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+
+        Returns
+        -------
+        :obj:`SensorReading` or None
+            The latest reading, or None if there has not been one
+        """
+        return self._latest.get(name)
+
+    def value(self, name, quantity, default=None):
+        """Return the latest value of one quantity from a sensor
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+        quantity : str
+            The quantity (e.g., ``"temp"``)
+        default : object, optional
+            The value to return if there is no reading (Default: None)
+
+        Returns
+        -------
+        float or object
+            The latest value
+        """
+        reading = self._latest.get(name)
+        if reading is None:
+            return default
+        return reading.values.get(quantity, default)
+
+    def age(self, name):
+        """Return the age of the latest reading from a sensor
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+
+        Returns
+        -------
+        float
+            The age (seconds), or infinity if there has not been a reading
+        """
+        reading = self._latest.get(name)
+        return float("inf") if reading is None else time.time() - reading.timestamp
+
+
+class AcquisitionService:
+    """Poll each sensor on its own schedule in a background thread
+
+    Parameters
+    ----------
+    sensors : dict
+        Dictionary containing the sensor objects
+    logger : :obj:`logging.Logger`
+        The logging object into which to place logs
+    config : dict, optional
+        The ``acquisition`` section of the configuration file: sensor name /
+        polling interval (seconds) pairs (Default: None)
+    """
+
+    def __init__(self, sensors, logger, config=None):
+        self.sensors = sensors
+        self.logger = logger
+        config = config or {}
+        self.intervals = {
+            name: float(config.get(name, DEFAULT_INTERVAL_SECONDS)) for name in sensors
+        }
+        self.snapshot = SensorSnapshot(sensors)
+        # Read timing for each sensor: count, errors, last and max (seconds)
+        self.stats = {
+            name: {"reads": 0, "errors": 0, "last": 0.0, "max": 0.0} for name in sensors
+        }
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start a polling thread for each I2C bus, and each other sensor"""
+        self._stop.clear()
+        for names in self.groups():
+            thread = threading.Thread(
+                target=self._poll_loop,
+                args=(names,),
+                name=f"acquire-{'-'.join(names)}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=2.0):
+        """Ask the polling threads to stop, and wait for them briefly
+
+        A thread stuck in a hung sensor read is a daemon, so it does not hold
+        up the program exit.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The longest to wait for each thread (seconds) (Default: 2)
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def groups(self):
+        """Group the sensors by the I2C bus they share
+
+        Returns
+        -------
+        list of list of str
+            The names of the sensors polled by each thread; sensors not on a
+            managed I2C bus are each in a group of their own
+        """
+        groups = {}
+        for name in self.sensors:
+            bus = self.bus_of(name)
+            key = name if bus is None else (id(bus[0]), bus[1])
+            groups.setdefault(key, []).append(name)
+        return list(groups.values())
+
+    def bus_of(self, name):
+        """Return the I2C bus manager and bus number of a sensor
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+
+        Returns
+        -------
+        tuple or None
+            The (:obj:`chicken.device.I2CBusManager`, bus number) pair, or
+            None if the sensor is not on a managed bus
+        """
+        sensor = self.sensors[name]
+        buses, bus = getattr(sensor, "buses", None), getattr(sensor, "bus", None)
+        return None if buses is None or bus is None else (buses, bus)
+
+    def is_stale(self, name):
+        """Whether a sensor's latest reading is too old to be trusted
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+
+        Returns
+        -------
+        bool
+            True if there has been no reading for ``STALE_INTERVALS`` polling
+            intervals
+        """
+        return self.snapshot.age(name) > STALE_INTERVALS * self.intervals[name]
+
+    def poll(self, name):
+        """Read a sensor once and publish the reading
+
+        Parameters
+        ----------
+        name : str
+            The name of the sensor
+        """
+        sensor = self.sensors[name]
+        t_0 = time.perf_counter()
+        timestamp = None
+        try:
+            if hasattr(sensor, "read_temp_humid"):
+                # One conversion (and bus transaction) for both quantities
+                temp, humid, timestamp = sensor.read_temp_humid()
+                values = {"temp": temp, "humid": humid}
+            elif hasattr(sensor, "read_lux"):
+                # A failed read returns the cached value, with its own time
+                lux, timestamp = sensor.read_lux()
+                values = {"lux": lux}
+            else:
+                values = {
+                    quantity: getattr(sensor, QUANTITY_PROPERTIES[quantity])
+                    for quantity in utils.sensor_columns(name, sensor)
+                }
+        except Exception as err:  # pylint: disable=broad-except
+            self.stats[name]["errors"] += 1
+            self.logger.warning("Error reading the %s sensor: %s", name, err)
+            return
+        elapsed = time.perf_counter() - t_0
+        self.snapshot.publish(name, values, timestamp)
+
+        stats = self.stats[name]
+        stats["reads"] += 1
+        stats["last"] = elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+    def poll_batch(self, names):
+        """Poll several sensors, in one transaction if they share a bus
+
+        Parameters
+        ----------
+        names : list of str
+            The names of the sensors
+        """
+        bus = self.bus_of(names[0])
+        if bus is None:
+            for name in names:
+                self.poll(name)
+            return
+        buses, bus = bus
+        buses.batch(bus, [functools.partial(self.poll, name) for name in names])
+
+    def _poll_loop(self, names):
+        """Poll a group of sensors at their intervals until asked to stop
+
+        Parameters
+        ----------
+        names : list of str
+            The names of the sensors (sharing an I2C bus)
+        """
+        next_poll = dict.fromkeys(names, time.monotonic())
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [
+                name for name in names if next_poll[name] <= now + BATCH_WINDOW_SECONDS
+            ]
+            if due:
+                self.poll_batch(due)
+
+            # Keep to the schedule, but skip polls missed by a slow read
+            now = time.monotonic()
+            for name in due:
+                next_poll[name] += self.intervals[name]
+                if next_poll[name] < now:
+                    next_poll[name] = now + self.intervals[name]
+            self._stop.wait(min(next_poll.values()) - now)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: aggregate.py
+
+Streaming per-minute aggregation of the sensor samples for the database
+
+"""
+
+# Built-In Libraries
+import functools
+import math
+import threading
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+
+
+# Module Constants
+MAX_SAMPLES_PER_MINUTE = 256
+
+__all__ = ["MinuteAggregator"]
+
+
+class MinuteAggregator:
+    """Streaming per-minute aggregation of sensor samples
+
+    Every sample taken from a sensor during the minute is written into a
+    preallocated NumPy buffer for its channel (database column).  Once a
+    minute, :meth:`emit` reduces each channel to its median, minimum, maximum
+    and sample count, and resets the buffers.  Taking the median removes the
+    occasional spurious reading from the stored values.
+
+    Recording a sample does not allocate any arrays, so sensors may be polled
+    at several Hz.  If more than ``capacity`` samples arrive in a minute, the
+    oldest are overwritten.
+
+    Samples may be recorded from several threads (e.g., the sensor polling
+    threads) while another emits; a short lock keeps each sample in the
+    minute it was taken.
+
+    Parameters
+    ----------
+    channels : list of str
+        The names of the channels (database columns) to aggregate
+    capacity : int, optional
+        The maximum number of samples kept per channel per minute
+        (Default: ``MAX_SAMPLES_PER_MINUTE``)
+    """
+
+    def __init__(self, channels, capacity=MAX_SAMPLES_PER_MINUTE):
+        self.channels = list(channels)
+        self.capacity = capacity
+        self._samples = np.full((len(self.channels), capacity), np.nan)
+        self._counts = [0] * len(self.channels)
+        self._lock = threading.Lock()
+
+    def recorder(self, channel):
+        """Return a callable that records samples for a given channel
+
+        Parameters
+        ----------
+        channel : str
+            The channel name
+
+        Returns
+        -------
+        callable
+            Function taking a single sample value
+        """
+        return functools.partial(self.add, self.channels.index(channel))
+
+    def add(self, index, value):
+        """Record a sample for a channel
+
+        Parameters
+        ----------
+        index : int
+            The index of the channel
+        value : float
+            The sample value (None or NaN is ignored)
+        """
+        if value is None or math.isnan(value):
+            return
+        with self._lock:
+            count = self._counts[index]
+            self._samples[index, count % self.capacity] = value
+            self._counts[index] = count + 1
+
+    def emit(self):
+        """Reduce the samples for the minute and reset the buffers
+
+        Returns
+        -------
+        dict
+            Dictionary of channel name / (median, min, max, count) tuples;
+            the statistics are NaN for channels with no samples
+        """
+        # Swap in fresh buffers, so recording resumes while these are reduced
+        with self._lock:
+            samples, counts = self._samples, self._counts
+            self._samples = np.full_like(samples, np.nan)
+            self._counts = [0] * len(self.channels)
+
+        # Only reduce the channels with samples (the others are all-NaN)
+        filled = np.asarray(counts) > 0
+        median = np.full(len(self.channels), np.nan)
+        minimum, maximum = median.copy(), median.copy()
+        if filled.any():
+            median[filled] = np.nanmedian(samples[filled], axis=1)
+            minimum[filled] = np.nanmin(samples[filled], axis=1)
+            maximum[filled] = np.nanmax(samples[filled], axis=1)
+
+        return {
+            name: (median[i], minimum[i], maximum[i], counts[i])
+            for i, name in enumerate(self.channels)
+        }
@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: archive.py
+
+Compressed monthly archive of the daily Chicken-Pi database files
+
+"""
+
+# Built-In Libraries
+import datetime
+import json
+import os
+import struct
+import zlib
+
+# 3rd Party Libraries
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import columnfiles
+from chicken import utils
+
+# Module Constants
+ARCHIVE_MAGIC = b"CHKNARCH"
+ARCHIVE_FLOAT_SCALE = 0.001
+ARCHIVE_NAN = np.iinfo(np.int32).min
+ARCHIVE_ZLIB_LEVEL = 6
+
+__all__ = ["MonthlyArchive", "archive_path", "archive_days"]
+
+
+class MonthlyArchive:
+    """Compressed, chunked, columnar archive of a month of readings
+
+    Each day of readings is stored as one chunk, and each column of a chunk
+    is encoded and compressed (zlib) on its own, so that only the requested
+    columns of the requested days need to be decompressed.  The encodings
+    are:
+
+    * ``delta``: the ``epoch`` column, stored as its first value followed by
+      the (nearly constant) differences between rows
+    * ``quantized``: float columns, rounded to multiples of ``scale`` and
+      stored as ``int32`` (NaN is stored as ``ARCHIVE_NAN``)
+    * ``bitpacked``: boolean columns (e.g., ``outlet_N``), eight per byte
+    * ``text``: string columns, newline-joined UTF-8
+    * ``raw``: all other (integer) columns
+
+    A JSON footer at the end of the file lists, for every chunk, the date,
+    number of rows and the location of each column, along with the minimum
+    and maximum of each numeric column.  Time-range and value-range queries
+    use the footer to skip chunks without decompressing them.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the archive file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = self._read_footer() if path.exists() else []
+
+    @property
+    def dates(self):
+        """The dates of the days held in the archive
+
+        Returns
+        -------
+        list of str
+            The YYYYMMDD strings of the dates
+        """
+        return [chunk["date"] for chunk in self.chunks]
+
+    def _read_footer(self):
+        """Read the list of chunks from the footer of the archive file
+
+        Returns
+        -------
+        list of dict
+            The chunk descriptions
+        """
+        with open(self.path, "rb") as archive:
+            archive.seek(-(len(ARCHIVE_MAGIC) + 8), os.SEEK_END)
+            (n_footer,) = struct.unpack("<Q", archive.read(8))
+            if archive.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                raise ValueError(f"{self.path} is not a Chicken-Pi archive")
+            archive.seek(-(len(ARCHIVE_MAGIC) + 8 + n_footer), os.SEEK_END)
+            return json.loads(archive.read(n_footer).decode("utf-8"))["chunks"]
+
+    def add_day(self, date, table: astropy.table.Table):
+        """Add (or replace) a day of readings in the archive
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        """
+        self._rewrite({date}, encode_chunk(date, table))
+
+    def remove_days(self, dates):
+        """Remove days of readings from the archive
+
+        The archive file is deleted once it holds no more days.
+
+        Parameters
+        ----------
+        dates : iterable of str
+            The YYYYMMDD strings of the dates to remove
+        """
+        dates = set(dates)
+        if dates & set(self.dates):
+            self._rewrite(dates)
+
+    def _rewrite(self, drop_dates, new=None):
+        """Rewrite the archive file, dropping and/or adding chunks
+
+        The archive is written to a temporary file (copying the kept chunks'
+        compressed bytes as they are) and then renamed into place, so a power
+        cut never leaves a corrupt archive.
+
+        Parameters
+        ----------
+        drop_dates : set of str
+            The YYYYMMDD strings of the dates whose chunks are dropped
+        new : tuple, optional
+            The (chunk, blobs) pair of a chunk to add, from
+            :func:`encode_chunk` (Default: None)
+        """
+        chunks = [chunk for chunk in self.chunks if chunk["date"] not in drop_dates]
+        blobs = {}
+        if chunks:
+            with open(self.path, "rb") as archive:
+                for chunk in chunks:
+                    blobs[chunk["date"]] = {
+                        name: self._read_blob(archive, column)
+                        for name, column in chunk["columns"].items()
+                    }
+        if new is not None:
+            chunks.append(new[0])
+            blobs[new[0]["date"]] = new[1]
+        chunks.sort(key=lambda chunk: chunk["date"])
+
+        if not chunks:
+            self.path.unlink(missing_ok=True)
+            self.chunks = []
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "wb") as archive:
+            archive.write(ARCHIVE_MAGIC)
+            for chunk in chunks:
+                for name, column in chunk["columns"].items():
+                    column["offset"] = archive.tell()
+                    column["length"] = len(blobs[chunk["date"]][name])
+                    archive.write(blobs[chunk["date"]][name])
+            footer = json.dumps({"chunks": chunks}).encode("utf-8")
+            archive.write(footer + struct.pack("<Q", len(footer)) + ARCHIVE_MAGIC)
+            archive.flush()
+            os.fsync(archive.fileno())
+        os.replace(tmp_path, self.path)
+        self.chunks = chunks
+
+    @staticmethod
+    def _read_blob(archive, column):
+        """Read the compressed bytes of a column
+
+        Parameters
+        ----------
+        archive : file object
+            The open archive file
+        column : dict
+            The column description from the footer
+
+        Returns
+        -------
+        bytes
+            The compressed column
+        """
+        archive.seek(column["offset"])
+        return archive.read(column["length"])
+
+    def read_day(self, date, columns=None):
+        """Read a day of readings from the archive
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The readings, or None if the day is not in the archive
+        """
+        for chunk in self.chunks:
+            if chunk["date"] == date:
+                with open(self.path, "rb") as archive:
+                    return self._decode_chunk(archive, chunk, columns)
+        return None
+
+    def read(self, start=None, stop=None, columns=None, where=None):
+        """Read the rows with ``start <= epoch < stop`` from the archive
+
+        Parameters
+        ----------
+        start : int, optional
+            The first epoch to return (Default: None, from the beginning)
+        stop : int, optional
+            The epoch at which to stop (Default: None, through the end)
+        columns : list of str, optional
+            The columns to return (``epoch`` is always included)
+            (Default: None, all columns)
+        where : dict, optional
+            Dictionary of column name / (low, high) pairs; only rows with
+            ``low <= value <= high`` in every listed column are returned, and
+            chunks whose footer range does not overlap are never read
+            (Default: None)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rows, sorted by ``epoch``, or None if there are none
+        """
+        where = where or {}
+        if columns is not None:
+            columns = list(columns) + list(where)
+        tables = []
+        with open(self.path, "rb") as archive:
+            for chunk in self.chunks:
+                if not self._chunk_overlaps(chunk, start, stop, where):
+                    continue
+                table = self._decode_chunk(archive, chunk, columns)
+                keep = np.ones(len(table), dtype=bool)
+                epoch = np.asarray(table["epoch"])
+                if start is not None:
+                    keep &= epoch >= start
+                if stop is not None:
+                    keep &= epoch < stop
+                for name, (low, high) in where.items():
+                    keep &= (table[name] >= low) & (table[name] <= high)
+                if keep.any():
+                    tables.append(table[keep])
+        if not tables:
+            return None
+        return astropy.table.vstack(tables) if len(tables) > 1 else tables[0]
+
+    @staticmethod
+    def _chunk_overlaps(chunk, start, stop, where):
+        """Check the footer statistics of a chunk against a query
+
+        Parameters
+        ----------
+        chunk : dict
+            The chunk description from the footer
+        start, stop : int or None
+            The epoch range of the query
+        where : dict
+            Dictionary of column name / (low, high) pairs
+
+        Returns
+        -------
+        bool
+            Whether the chunk may hold rows matching the query
+        """
+        epoch = chunk["columns"]["epoch"]
+        if start is not None and epoch["max"] < start:
+            return False
+        if stop is not None and epoch["min"] >= stop:
+            return False
+        for name, (low, high) in where.items():
+            column = chunk["columns"].get(name)
+            if column is None or column["min"] is None:
+                return False
+            if column["max"] < low or column["min"] > high:
+                return False
+        return True
+
+    @staticmethod
+    def _decode_chunk(archive, chunk, columns=None):
+        """Decompress and decode (some of) the columns of a chunk
+
+        Parameters
+        ----------
+        archive : file object
+            The open archive file
+        chunk : dict
+            The chunk description from the footer
+        columns : list of str, optional
+            The columns to decode (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table`
+            The decoded readings
+        """
+        wanted = None if columns is None else set(columns) | {"epoch"}
+        table = astropy.table.Table()
+        for name, column in chunk["columns"].items():
+            if wanted is None or name in wanted:
+                archive.seek(column["offset"])
+                table[name] = decode_column(
+                    archive.read(column["length"]), column, chunk["n_rows"]
+                )
+        return table
+
+
+def encode_chunk(date, table: astropy.table.Table):
+    """Encode and compress a day of readings as an archive chunk
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+    table : :obj:`astropy.table.Table`
+        The readings for the day
+
+    Returns
+    -------
+    chunk : dict
+        The chunk description for the footer
+    blobs : dict
+        Dictionary of column name / compressed bytes pairs
+    """
+    chunk = {"date": date, "n_rows": len(table), "columns": {}}
+    blobs = {}
+    for name in table.colnames:
+        values = np.asarray(table[name])
+        column = {"dtype": values.dtype.str, "min": None, "max": None}
+        if name == "epoch":
+            column["encoding"] = "delta"
+            data = np.diff(values, prepend=0).astype("<i8")
+        elif values.dtype.kind == "f":
+            column["encoding"] = "quantized"
+            column["scale"] = ARCHIVE_FLOAT_SCALE
+            finite = np.isfinite(values)
+            data = np.full(len(values), ARCHIVE_NAN, dtype="<i4")
+            data[finite] = np.round(values[finite] / ARCHIVE_FLOAT_SCALE)
+        elif values.dtype.kind == "b":
+            column["encoding"] = "bitpacked"
+            data = np.packbits(values)
+        elif values.dtype.kind in "OSU":
+            column["encoding"] = "text"
+            column["dtype"] = "str"
+            data = np.frombuffer(
+                "\n".join(values.astype(str)).encode("utf-8"), dtype=np.uint8
+            )
+        else:
+            column["encoding"] = "raw"
+            data = values.astype(values.dtype.newbyteorder("<"))
+
+        # Footer statistics for the numeric columns
+        if values.dtype.kind in "fiu" and len(values):
+            with np.errstate(invalid="ignore"):
+                if not np.all(np.isnan(values.astype(float))):
+                    column["min"] = float(np.nanmin(values))
+                    column["max"] = float(np.nanmax(values))
+        chunk["columns"][name] = column
+        blobs[name] = zlib.compress(data.tobytes(), ARCHIVE_ZLIB_LEVEL)
+    return chunk, blobs
+
+
+def decode_column(blob, column, n_rows):
+    """Decompress and decode a single column of a chunk
+
+    Parameters
+    ----------
+    blob : bytes
+        The compressed column
+    column : dict
+        The column description from the footer
+    n_rows : int
+        The number of rows in the chunk
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        The column values
+    """
+    raw = zlib.decompress(blob)
+    encoding = column["encoding"]
+    if encoding == "delta":
+        return np.cumsum(np.frombuffer(raw, dtype="<i8")).astype(np.int64)
+    if encoding == "quantized":
+        data = np.frombuffer(raw, dtype="<i4")
+        values = (data * column["scale"]).astype(np.dtype(column["dtype"]))
+        values[data == ARCHIVE_NAN] = np.nan
+        return values.astype(values.dtype.newbyteorder("="))
+    if encoding == "bitpacked":
+        return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), count=n_rows).astype(
+            bool
+        )
+    if encoding == "text":
+        return np.array(raw.decode("utf-8").split("\n") if n_rows else [], dtype=str)
+    dtype = np.dtype(column["dtype"])
+    return np.frombuffer(raw, dtype=dtype.newbyteorder("<")).astype(
+        dtype.newbyteorder("=")
+    )
+
+
+def archive_path(date):
+    """Return the path of the monthly archive holding a date
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+
+    Returns
+    -------
+    :obj:`pathlib.Path`
+        The path of the archive file (``coop_YYYYMM.archive``)
+    """
+    return utils.Paths.data.joinpath(f"coop_{date[:6]}.archive")
+
+
+def archive_days(before, logger=None):
+    """Move the daily FITS files for dates before ``before`` into archives
+
+    Each daily file is added to its monthly archive, read back to check it,
+    and then deleted.  The (small) daily rollup files are kept.
+
+    Parameters
+    ----------
+    before : str
+        The YYYYMMDD string of the first date *not* to archive
+    logger : :obj:`logging.Logger`, optional
+        The logging object into which to place logs (Default: None)
+
+    Returns
+    -------
+    list of str
+        The YYYYMMDD strings of the dates archived
+    """
+    archived = []
+    for path in sorted(utils.Paths.data.glob("coop_????????.fits")):
+        date = path.stem.split("_")[1]
+        if date >= before:
+            continue
+        table = astropy.table.Table.read(path, character_as_bytes=False)
+        archive = MonthlyArchive(archive_path(date))
+        archive.add_day(date, table)
+        if len(archive.read_day(date, columns=["epoch"])) != len(table):
+            if logger is not None:
+                logger.warning("Archive check failed for %s; keeping %s", date, path)
+            continue
+        path.unlink()
+        columnfiles.remove_columns(date)
+        archived.append(date)
+    if logger is not None and archived:
+        logger.info("Archived %d day(s): %s", len(archived), ", ".join(archived))
+    return archived
+
+
+def first_archived_date():
+    """Return the earliest date held in the archives, if any
+
+    Returns
+    -------
+    :obj:`datetime.datetime` or None
+        Midnight of the earliest archived date
+    """
+    paths = sorted(utils.Paths.data.glob("coop_??????.archive"))
+    if not paths:
+        return None
+    dates = MonthlyArchive(paths[0]).dates
+    return datetime.datetime.strptime(min(dates), "%Y%m%d") if dates else None
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: catalog.py
+
+Persistent catalog of the days stored in the Chicken-Pi data directory
+
+"""
+
+# Built-In Libraries
+import json
+import os
+import threading
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import archive
+from chicken import schema
+from chicken import utils
+
+# Module Constants
+CATALOG_FILENAME = "catalog.jsonl"
+STORED_FITS = "fits"
+STORED_ARCHIVE = "archive"
+CATALOG_SLACK_LINES = 64
+
+__all__ = ["DayCatalog", "summarize_day"]
+
+
+class DayCatalog:
+    """Catalog of the stored days, with summary statistics for each
+
+    For each day, the catalog holds the number of rows, the first and last
+    ``epoch``, the median spacing of the readings, where the raw readings
+    are stored (the daily FITS file, the monthly archive, or nowhere once
+    deleted by the retention policy), and the minimum and maximum of each
+    numeric column (plus, for boolean columns, the number of rows that are
+    True).  Range queries use it to find the days to read without probing
+    the data directory, and summary questions (e.g., the daily maximum
+    temperature, or the hours each outlet was on) are answered without
+    opening any data file.
+
+    The catalog is kept in a JSON-lines file (``catalog.jsonl``) in the data
+    directory.  Each change appends one line, which updates the entry for a
+    day; the file is compacted to one line per day when opened, or once it
+    has grown well past that.  If the
+    file does not exist (e.g., for a data directory from an older version),
+    the storage backend builds it with :meth:`rebuild`.
+
+    Only the process recording the data (the owner) may write the file.  A
+    catalog opened ``readonly`` (e.g., by ``chicken.export`` running
+    alongside the GUI) keeps every change in memory, so it never rewrites
+    the file out from under the owner's appends.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`, optional
+        The catalog file (Default: ``catalog.jsonl`` in the data directory)
+    readonly : bool, optional
+        Never write to the catalog file (Default: False)
+    """
+
+    def __init__(self, path=None, readonly=False):
+        self.path = path or utils.Paths.data.joinpath(CATALOG_FILENAME)
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        self.entries = {}
+        # Lines in the catalog file, to know when to compact it
+        self._n_lines = 0
+        if self.path.exists():
+            self._load()
+
+    def _load(self):
+        """Read the catalog file, compacting it if it has grown (and owned)"""
+        with open(self.path, "r", encoding="utf-8") as file_object:
+            for line in file_object:
+                try:
+                    update = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line torn by a crash
+                    continue
+                self._n_lines += 1
+                self._merge(update)
+        if not self.readonly and self._n_lines > 2 * len(self.entries):
+            self._save()
+
+    def _merge(self, update):
+        """Merge one catalog line into the entries
+
+        Parameters
+        ----------
+        update : dict
+            The catalog line; ``date`` selects the entry, and a line with
+            ``removed`` set deletes it
+        """
+        date = update.pop("date")
+        if update.pop("removed", False):
+            self.entries.pop(date, None)
+        else:
+            self.entries.setdefault(date, {}).update(update)
+
+    def _save(self):
+        """Rewrite the catalog file with one line per day"""
+        if self.readonly:
+            return
+        with self._lock:
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as file_object:
+                for date in sorted(self.entries):
+                    file_object.write(
+                        json.dumps({"date": date, **self.entries[date]}) + "\n"
+                    )
+            os.replace(tmp_path, self.path)
+            self._n_lines = len(self.entries)
+
+    def _append(self, update):
+        """Apply a change to the catalog and append it to the file
+
+        Parameters
+        ----------
+        update : dict
+            The catalog line (see :meth:`_merge`)
+        """
+        with self._lock:
+            self._merge(dict(update))
+            if self.readonly:
+                return
+            with open(self.path, "a", encoding="utf-8") as file_object:
+                file_object.write(json.dumps(update) + "\n")
+            self._n_lines += 1
+            # The current day is re-cataloged with every snapshot
+            if self._n_lines > 2 * len(self.entries) + CATALOG_SLACK_LINES:
+                self._save()
+
+    def rebuild(self, read_day):
+        """Build the catalog from the daily FITS files and monthly archives
+
+        Parameters
+        ----------
+        read_day : callable
+            Function taking a YYYYMMDD date string and returning the Table of
+            readings for that date (e.g., the storage backend's ``read_day``)
+        """
+        with self._lock:
+            self.entries = {}
+            stored = {}
+            for path in utils.Paths.data.glob("coop_??????.archive"):
+                for date in archive.MonthlyArchive(path).dates:
+                    stored[date] = STORED_ARCHIVE
+            for path in utils.Paths.data.glob("coop_????????.fits"):
+                stored[path.stem.split("_")[1]] = STORED_FITS
+            for date in sorted(stored):
+                table = read_day(date)
+                if table is not None:
+                    self.entries[date] = summarize_day(table, stored[date])
+            self._save()
+
+    def add_day(self, date, table, stored=STORED_FITS):
+        """Catalog the readings for a day
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        stored : str, optional
+            Where the raw readings are stored (Default: ``STORED_FITS``)
+        """
+        self._append({"date": date, **summarize_day(table, stored)})
+
+    def set_stored(self, dates, stored):
+        """Record that the raw readings for some days have moved
+
+        Parameters
+        ----------
+        dates : list of str
+            The YYYYMMDD strings of the dates
+        stored : str or None
+            Where the raw readings are now stored (None if deleted)
+        """
+        for date in dates:
+            if date in self.entries:
+                self._append({"date": date, "stored": stored})
+
+    def remove_days(self, dates):
+        """Remove days from the catalog entirely
+
+        Parameters
+        ----------
+        dates : list of str
+            The YYYYMMDD strings of the dates
+        """
+        for date in dates:
+            if date in self.entries:
+                self._append({"date": date, "removed": True})
+
+    def stored_days(self, start=None, stop=None):
+        """Return the days whose stored raw readings overlap a time range
+
+        Parameters
+        ----------
+        start : int, optional
+            The first epoch of the range (Default: None, from the beginning)
+        stop : int, optional
+            The epoch at which the range stops (Default: None, no end)
+
+        Returns
+        -------
+        list of str
+            The YYYYMMDD strings of the dates, in order
+        """
+        with self._lock:
+            return [
+                date
+                for date, entry in sorted(self.entries.items())
+                if entry.get("stored")
+                and entry["rows"]
+                and (start is None or entry["last"] >= start)
+                and (stop is None or entry["first"] < stop)
+            ]
+
+    def daily(self, column, statistic="max", start_date=None, stop_date=None):
+        """Return a daily summary statistic of a column
+
+        Parameters
+        ----------
+        column : str
+            The column name
+        statistic : str, optional
+            ``min``, ``max``, ``rows`` (the number of readings) or, for
+            boolean columns, ``hours`` (the hours for which the column was
+            True) (Default: ``max``)
+        start_date : str, optional
+            The YYYYMMDD string of the first date (Default: None, the first)
+        stop_date : str, optional
+            The YYYYMMDD string of the first date *not* to include
+            (Default: None, through the last)
+
+        Returns
+        -------
+        dict
+            Dictionary of YYYYMMDD date / value pairs (None where the column
+            was not recorded or had no valid readings)
+        """
+        with self._lock:
+            entries = sorted(self.entries.items())
+        summary = {}
+        for date, entry in entries:
+            if (start_date and date < start_date) or (stop_date and date >= stop_date):
+                continue
+            if statistic == "rows":
+                summary[date] = entry["rows"]
+                continue
+            stats = entry["columns"].get(column)
+            if stats is None:
+                summary[date] = None
+            elif statistic == "hours":
+                summary[date] = (
+                    stats[2] * entry["cadence"] / 3600 if len(stats) > 2 else None
+                )
+            else:
+                summary[date] = stats[["min", "max"].index(statistic)]
+        return summary
+
+
+def summarize_day(table, stored=STORED_FITS):
+    """Compute the catalog entry for a day of readings
+
+    Parameters
+    ----------
+    table : :obj:`astropy.table.Table`
+        The readings for the day
+    stored : str, optional
+        Where the raw readings are stored (Default: ``STORED_FITS``)
+
+    Returns
+    -------
+    dict
+        The catalog entry: ``rows``, ``first``, ``last``, ``cadence``
+        (median seconds between readings), ``stored``, ``schema`` (the
+        version in the schema registry) and ``columns``
+        (column name / [min, max] or, for boolean columns,
+        [min, max, number True] lists; None for no valid readings)
+    """
+    epoch = np.asarray(table["epoch"]) if len(table) else np.array([], dtype=int)
+    entry = {
+        "rows": len(table),
+        "first": int(epoch.min()) if epoch.size else None,
+        "last": int(epoch.max()) if epoch.size else None,
+        "cadence": float(np.median(np.diff(np.sort(epoch)))) if epoch.size > 1 else 0,
+        "stored": stored,
+        "schema": schema.schema_registry().register(
+            table.colnames, [table[name].dtype for name in table.colnames]
+        ),
+        "columns": {},
+    }
+    for name in table.colnames:
+        values = np.asarray(table[name])
+        if name == "epoch" or values.dtype.kind not in "biuf" or not values.size:
+            continue
+        if values.dtype.kind == "b":
+            entry["columns"][name] = [
+                bool(values.min()),
+                bool(values.max()),
+                int(np.count_nonzero(values)),
+            ]
+        elif values.dtype.kind == "f":
+            valid = values[np.isfinite(values)]
+            entry["columns"][name] = (
+                [float(valid.min()), float(valid.max())] if valid.size else None
+            )
+        else:
+            entry["columns"][name] = [int(values.min()), int(values.max())]
+    return entry
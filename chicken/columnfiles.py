@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: columnfiles.py
+
+Memory-mapped per-day column files for the Chicken-Pi database
+
+Each day is stored in a single file (``coop_YYYYMMDD.cols``) holding every
+column as a contiguous, fixed-width block of native-endian values::
+
+    magic (8 bytes) | header length (uint32) | JSON header | column blocks
+
+The JSON header lists the number of rows and, for each column (in order),
+its name, NumPy dtype string and byte offset from the first block.  Blocks
+start on ``COLUMN_ALIGN``-byte boundaries.  Reading a day maps the file once and
+returns NumPy views of the blocks, so only the pages of the columns actually
+used are ever read from disk, and they are held in the (shared, reclaimable)
+page cache rather than on the heap.  A single file per day, rather than one
+per column, keeps the open file descriptors to one per mapped day.
+
+"""
+
+# Built-In Libraries
+import json
+import mmap
+import os
+import struct
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import utils
+
+# Module Constants
+COLUMN_MAGIC = b"CHKNCOLS"
+COLUMN_ALIGN = 64
+
+__all__ = ["column_path", "write_columns", "read_columns", "remove_columns"]
+
+
+def column_path(date):
+    """Return the path of the column file for a date
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+
+    Returns
+    -------
+    :obj:`pathlib.Path`
+        The path of the column file (``coop_YYYYMMDD.cols``)
+    """
+    return utils.Paths.data.joinpath(f"coop_{date}.cols")
+
+
+def write_columns(date, columns):
+    """Write a day of readings to its column file
+
+    The file is written to a temporary file first, then renamed into place,
+    so readers never see a partial day.
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+    columns : dict or :obj:`astropy.table.Table`
+        Column name / array pairs, all of the same length
+    """
+    arrays = {}
+    for name in columns.keys():
+        values = np.asarray(columns[name])
+        if values.dtype.kind == "O":
+            values = values.astype(str)
+        # Store native-endian, so that reads need no byte swapping
+        arrays[name] = values.astype(values.dtype.newbyteorder("="), copy=False)
+    n_rows = len(next(iter(arrays.values()))) if arrays else 0
+
+    # Lay out the blocks, each padded to the alignment
+    layout, offset = [], 0
+    for name, values in arrays.items():
+        layout.append([name, values.dtype.str, offset])
+        offset += -(-values.nbytes // COLUMN_ALIGN) * COLUMN_ALIGN
+    header = json.dumps({"rows": n_rows, "columns": layout}).encode()
+
+    path = column_path(date)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(COLUMN_MAGIC + struct.pack("<I", len(header)) + header)
+        start = block_start(len(header))
+        for (_, _, offset), values in zip(layout, arrays.values()):
+            file.seek(start + offset)
+            file.write(np.ascontiguousarray(values).tobytes())
+    os.replace(tmp_path, path)
+
+
+def block_start(n_header):
+    """Return the byte offset of the first column block
+
+    Parameters
+    ----------
+    n_header : int
+        The length (bytes) of the JSON header
+
+    Returns
+    -------
+    int
+        The offset of the first block, aligned to ``COLUMN_ALIGN`` bytes
+    """
+    return -(-(len(COLUMN_MAGIC) + 4 + n_header) // COLUMN_ALIGN) * COLUMN_ALIGN
+
+
+def read_columns(date, columns=None):
+    """Memory-map the column file for a date
+
+    No data are read or copied here: each array is a copy-on-write view of
+    the file.  Modifying an array (e.g., masking spurious values) only copies
+    the pages touched, privately, and never changes the file.
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+    columns : list of str, optional
+        The columns to map (``epoch`` is always included)
+        (Default: None, all columns)
+
+    Returns
+    -------
+    dict or None
+        Dictionary of column name / :obj:`numpy.ndarray` pairs, in the order
+        stored, or None if no column file exists for the date
+    """
+    try:
+        with open(column_path(date), "rb") as file:
+            magic, n_header = struct.unpack("<8sI", file.read(12))
+            if magic != COLUMN_MAGIC:
+                raise ValueError(f"Not a column file: {column_path(date)}")
+            header = json.loads(file.read(n_header))
+            if header["rows"] == 0:
+                return {
+                    name: np.empty(0, dtype=dtype)
+                    for name, dtype, _ in header["columns"]
+                }
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    except FileNotFoundError:
+        return None
+    wanted = None if columns is None else set(columns) | {"epoch"}
+    return {
+        name: np.ndarray(
+            (header["rows"],),
+            dtype=np.dtype(dtype),
+            buffer=buffer,
+            offset=block_start(n_header) + offset,
+        )
+        for name, dtype, offset in header["columns"]
+        if wanted is None or name in wanted
+    }
+
+
+def remove_columns(date):
+    """Delete the column file for a date, if it exists
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+
+    Returns
+    -------
+    int
+        The number of bytes deleted
+    """
+    path = column_path(date)
+    try:
+        n_bytes = path.stat().st_size
+        path.unlink()
+    except FileNotFoundError:
+        return 0
+    return n_bytes
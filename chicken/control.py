@@ -17,6 +17,7 @@ import tkinter as tk
 import numpy as np
 
 # Internal Imports
+from chicken.acquire import AcquisitionService
 from chicken.database import ChickenDatabase, OperationalSettings
 from chicken.graphs import GraphsWindow
 from chicken.network import NetworkStatus
@@ -47,6 +48,8 @@ class ControlWindow:
         # Set logger as attribute; set after_id
         self.logger = logger
         self.after_id = None
+        # The second of the previous update, so once-a-second work runs once
+        self._last_second = None
 
         # Set up window layout as a dictionary
         self.layout = {
@@ -65,7 +68,16 @@ class ControlWindow:
 
         # Set up the database and network status classes
         self.network = NetworkStatus(self.logger)
-        self.database = ChickenDatabase(self.logger, self.sensors, self.relays)
+        self.database = ChickenDatabase(
+            self.logger, self.sensors, self.relays, self.config
+        )
+
+        # Poll the sensors in background threads; everything else reads the
+        #  latest values from the snapshot, so a slow sensor can't stall the GUI
+        self.acquisition = AcquisitionService(
+            self.sensors, self.logger, self.config.get("acquisition")
+        )
+        self.acquisition.start()
 
         # Indicator LEDs
         self.led = {
@@ -121,6 +133,7 @@ class ControlWindow:
                 "name": name,
                 "column": i,
                 "sensors": self.sensors,
+                "acquisition": self.acquisition,
                 "img": self.led["off"],
                 "geom": self.geom,
                 "layout": self.layout,
@@ -159,15 +172,20 @@ class ControlWindow:
         # This is the official time for Chicken Pi
         now = datetime.datetime.now()
 
+        # The update runs every 0.5 s; only act on the top of the minute once
+        second = now.replace(microsecond=0)
+        top_of_minute = now.second % 60 == 0 and second != self._last_second
+        self._last_second = second
+
         # Check for changes in the GUI settings
         self.settings.check_for_change(self.outlet, self.door)
 
         # Every 60 seconds, write changes in relay command to relays
-        if now.second % 60 == 0:
+        if top_of_minute:
             self.set_relays()
 
         # Update status window each time through the method
-        self.status_window.update(now, self.sensors, self.relays, self.network)
+        self.status_window.update(now, self.acquisition, self.relays, self.network)
 
         # Update the LED status indicators in the CONTROL Window
         for outlet in self.outlet:
@@ -175,7 +193,7 @@ class ControlWindow:
             outlet.command_led.configure(image=outlet.img)
 
         # Every minute, write status to database
-        if now.second % 60 == 0:  # and now.minute % 1 == 0:
+        if top_of_minute:
             self.write_to_database(now)
             self.log_window.update()
             # Update the Graphs window
@@ -196,7 +214,7 @@ class ControlWindow:
         """
         # Check to see if any states have changed
         for i, outlet in enumerate(self.outlet):
-            demand = outlet.demand  # Call just once, since this queries I2C
+            demand = outlet.demand
             if self.relays.state[i] != demand:
                 self.relays.state[i] = demand
                 change = True
@@ -237,6 +255,10 @@ class ControlWindow:
         self.write_to_database(datetime.datetime.now())
         self.database.write_table_to_fits()
 
+        # Wait for the background threads to finish before the program exits
+        self.acquisition.stop()
+        self.database.close()
+
 
 class _BaseControl:
     """Base class for Object Control
@@ -388,6 +410,9 @@ class OutletControl(_BaseControl):
     def __init__(self, frame, params):
         super().__init__()
         self.sensors = params["sensors"]
+        self.acquisition = params["acquisition"]
+        # Whether the coop temperature was stale at the last command
+        self._temp_stale = False
 
         # Unpack repeatedly used params members:
         column = params["column"]
@@ -568,7 +593,7 @@ class OutletControl(_BaseControl):
         """Update the temperature trigger direction"""
         self.temp_direction = self.tempsel_var.get()
 
-    def cmd_state(self, nowobj, use_cache=False):
+    def cmd_state(self, nowobj):
         """Construct the commanded state from the control knobs
 
         [extended_summary]
@@ -577,8 +602,6 @@ class OutletControl(_BaseControl):
         ----------
         nowobj : :obj:`datetime.datetime`
             The output of ``datetime.datetime.now()``
-        use_cache : bool, optional
-            Use the cached sensor values rather thsn checking? (Default: False)
 
         Returns
         -------
@@ -601,21 +624,29 @@ class OutletControl(_BaseControl):
         else:
             timecmd = True
 
-        # Get temperature commanded state
-        intemp = (
-            self.sensors["inside"].temp
-            if not use_cache
-            else self.sensors["inside"].cache_temp
-        )
+        # Get temperature commanded state (the sensor's cached value until
+        #  the first reading is published)
+        intemp = self.acquisition.snapshot.value(
+            "inside", "temp", default=self.sensors["inside"].cache_temp
+        )
+        stale = self.acquisition.is_stale("inside")
+        if stale and not self._temp_stale:
+            self.acquisition.logger.warning(
+                "No fresh coop temperature; the temperature trigger is off"
+            )
+        self._temp_stale = stale
+        # Temperature Independent
+        if self.temp_direction not in (1, -1):
+            tempcmd = None
+        # Fail safe: an unknown (stale) temperature never switches ON
+        elif stale:
+            tempcmd = False
         # ON above
-        if self.temp_direction == 1:
+        elif self.temp_direction == 1:
             tempcmd = intemp > self.switch_temp
         # ON below
-        elif self.temp_direction == -1:
-            tempcmd = intemp < self.switch_temp
-        # Temperature Independent
         else:
-            tempcmd = None
+            tempcmd = intemp < self.switch_temp
 
         # Combine using AND/OR
         if tempcmd is None:
@@ -642,7 +673,7 @@ class OutletControl(_BaseControl):
         bool
             The current (cached) state of the device
         """
-        return self.cmd_state(datetime.datetime.now(), use_cache=True)
+        return self.cmd_state(datetime.datetime.now())
 
 
 class DoorControl(_BaseControl):
@@ -11,6 +11,7 @@ Database routines for saving readings from the chicken-pi
 # Built-In Libraries
 import csv
 import datetime
+import functools
 import logging
 
 # 3rd Party Libraries
@@ -18,8 +19,57 @@ import astropy.table
 import numpy as np
 
 # Internal Imports
+from chicken import aggregate
+from chicken import journal
 from chicken import network
+from chicken import quality
+from chicken import retention
+from chicken import rollup
+from chicken import schema
+from chicken import stats
+from chicken import storage
 from chicken import utils
+from chicken import writer
+
+# Module Constants
+SAMPLE_CADENCE_SECONDS = 60
+ROWS_PER_DAY = 86400 // SAMPLE_CADENCE_SECONDS
+
+
+def datetime_to_epoch(dt_object: datetime.datetime):
+    """Convert a (naive, local) datetime into the database ``epoch`` value
+
+    The ``epoch`` column holds the number of seconds since 1970-01-01 on the
+    local wall clock, matching the naive ``datetime.datetime.now()`` times
+    used throughout the Chicken-Pi.
+
+    Parameters
+    ----------
+    dt_object : :obj:`datetime.datetime`
+        The datetime to convert
+
+    Returns
+    -------
+    int
+        The epoch value
+    """
+    return int(np.datetime64(dt_object, "s").astype(np.int64))
+
+
+def epoch_to_datetime64(epoch):
+    """Convert ``epoch`` values into plottable ``datetime64`` values
+
+    Parameters
+    ----------
+    epoch : :obj:`numpy.ndarray`
+        Array of epoch values
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        Array of ``datetime64[s]`` values (no copy is made)
+    """
+    return np.asarray(epoch, dtype=np.int64).view("datetime64[s]")
 
 
 class ChickenDatabase:
@@ -35,6 +85,20 @@ class ChickenDatabase:
     most expedient given the limited time available to the developer for
     writing this code.
 
+    Every row is also appended to a write-ahead journal on disk
+    (``coop_YYYYMMDD.journal``) so that a crash or power cut does not lose
+    the day's readings.  On startup, today's table is rebuilt from the most
+    recent FITS snapshot plus the journal, and the FITS file written at
+    midnight (or at exit) is a compacted snapshot of the journal.
+
+    Historical readings are retrieved through a storage backend (see
+    :mod:`chicken.storage`), selected by the ``database: backend`` key of the
+    configuration file.  The default ``fits`` backend reads the daily FITS
+    files; the ``memmap`` backend also writes each day as a file of
+    fixed-width columns that is memory-mapped on read; the ``sqlite`` backend also inserts
+    every row into a SQLite database indexed on ``epoch``, so that any time
+    range is a single query.
+
     This class includes methods for recording data into the current table,
     writing tables to disk, and retrieving historical tables from disk.
 
@@ -42,27 +106,140 @@ class ChickenDatabase:
     ----------
     logger : logging.Logger
         The logging object into which to place logs
+    sensors : dict
+        Dictionary containing the sensor objects
+    relays : :class:`chicken.device.RelayBase`
+        The Relays class
+    config : dict, optional
+        The configuration file dictionary (Default: None)
     """
 
-    def __init__(self, logger: logging.Logger, sensors, relays):
+    def __init__(self, logger: logging.Logger, sensors, relays, config=None):
         # Set up internal variables
         self.logger = logger
         now = datetime.datetime.now()
+        self.journal = None
+
+        # Database settings from the configuration file
+        db_config = (config or {}).get("database", {})
+        self.fsync_interval = db_config.get("journal_fsync_seconds", 60)
+
+        # Spurious readings are flagged in each row's quality bitmask
+        self.quality = quality.QualityRules(db_config.get("cleaning"))
+
+        # Long-term storage of the readings (selected in the configuration)
+        self.storage = storage.open_storage(db_config)
+
+        # Completed days are written to disk on a background thread
+        self.writer = writer.BackgroundWriter(self.logger)
 
-        # Check for existing FITS file for today -- read in or create new
-        today_fn = utils.Paths.data.joinpath(f"coop_{now.strftime('%Y%m%d')}.fits")
-        self.table = (
-            astropy.table.Table.read(today_fn)
-            if today_fn.exists()
-            else self.create_empty_table(sensors, relays)
+        # Old readings are pruned by a low-priority background job
+        self.retention = retention.RetentionPolicy(
+            self.logger,
+            raw_days=db_config.get("retention_raw_days", 0),
+            rollup_years=db_config.get("retention_rollup_years", 0),
         )
 
+        # Grouped statistics of the history, cached for completed days
+        self.stats = stats.HistoryStats(self)
+
+        # The previous day's table is kept after rollover for incremental queries
+        self._previous_day = None
+        # Completed once the previous day's table is written to disk
+        self._day_written = None
+        self._previous_date = None
+
+        # Compact any journals left behind by a crash on a previous day
+        self._date = now.strftime("%Y%m%d")
+        for journal_fn in sorted(utils.Paths.data.glob("coop_*.journal")):
+            date = journal_fn.stem.split("_")[1]
+            if date != self._date:
+                self._day, _ = self._load_day(date, sensors, relays)
+                self.logger.info(
+                    "Recovering %d rows from journal for %s", len(self._day), date
+                )
+                self.write_table_to_fits(date)
+                self._new_rollups().write(self._rollup_path(date))
+                journal_fn.unlink()
+
+        # Rebuild today's table from the FITS snapshot and journal, if exist
+        self._day, journal_dtype = self._load_day(self._date, sensors, relays)
+        self.schema_version = None
+        self._register_schema()
+
+        # If the journal records a different set of columns, compact it away
+        if journal_dtype is not None and journal_dtype != self._record_dtype():
+            self.write_table_to_fits(self._date)
+        self.journal = self._open_journal()
+
+        # Make sure the storage holds any rows replayed from the journal
+        self.storage.append(self._day.tail(0))
+
+        # Seed the rate-of-change checks with today's last valid readings
+        self.quality.evaluate(self._day.tail(0), self.quality.last_valid)
+
+        # Downsampled rollups of today's table, maintained as rows are added
+        self.rollups = self._new_rollups()
+
+        # Aggregate every sample the sensors take over each minute
+        self.samples = aggregate.MinuteAggregator(
+            [
+                column
+                for name, sensor in sensors.items()
+                for column in utils.sensor_columns(name, sensor).values()
+            ]
+        )
+        for name, sensor in sensors.items():
+            sensor.recorders = {
+                quantity: self.samples.recorder(column)
+                for quantity, column in utils.sensor_columns(name, sensor).items()
+            }
+
+        # Apply the retention policy to the existing data
+        self.writer.submit(self._start_retention)
+
         # Log the startup time for the database
         self.logger.info(
             "Chicken-Pi database initialized: %s",
             now.isoformat(sep=" ", timespec="seconds"),
         )
 
+    @property
+    def table(self):
+        """The current day's readings as an :obj:`astropy.table.Table`
+
+        The Table is built from the in-memory column buffer each time this
+        property is accessed, so it should not be used in a tight loop.
+
+        Returns
+        -------
+        :obj:`astropy.table.Table`
+            Today's readings
+        """
+        return self._day.as_table()
+
+    @property
+    def date(self):
+        """The date of the current day's table
+
+        Returns
+        -------
+        :obj:`datetime.date`
+            The date
+        """
+        return datetime.datetime.strptime(self._date, "%Y%m%d").date()
+
+    @property
+    def cursor(self):
+        """The position of the latest row added to the database
+
+        Returns
+        -------
+        tuple
+            The (YYYYMMDD date, number of rows) of the current day's table
+        """
+        return self._date, len(self._day)
+
     def add_row_to_table(
         self, nowobj, sensors, relays, network_data: network.NetworkStatus, debug=False
     ):
@@ -91,56 +268,100 @@ class ChickenDatabase:
         self.logger.debug("We're adding a row to the database at %s...", nowobj.time())
 
         # Begin populating the `row` dictionary with the date & time
-        row = {"date": nowobj.strftime("%Y-%m-%d"), "time": nowobj.strftime("%H:%M:%S")}
+        row = {
+            "date": nowobj.strftime("%Y-%m-%d"),
+            "time": nowobj.strftime("%H:%M:%S"),
+            "epoch": datetime_to_epoch(nowobj),
+        }
 
         # Add the sensor readings to the row
-        for name, sensor in sensors.items():
-            # Retrieve the data from this sensor
-            data = sensor.data_entry
-
-            # If `data` is a tuple, it's a TH sensor, otherwise a LUX or CPU
-            if isinstance(data, tuple):
-                row[f"{name}_temp"] = data[0]
-                row[f"{name}_humid"] = data[1]
-            else:
-                if name == "light":
-                    row[f"{name}_lux"] = data
-                elif name == "cpu":
-                    row[f"{name}_temp"] = data
+        row.update(self._sensor_values(sensors))
 
         # Add the relay status to the row
         for i, state in enumerate(relays.state, 1):
             row[f"outlet_{i}"] = state
 
-        # Add network status to the row
-        row["wifi_status"] = network_data.wifi_status
-        row["inet_status"] = network_data.inet_status
-        row["lan_ipv4"] = network_data.lan_ipv4
-        row["wan_ipv4"] = network_data.wan_ipv4
+        # Add the (compactly encoded) network status to the row
+        row.update(network_data.as_row())
 
         # Before appending the row to the end of the table, check new day
-        #  If so, write out existing table and start a new one
-        if (
-            self.table
-            and "date" in self.table.colnames
-            and row["date"] != self.table["date"][-1]
-        ):
-            self.write_table_to_fits()
-            self.table = self.create_empty_table(sensors, relays)
-
-        # Append the row to the end of the table
-        self.table = (
-            astropy.table.vstack([self.table, row])
-            if self.table
-            else astropy.table.Table([row])
+        #  If so, hand the existing table to the background writer and start
+        #  a new one straight away
+        if nowobj.strftime("%Y%m%d") != self._date:
+            self.logger.info("Day-table cache: %s", self.storage.day_cache.stats)
+            self._day_written = self.writer.submit(
+                self._write_day, self._date, self._day, self.rollups, self.journal
+            )
+            self._previous_day, self._previous_date = self._day, self._date
+            self._date = nowobj.strftime("%Y%m%d")
+            self._day = self.create_empty_buffer(sensors, relays)
+            self._register_schema()
+            self.journal = self._open_journal()
+            self.rollups = self._new_rollups()
+            self.writer.submit(self.storage.compact, self._date)
+            self.writer.submit(self._start_retention)
+
+        # Flag any spurious readings in the row's quality bitmask
+        row[quality.QUALITY_COLUMN] = self.quality.flag_row(
+            row,
+            tuple(
+                name
+                for name, dtype in zip(self._day.names, self._day.dtypes)
+                if dtype.kind == "f"
+            ),
         )
+
+        # Append the row to the end of the (preallocated) table and journal
+        self._day.append(row)
+        self.journal.append(row)
+        self.storage.append(self._day.tail(len(self._day) - 1))
+        self.rollups.ingest(self._clean_columns(len(self._day) - 1))
         if debug:
             self.table.pprint()
 
-    def create_empty_table(self, sensors, relays):
-        """Create an empty table with appropriate names and dtypes
+    def _sensor_values(self, sensors):
+        """Return the sensor readings for a row
 
-        _extended_summary_
+        Each reading is the median of the samples taken over the past minute
+        (with their minimum, maximum and number), falling back to the cached
+        sensor value if there were none.
+
+        Parameters
+        ----------
+        sensors : dict
+            The sensor objects
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / value pairs
+        """
+        values = {}
+        minute_stats = self.samples.emit()
+        for name, sensor in sensors.items():
+            # Retrieve the data from this sensor
+            data = sensor.data_entry
+            data = data if isinstance(data, tuple) else (data,)
+
+            for column, cached in zip(
+                utils.sensor_columns(name, sensor).values(), data
+            ):
+                median, minimum, maximum, n_samples = minute_stats.get(
+                    column, (None, None, None, 0)
+                )
+                if not n_samples:
+                    median = minimum = maximum = cached
+                values[column] = median
+                values[f"{column}_min"] = minimum
+                values[f"{column}_max"] = maximum
+                values[f"{column}_nsamp"] = n_samples
+        return values
+
+    def create_empty_buffer(self, sensors, relays):
+        """Create an empty day buffer with appropriate names and dtypes
+
+        The buffer is preallocated for a full day of readings at the sampling
+        cadence, so appending rows does not copy the existing data.
 
         Parameters
         ----------
@@ -151,72 +372,252 @@ class ChickenDatabase:
 
         Returns
         -------
-        :obj:`astropy.table.Table`
-            The empty table with column names and dtypes
+        :obj:`ColumnBuffer`
+            The empty buffer with column names and dtypes
         """
-        names = ["date", "time"]
-        dtypes = [str, str]
+        names = ["date", "time", "epoch"]
+        dtypes = [str, str, np.int64]
 
         for name, sensor in sensors.items():
-            # Retrieve the data from this sensor
-            data = sensor.data_entry
-
-            # If `data` is a tuple, it's a TH sensor, otherwise a LUX or CPU
-            if isinstance(data, tuple):
-                names = names + [f"{name}_temp", f"{name}_humid"]
-                dtypes = dtypes + [float, float]
-
-            else:
-                if name == "light":
-                    names.append(f"{name}_lux")
-                    dtypes.append(float)
-                elif name == "cpu":
-                    names.append(f"{name}_temp")
-                    dtypes.append(float)
+            # Each sensor column is stored with its per-minute statistics
+            for column in utils.sensor_columns(name, sensor).values():
+                names += [column, f"{column}_min", f"{column}_max", f"{column}_nsamp"]
+                dtypes += [float, float, float, np.int16]
 
         names = (
             names
             + [f"outlet_{i}" for i in range(1, len(relays.state) + 1)]
-            + ["wifi_status", "inet_status", "lan_ipv4", "wan_ipv4"]
+            + ["wifi_status", "wifi_dbm", "inet_status", "lan_ipv4", "wan_ipv4"]
+            + [quality.QUALITY_COLUMN]
+        )
+        dtypes = (
+            dtypes
+            + [bool] * len(relays.state)
+            + [np.uint8, np.float32, np.uint8, np.uint32, np.uint32]
+            + [np.uint64]
         )
-        dtypes = dtypes + [bool] * len(relays.state) + [str] * 4
 
-        # Construct the empty table
-        return astropy.table.Table(names=names, dtype=dtypes)
+        # Construct the empty buffer
+        return ColumnBuffer(names, dtypes)
+
+    def _load_day(self, date, sensors, relays):
+        """Rebuild a day's table from its FITS snapshot and journal
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date to load
+        sensors : dict
+            Dictionary containing the sensor objects
+        relays : :class:`chicken.device.RelayBase`
+            The Relays class
+
+        Returns
+        -------
+        buffer : :obj:`ColumnBuffer`
+            The day's readings
+        journal_dtype : :obj:`numpy.dtype` or None
+            The record dtype of the replayed journal, if any
+        """
+        snapshot_fn = utils.Paths.data.joinpath(f"coop_{date}.fits")
+        if snapshot_fn.exists():
+            snapshot = astropy.table.Table.read(snapshot_fn, character_as_bytes=False)
+            storage.add_epoch_column(snapshot)
+            network.encode_network_columns(snapshot)
+            self.quality.add_quality_column(snapshot)
+            buffer = ColumnBuffer.from_table(snapshot)
+        else:
+            buffer = self.create_empty_buffer(sensors, relays)
+        columns, journal_dtype = journal.read_journal(
+            utils.Paths.data.joinpath(f"coop_{date}.journal")
+        )
+        network.encode_network_columns(columns)
+        self.quality.add_quality_column(columns)
+        buffer.extend(columns)
+        return buffer, journal_dtype
+
+    def _register_schema(self):
+        """Register the schema of the current day's table
+
+        The schema changes when the set of sensors does (e.g., a sensor is
+        added, or falls back to its dummy), and each new version is logged.
+        """
+        version = schema.schema_registry().register(self._day.names, self._day.dtypes)
+        if version != self.schema_version:
+            self.logger.info("Database table schema version %d", version)
+        self.schema_version = version
+
+    def _record_dtype(self):
+        """Return the journal record dtype for the current day's table
+
+        Returns
+        -------
+        :obj:`numpy.dtype`
+            The structured record dtype
+        """
+        return journal.record_dtype(self._day.names, self._day.dtypes)
+
+    def _open_journal(self):
+        """Open the write-ahead journal for the current day's table
+
+        Returns
+        -------
+        :obj:`chicken.journal.Journal`
+            The journal object
+        """
+        return journal.Journal(
+            utils.Paths.data.joinpath(f"coop_{self._date}.journal"),
+            self._record_dtype(),
+            fsync_interval=self.fsync_interval,
+        )
+
+    def _clean_columns(self, start=0):
+        """Return cleaned copies of the numeric columns of today's table
+
+        Parameters
+        ----------
+        start : int, optional
+            The index of the first row to return (Default: 0)
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / :obj:`numpy.ndarray` pairs, with
+            spurious values converted to NaN
+        """
+        columns = {
+            name: np.array(column)
+            for name, column in self._day.tail(start).items()
+            if column.dtype.kind != "O"
+        }
+        self.quality.mask(columns)
+        return columns
+
+    def _new_rollups(self):
+        """Create the rollups for the current day's table
+
+        Returns
+        -------
+        :obj:`chicken.rollup.RollupSet`
+            The rollups, with any rows already in today's table ingested
+        """
+        rollups = rollup.RollupSet.for_columns(self._day.names, self._day.dtypes)
+        rollups.ingest(self._clean_columns())
+        return rollups
+
+    @staticmethod
+    def _rollup_path(date):
+        """Return the path of the rollup file for a given date
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+
+        Returns
+        -------
+        :obj:`pathlib.Path`
+            The path of the rollup file
+        """
+        return rollup.rollup_path(date)
+
+    def _start_retention(self):
+        """Start the retention job, once any pending writes are complete"""
+        self.retention.start(
+            self._date,
+            self.storage,
+            functools.partial(self._ensure_rollup, verify=True),
+        )
+
+    def _write_day(self, date, day, rollups, day_journal):
+        """Write a completed day to disk (run on the background writer)
+
+        The day's journal is only removed once its table and rollups are
+        safely on disk.
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        day : :obj:`ColumnBuffer`
+            The day's readings (no longer being appended to)
+        rollups : :obj:`chicken.rollup.RollupSet`
+            The day's rollups
+        day_journal : :obj:`chicken.journal.Journal`
+            The day's journal
+        """
+        self.logger.info(f"Writing the databse for {date} to disk...")
+        if day:
+            self.storage.write_day(date, day.as_table())
+            rollups.write(self._rollup_path(date))
+        day_journal.close(remove=True)
+
+    def wait_for_day_write(self):
+        """Block until the previous day's table is on disk
+
+        Only the write of the day's table (and rollups) is waited for, not the
+        compaction and retention jobs queued on the writer after it, so that
+        reading the history soon after midnight stays quick.
+        """
+        if self._day_written is not None:
+            self._day_written.result()
+
+    def close(self):
+        """Finish all pending disk writes and release the storage
+
+        Called at exit, after the final snapshot has been written.
+        """
+        self.writer.close()
+        self.storage.close()
+        self.journal.close()
 
     def write_table_to_fits(self, date=None):
         """Write the table in memory to a FITS file on disk
 
-        [extended_summary]
+        The FITS file is a compacted snapshot of the day's journal; once it
+        has been written the journal is truncated.
 
         Parameters
         ----------
         date : str, optional
-            The YYMMDD string of the date to read in. [Default: None]
+            The YYYYMMDD string of the date of the table in memory.  If None,
+            the date of the current day's table is used.  [Default: None]
         """
         if date is None:
-            dt_object = datetime.datetime.now() - datetime.timedelta(minutes=15)
-            date = dt_object.strftime("%Y%m%d")
+            date = self._date
         self.logger.info(f"Writing the databse for {date} to disk...")
-        if self.table:
-            # The full table includes the `object` type column `timestamps`
-            #   We can't save that to FITS, so remove before saving
-            savetable = self.table.copy()
-            savetable.remove_column("timestamps")
-            savetable.write(
-                utils.Paths.data.joinpath(f"coop_{date}.fits"), overwrite=True
-            )
+        if self._day:
+            self.storage.write_day(date, self.table)
+            # The snapshot now holds everything recorded in the journal
+            if self.journal is not None:
+                self.journal.truncate()
 
-    def read_table_from_fits(self, date=None):
+    def read_table_from_fits(self, date=None, columns=None):
         """Read in a FITS file on disk
 
-        _extended_summary_
+        Only the requested columns are decoded from the (memory-mapped) file.
+        The current day's table is returned from memory, since its FITS
+        snapshot on disk may be out of date.
 
         Parameters
         ----------
-        date : _type_, optional
-            _description_, by default None
+        date : str, optional
+            The YYYYMMDD string of the date to read.  If None, the date of the
+            current day's table is used.  [Default: None]
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The Table, or None if no data exist for the date
         """
+        if date is None or date == self._date:
+            return self._day.as_table(columns=columns)
+        self.wait_for_day_write()
+        table = self.storage.read_day(date, columns=columns)
+        return None if table is None else table.copy()
 
     def get_recent_weather(self, time_range=24):
         """get_recent_weather [summary]
@@ -229,7 +630,7 @@ class ChickenDatabase:
             [description], by default 24
         """
 
-    def retrieve_historical(self, lookback=1):
+    def retrieve_historical(self, lookback=1, columns=None):
         """Retrieve historical data for plotting
 
         _extended_summary_
@@ -238,60 +639,624 @@ class ChickenDatabase:
         ----------
         lookback : int, optional
             Number of days to look back (Default: 1)
+        columns : list of str, optional
+            The columns to retrieve (``epoch`` is always included); the other
+            columns are never read from disk.  (Default: None, all columns)
 
         Returns
         -------
-        timestamps : :obj:`datetime.datetime`
-            The timestamps for each row of data in the table
+        timestamps : :obj:`numpy.ndarray`
+            The ``datetime64[s]`` timestamps for each row of data in the table
         data : :obj:`astropy.table.Table`
             The Table of data
         """
         # Determine which historical tables need to be read in based on ``lookback``
         now = datetime.datetime.now()
+        hist_table = self.rows_since(
+            now - datetime.timedelta(days=lookback), columns=columns
+        )
+
+        # If `hist_table` is empty, return now
+        if not hist_table:
+            return np.array([], dtype="datetime64[s]"), hist_table
+
+        # Next, convert the readings flagged as spurious to NaN
+        self.quality.mask(hist_table)
+
+        return epoch_to_datetime64(hist_table["epoch"]), hist_table
+
+    def daily_summary(self, column, statistic="max", lookback=None):
+        """Return a daily summary statistic of a column, from the catalog
+
+        The catalog of stored days holds the extremes of each column (and
+        the number of readings for which each outlet was on), so no data
+        files are opened.  The current day is included as of its last
+        snapshot on disk.
+
+        Parameters
+        ----------
+        column : str
+            The column name (e.g., ``outside_temp`` or ``outlet_1``)
+        statistic : str, optional
+            ``min``, ``max``, ``rows`` or, for the outlets, ``hours`` (the
+            hours for which the outlet was on) (Default: ``max``)
+        lookback : int, optional
+            Number of days to look back (Default: None, every stored day)
+
+        Returns
+        -------
+        dict
+            Dictionary of YYYYMMDD date / value pairs
+        """
+        self.wait_for_day_write()
+        start_date = None
+        if lookback is not None:
+            start_date = (
+                datetime.datetime.now() - datetime.timedelta(days=lookback)
+            ).strftime("%Y%m%d")
+        return self.storage.catalog.daily(
+            column, statistic=statistic, start_date=start_date
+        )
+
+    def retrieve_rollup(self, lookback=1, n_pixels=None, resolution=None):
+        """Retrieve downsampled (rollup) historical data for plotting
+
+        If ``resolution`` is not given, the coarsest resolution that still
+        gives at least one point per pixel for the requested lookback is used.
+        The rollup tables contain the mean of each sensor column (under the
+        same name as in the full-resolution table), along with ``_min`` and
+        ``_max`` columns, and the fraction of each bin that each outlet was
+        energized.
+
+        Parameters
+        ----------
+        lookback : int, optional
+            Number of days to look back (Default: 1)
+        n_pixels : int, optional
+            The number of pixels across which the data will be displayed
+            (Default: None)
+        resolution : int, optional
+            The rollup resolution (seconds) to use (Default: None)
+
+        Returns
+        -------
+        timestamps : :obj:`numpy.ndarray`
+            The ``datetime64[s]`` timestamps of the center of each bin
+        data : :obj:`astropy.table.Table`
+            The Table of data
+        """
+        if resolution is None and n_pixels is not None:
+            resolution = rollup.choose_resolution(lookback * 86400, n_pixels)
+        if resolution is None:
+            return self.retrieve_historical(lookback)
+
+        # Collect the (cached) rollup tables for the days before today, once
+        #  any day still being written in the background is on disk
+        self.wait_for_day_write()
+        now = datetime.datetime.now()
         historical = now - datetime.timedelta(days=lookback)
+        tables = []
+        while historical.strftime("%Y%m%d") < self._date:
+            table = self._read_rollup(historical.strftime("%Y%m%d"), resolution)
+            if table is not None:
+                tables.append(table)
+            historical += datetime.timedelta(days=1)
+
+        # Add today's rollup, including the partial open bin
+        tables.append(self.rollups[resolution].as_table())
+        hist_table = astropy.table.vstack(tables) if len(tables) > 1 else tables[0]
+
+        # Keep the bins that end after the lookback cutoff
+        cutoff = datetime_to_epoch(now - datetime.timedelta(days=lookback))
+        hist_table = hist_table[hist_table["epoch"] + resolution > cutoff]
+        return (
+            epoch_to_datetime64(hist_table["epoch"] + resolution // 2),
+            hist_table,
+        )
+
+    def _read_rollup(self, date, resolution):
+        """Read the rollup table for a past day
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        resolution : int
+            The rollup resolution (seconds)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rollup table, or None if no data exist for the date
+        """
+        if not self._ensure_rollup(date):
+            return None
+        return self.storage.day_cache.read(
+            self._rollup_path(date), hdu=rollup.RESOLUTIONS[resolution]
+        )
+
+    def _ensure_rollup(self, date, verify=False):
+        """Make sure the rollup file for a past day exists
+
+        If the rollup file does not exist (e.g., for days recorded before
+        rollups were introduced), it is computed from the day's readings and
+        written to disk.
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        verify : bool, optional
+            Also check that the file is complete, rewriting it from the
+            day's readings if not (e.g., before they are deleted)
+            (Default: False)
+
+        Returns
+        -------
+        bool
+            Whether the (complete, if ``verify``) rollup file exists (False
+            if there are no data)
+        """
+        path = self._rollup_path(date)
+        if not path.exists() or (verify and not rollup.is_complete(path)):
+            raw = self.storage.read_day(date)
+            if raw is None:
+                return False
+            rollup.RollupSet.from_table(raw, self.quality.mask).write(path)
+            if verify:
+                return rollup.is_complete(path)
+        return True
+
+    def query_historical(self, lookback=1, columns=None):
+        """Create an incremental query of the historical data
+
+        Parameters
+        ----------
+        lookback : int, optional
+            Number of days to look back (Default: 1)
+        columns : list of str, optional
+            The columns to hold in the window (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`HistoricalQuery`
+            The query handle; call its ``update()`` method to retrieve data
+        """
+        return HistoricalQuery(self, lookback, columns=columns)
+
+    def rows_since(self, start: datetime.datetime, include_today=True, columns=None):
+        """Collect the rows recorded after ``start`` into a single Table
+
+        The readings flagged as spurious are not masked.
+
+        Parameters
+        ----------
+        start : :obj:`datetime.datetime`
+            Only rows recorded after this time are returned
+        include_today : bool, optional
+            Include the current day's table from memory?  (Default: True)
+        columns : list of str, optional
+            The columns to retrieve (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table`
+            The Table of data, sorted by ``epoch``
+        """
+        # Make sure any day still being written in the background is on disk
+        self.wait_for_day_write()
+        cutoff = datetime_to_epoch(start) + 1
+        # The quality bitmask is needed to clean any projection
+        if columns is not None:
+            columns = list(columns) + [quality.QUALITY_COLUMN]
+
+        # Storage that also holds today's rows answers with a single query
+        if include_today and self.storage.holds_today:
+            hist_table = self.storage.read_range(start=cutoff, columns=columns)
+            if hist_table is None:
+                return self._day.as_table(start=len(self._day), columns=columns)
+            return hist_table
+
+        # Otherwise, read the days before today and add today's table
+        today = datetime_to_epoch(datetime.datetime.strptime(self._date, "%Y%m%d"))
+        tail = None
+        if include_today and self._day:
+            tail = self._day.as_table(columns=columns)
+            tail = tail[tail["epoch"] >= cutoff]
+        hist_table = self.storage.read_range(
+            start=cutoff, stop=today, columns=columns, tail=tail
+        )
+        self.logger.debug("Day-table cache: %s", self.storage.day_cache.stats)
+        if hist_table is None:
+            return self._day.as_table(start=len(self._day), columns=columns)
+        return hist_table
+
+    def rows_after(self, cursor):
+        """Return the rows added to the database since a :attr:`cursor`
+
+        Handles the day rollover in ``add_row_to_table`` by finishing off the
+        previous day's table before starting on the new one.
+
+        Parameters
+        ----------
+        cursor : tuple
+            The :attr:`cursor` after the last row already seen
+
+        Returns
+        -------
+        list of dict or None
+            Dictionaries of column name / array view pairs, or None if the
+            cursor is more than a day behind the database
+        """
+        date, n_seen = cursor
+        if date == self._date:
+            return [self._day.tail(n_seen)]
+        if date == self._previous_date:
+            return [self._previous_day.tail(n_seen), self._day.tail(0)]
+        return None
+
+
+class HistoricalQuery:
+    """Incremental query of the historical data over a sliding window
+
+    Rather than retrieving the whole lookback window each time, the query
+    remembers the last row it returned.  Each call to :meth:`update` gives
+    back only the rows added to the database since the previous call, plus
+    the number of rows that have fallen off the front of the window.  The
+    current window is kept in a :obj:`ColumnBuffer` (``window``) so that
+    callers can plot it without copying.
+
+    Parameters
+    ----------
+    database : :obj:`ChickenDatabase`
+        The database to query
+    lookback : int, optional
+        Number of days to look back (Default: 1)
+    columns : list of str, optional
+        The columns to hold in the window (``epoch`` is always included)
+        (Default: None, all columns)
+    """
 
-        # Stack up the historical tables
-        hist_table = astropy.table.Table()
-        while historical < now:
-            filename = utils.Paths.data.joinpath(
-                f"coop_{historical.strftime('%Y%m%d')}.fits"
+    def __init__(self, database: ChickenDatabase, lookback=1, columns=None):
+        self.database = database
+        self.lookback = lookback
+        self.columns = columns
+        self.window = None
+
+        # The database's cursor at the last update
+        self._cursor = (None, 0)
+
+    @property
+    def timestamps(self):
+        """The ``datetime64[s]`` timestamps of the rows in the window
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The timestamps (a view into the window, no copy is made)
+        """
+        return epoch_to_datetime64(self.window.column("epoch"))
+
+    def update(self, lookback=None):
+        """Bring the window up to date with the database
+
+        If the lookback is shortened, rows are simply dropped from the front
+        of the window.  If it is lengthened, only the older rows are read in
+        and prepended; in that case (and if the window has to be rebuilt),
+        ``new_rows`` contains the entire window and ``n_dropped`` is the
+        number of rows previously held.
+
+        Parameters
+        ----------
+        lookback : int, optional
+            New number of days to look back.  If None, keep the current value.
+            (Default: None)
+
+        Returns
+        -------
+        new_rows : :obj:`astropy.table.Table`
+            The rows appended to the end of the window
+        n_dropped : int
+            The number of rows dropped from the front of the window
+        """
+        extend = lookback is not None and lookback > self.lookback
+        if lookback is not None:
+            self.lookback = lookback
+        start = datetime.datetime.now() - datetime.timedelta(days=self.lookback)
+
+        # Rebuild the window if there is nothing to extend
+        if self.window is None or (extend and not self.window):
+            return self._rebuild(start)
+        n_old = len(self.window)
+
+        # Prepend older rows if the lookback grew
+        if extend:
+            older = self.database.rows_since(
+                start, include_today=False, columns=self.columns
             )
-            # Only try to read in the file if it exists
-            if filename.exists():
-                hist_table = astropy.table.vstack(
-                    [hist_table, astropy.table.Table.read(filename)]
+            older = older[older["epoch"] < self.window.column("epoch")[0]]
+            if older:
+                self.database.quality.mask(older)
+                window = ColumnBuffer.from_table(
+                    older, capacity=len(older) + self.window.capacity
                 )
-            historical += datetime.timedelta(days=1)
+                window.extend(self.window.tail(0))
+                self.window = window
+            else:
+                extend = False
+
+        # Append the rows added to the database since the last update
+        new_parts = self.database.rows_after(self._cursor)
+        self._cursor = self.database.cursor
+        if new_parts is None:
+            return self._rebuild(start)
+        n_new = 0
+        for rows in new_parts:
+            self.window.extend(rows)
+            n_new += len(rows["epoch"])
+        self.database.quality.mask(self.window.tail(len(self.window) - n_new))
+
+        # Drop the rows that have fallen out of the window
+        n_dropped = np.searchsorted(
+            self.window.column("epoch"), datetime_to_epoch(start), side="right"
+        )
+        self.window.drop_front(n_dropped)
+
+        if extend:
+            return self.window.as_table(), n_old
+        return self.window.as_table(start=len(self.window) - n_new), int(n_dropped)
+
+    def _rebuild(self, start: datetime.datetime):
+        """Rebuild the window from scratch
 
-        # Finally, add the current table in memory
-        hist_table = (
-            astropy.table.vstack([hist_table, self.table]) if hist_table else self.table
+        Parameters
+        ----------
+        start : :obj:`datetime.datetime`
+            The start of the window
+
+        Returns
+        -------
+        new_rows : :obj:`astropy.table.Table`
+            The entire window
+        n_dropped : int
+            The number of rows previously held
+        """
+        n_old = len(self.window) if self.window is not None else 0
+        table = self.database.rows_since(start, columns=self.columns)
+        self.database.quality.mask(table)
+        self.window = ColumnBuffer.from_table(table, capacity=len(table) + ROWS_PER_DAY)
+        self._cursor = self.database.cursor
+        return table, n_old
+
+
+class ColumnBuffer:
+    """Preallocated columnar storage for a day of readings
+
+    Each column is held in a NumPy array sized for a full day of readings at
+    the sampling cadence.  Appending a row writes into the next free slot of
+    each array, so the cost of an append does not depend on the number of
+    rows already stored.  Should the buffer fill, the arrays are grown
+    geometrically.
+
+    String columns are held as ``object`` arrays and are only converted to a
+    fixed-width unicode dtype when an :obj:`astropy.table.Table` view of the
+    buffer is requested.
+
+    Rows may also be dropped from the front of the buffer (for a sliding time
+    window); the freed space is reclaimed when at least half of the buffer is
+    unused, so both ends are amortized O(1).
+
+    Parameters
+    ----------
+    names : list of str
+        The column names
+    dtypes : list of type
+        The data type for each column (e.g., ``str``, ``float``, ``bool``)
+    capacity : int, optional
+        The number of rows to preallocate (Default: ``ROWS_PER_DAY``)
+    """
+
+    # Values for columns missing from an appended row, keyed by dtype kind
+    _FILL = {"f": np.nan, "b": False, "i": 0, "u": 0, "O": ""}
+
+    def __init__(self, names, dtypes, capacity=ROWS_PER_DAY):
+        self.names = list(names)
+        self.capacity = max(int(capacity), 1)
+        self.n_rows = 0
+        self._start = 0
+        self._columns = {
+            name: np.empty(
+                self.capacity,
+                dtype=object if dtype is str else np.dtype(dtype).newbyteorder("="),
+            )
+            for name, dtype in zip(self.names, dtypes)
+        }
+
+    def __len__(self):
+        return self.n_rows - self._start
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    @property
+    def dtypes(self):
+        """The NumPy dtype of each column (``object`` for strings)
+
+        Returns
+        -------
+        list of :obj:`numpy.dtype`
+            The column dtypes, in the order of ``names``
+        """
+        return [self._columns[name].dtype for name in self.names]
+
+    @classmethod
+    def from_table(cls, table: astropy.table.Table, capacity=ROWS_PER_DAY):
+        """Create a buffer holding the contents of an existing Table
+
+        Parameters
+        ----------
+        table : :obj:`astropy.table.Table`
+            The Table whose rows should be loaded into the buffer
+        capacity : int, optional
+            The minimum number of rows to preallocate (Default: ``ROWS_PER_DAY``)
+
+        Returns
+        -------
+        :obj:`ColumnBuffer`
+            The populated buffer
+        """
+        buffer = cls(
+            table.colnames,
+            [
+                str if table[name].dtype.kind in "SU" else table[name].dtype
+                for name in table.colnames
+            ],
+            capacity=max(capacity, len(table)),
         )
+        for name in buffer.names:
+            data = np.asarray(table[name])
+            if data.dtype.kind == "S":
+                data = np.char.decode(data)
+            buffer._columns[name][: len(table)] = data
+        buffer.n_rows = len(table)
+        return buffer
 
-        # If `hist_table` is empty, return now
-        if not hist_table:
-            return [], hist_table
-
-        # Create timestamps from the ``date`` and ``time`` columns
-        hist_table["timestamps"] = [
-            datetime.datetime.fromisoformat(f"{d} {t}")
-            for d, t in zip(hist_table["date"], hist_table["time"])
-        ]
-        # Sort the table on the timestamp column (should already be okay, but...)
-        hist_table.sort("timestamps")
-
-        # Cull the historical table by the exact lookback
-        cutoff = now - datetime.timedelta(days=lookback)
-        hist_table = hist_table[hist_table["timestamps"] > cutoff]
-
-        # Next, remove spurious data by converting to NaN
-        for tempval in [
-            col for col in hist_table.colnames if ("temp" in col or "humid" in col)
-        ]:
-            hist_table[tempval][hist_table[tempval] < -20] = np.nan
-        hist_table["light_lux"][hist_table["light_lux"] < 0.05] = np.nan
-
-        return hist_table["timestamps"], hist_table
+    def append(self, row: dict):
+        """Append a row to the end of the buffer
+
+        Parameters
+        ----------
+        row : dict
+            Dictionary of column name / value pairs.  Columns missing from the
+            dictionary are filled with a default value; extra keys are ignored.
+        """
+        if self.n_rows == self.capacity:
+            self._make_room(1)
+        for name, column in self._columns.items():
+            column[self.n_rows] = row.get(name, self._FILL[column.dtype.kind])
+        self.n_rows += 1
+
+    def extend(self, columns: dict):
+        """Append many rows to the end of the buffer at once
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of column name / array pairs, all of the same length.
+            Columns missing from the dictionary are filled with a default
+            value; extra keys are ignored.
+        """
+        n_new = len(next(iter(columns.values()), []))
+        if not n_new:
+            return
+        if self.n_rows + n_new > self.capacity:
+            self._make_room(n_new)
+        for name, column in self._columns.items():
+            column[self.n_rows : self.n_rows + n_new] = columns.get(
+                name, self._FILL[column.dtype.kind]
+            )
+        self.n_rows += n_new
+
+    def column(self, name):
+        """Return a view of the filled portion of a column
+
+        Parameters
+        ----------
+        name : str
+            The column name
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            View into the column array (no copy is made)
+        """
+        return self._columns[name][self._start : self.n_rows]
+
+    def tail(self, start):
+        """Return views of all columns from row ``start`` onward
+
+        Parameters
+        ----------
+        start : int
+            The index of the first row to return
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / :obj:`numpy.ndarray` view pairs
+        """
+        return {
+            name: column[self._start + start : self.n_rows]
+            for name, column in self._columns.items()
+        }
+
+    def drop_front(self, n_drop):
+        """Drop rows from the front of the buffer
+
+        Parameters
+        ----------
+        n_drop : int
+            The number of rows to drop
+        """
+        self._start += min(int(n_drop), len(self))
+
+    def as_table(self, start=0, columns=None):
+        """Return a copy of the buffer contents as an AstroPy Table
+
+        Parameters
+        ----------
+        start : int, optional
+            The index of the first row to include (Default: 0)
+        columns : list of str, optional
+            The columns to include (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table`
+            The Table containing the rows in the buffer
+        """
+        names = storage.project(self.names, columns)
+        data = self.tail(start)
+        return astropy.table.Table(
+            [
+                (
+                    data[name].astype(str)
+                    if data[name].dtype.kind == "O"
+                    else data[name].copy()
+                )
+                for name in names
+            ],
+            names=names,
+            copy=False,
+        )
+
+    def _make_room(self, n_new):
+        """Make room at the end of the buffer for ``n_new`` more rows
+
+        Rows dropped from the front are reclaimed if they make up at least
+        half of the buffer; otherwise the arrays are grown geometrically.
+
+        Parameters
+        ----------
+        n_new : int
+            The number of rows that need to fit
+        """
+        n_keep = len(self)
+        capacity = self.capacity
+        if self._start < capacity // 2:
+            capacity *= 2
+        while n_keep + n_new > capacity:
+            capacity *= 2
+        for name, column in self._columns.items():
+            moved = np.empty(capacity, dtype=column.dtype)
+            moved[:n_keep] = column[self._start : self.n_rows]
+            self._columns[name] = moved
+        self.capacity = capacity
+        self._start = 0
+        self.n_rows = n_keep
 
 
 class OperationalSettings:
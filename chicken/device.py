@@ -10,7 +10,11 @@ Control classes for the hardware devices on the Chicken Pi
 
 # Built-In Libraries
 from abc import abstractmethod
+import contextlib
 import datetime
+import logging
+import os
+import threading
 import time
 
 # 3rd Party Libraries
@@ -31,8 +35,30 @@ from chicken import utils
 
 # Module Constants
 TEMPHUMID_RESET_HOURS = 24
-
-__all__ = ["set_up_devices"]
+CPU_TEMP_FILE = "/sys/class/thermal/thermal_zone0/temp"
+# TSL2591 (gain, gain factor, integration time, ms), by increasing sensitivity
+TSL2591_SETTINGS = [
+    (adafruit_tsl2591.GAIN_LOW, 1.0, adafruit_tsl2591.INTEGRATIONTIME_100MS, 100),
+    (adafruit_tsl2591.GAIN_MED, 25.0, adafruit_tsl2591.INTEGRATIONTIME_100MS, 100),
+    (adafruit_tsl2591.GAIN_HIGH, 428.0, adafruit_tsl2591.INTEGRATIONTIME_100MS, 100),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_100MS, 100),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_200MS, 200),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_300MS, 300),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_400MS, 400),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_500MS, 500),
+    (adafruit_tsl2591.GAIN_MAX, 9876.0, adafruit_tsl2591.INTEGRATIONTIME_600MS, 600),
+]
+TSL2591_DEFAULT_SETTING = 1  # The driver's default, medium gain and 100 ms
+TSL2591_MAX_ATTEMPTS = 3
+TSL2591_MIN_COUNTS = 256  # Fewer counts than this are too imprecise
+TSL2591_TARGET_FRACTION = 0.5  # Aim for half of full scale when re-ranging
+# Lux coefficients (as in the Adafruit TSL2591 libraries)
+TSL2591_LUX_DF = 408.0
+TSL2591_LUX_COEFB = 1.64
+TSL2591_LUX_COEFC = 0.59
+TSL2591_LUX_COEFD = 0.86
+
+__all__ = ["set_up_devices", "I2CBusManager", "I2C_BUSES"]
 
 
 def set_up_devices():
@@ -95,87 +121,504 @@ def set_up_devices():
     }, relays
 
 
+# ============================================================================#
+# I2C bus manager:
+
+
+class I2CBusManager:
+    """Shared handles and per-bus serialization for the I2C buses
+
+    Each I2C bus is opened once, and the handle is shared by all of the
+    devices on it.  A sensor reading is several I2C transfers (command, wait,
+    read) that must not be interleaved with another device's, so a lock for
+    each bus serializes the transactions on that bus, while the separate
+    buses run in parallel.  The lock is re-entrant, so that a batch of
+    readings may hold the bus for all of them (see :meth:`batch`).  A device
+    waiting on itself (e.g., for a light integration) hands the bus back for
+    the wait (see :meth:`released`), even within a batch.
+
+    The time each bus is held (and waited for) is recorded, giving the bus
+    utilization and transaction latency (see :meth:`stats`).
+    """
+
+    def __init__(self):
+        self._handles = {}
+        self._locks = {}
+        self._depth = {}
+        self._owner = {}
+        self._idle = {}
+        self._stats = {}
+        self._guard = threading.Lock()
+        self._since = time.monotonic()
+
+    def _lock(self, bus):
+        """Return the lock for a bus, setting up its bookkeeping if new
+
+        Parameters
+        ----------
+        bus : int
+            The I2C bus number
+
+        Returns
+        -------
+        :obj:`threading.RLock`
+            The bus lock
+        """
+        with self._guard:
+            if bus not in self._locks:
+                self._locks[bus] = threading.RLock()
+                self._depth[bus] = 0
+                self._owner[bus] = None
+                self._idle[bus] = 0.0
+                self._stats[bus] = {
+                    "transactions": 0,
+                    "operations": 0,
+                    "busy": 0.0,
+                    "wait": 0.0,
+                    "max_latency": 0.0,
+                    "max_wait": 0.0,
+                }
+            return self._locks[bus]
+
+    def handle(self, bus):
+        """Return the (shared) handle for an I2C bus, opening it if needed
+
+        Parameters
+        ----------
+        bus : int
+            The I2C bus number
+
+        Returns
+        -------
+        :obj:`adafruit_extended_bus.ExtendedI2C`
+            The bus handle
+        """
+        self._lock(bus)
+        with self._guard:
+            if bus not in self._handles:
+                self._handles[bus] = adafruit_extended_bus.ExtendedI2C(bus)
+            return self._handles[bus]
+
+    @contextlib.contextmanager
+    def transaction(self, bus, operations=1):
+        """Hold a bus for the duration of a ``with`` block
+
+        Nested transactions on the same bus (in the same thread) are part of
+        the outermost one, which alone is counted in the statistics.  Any
+        time the bus was :meth:`released` is not counted as busy.
+
+        Parameters
+        ----------
+        bus : int
+            The I2C bus number
+        operations : int, optional
+            The number of device operations (e.g., readings) in the
+            transaction (Default: 1)
+        """
+        lock = self._lock(bus)
+        t_0 = time.perf_counter()
+        with lock:
+            depth = self._depth[bus]
+            self._depth[bus] = depth + 1
+            if depth == 0:
+                self._owner[bus] = threading.get_ident()
+                idle_0 = self._idle[bus]
+            t_1 = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._depth[bus] = depth
+                if depth == 0:
+                    self._owner[bus] = None
+                    # Still holding the bus, so the update is serialized
+                    latency = time.perf_counter() - t_1
+                    latency -= self._idle[bus] - idle_0
+                    stats = self._stats[bus]
+                    stats["transactions"] += 1
+                    stats["operations"] += operations
+                    stats["busy"] += latency
+                    stats["wait"] += t_1 - t_0
+                    stats["max_latency"] = max(stats["max_latency"], latency)
+                    stats["max_wait"] = max(stats["max_wait"], t_1 - t_0)
+
+    @contextlib.contextmanager
+    def released(self, bus):
+        """Let go of a bus held by this thread for a ``with`` block
+
+        This is for a wait within a transaction (e.g., for a sensor to
+        integrate), so that the other devices on the bus may be used in the
+        meantime.  The transaction, however deeply nested, resumes once the
+        bus is free again.  Outside of a transaction, this does nothing.
+
+        Parameters
+        ----------
+        bus : int
+            The I2C bus number
+        """
+        lock = self._lock(bus)
+        if self._owner[bus] != threading.get_ident():
+            yield
+            return
+        depth = self._depth[bus]
+        t_0 = time.perf_counter()
+        self._depth[bus], self._owner[bus] = 0, None
+        for _ in range(depth):
+            lock.release()
+        try:
+            yield
+        finally:
+            for _ in range(depth):
+                lock.acquire()
+            self._depth[bus], self._owner[bus] = depth, threading.get_ident()
+            self._idle[bus] += time.perf_counter() - t_0
+
+    def batch(self, bus, operations):
+        """Run several operations on a bus back to back, in one transaction
+
+        Parameters
+        ----------
+        bus : int
+            The I2C bus number
+        operations : list of callable
+            The operations (e.g., sensor readings) to run
+
+        Returns
+        -------
+        list
+            The return value of each operation
+        """
+        with self.transaction(bus, operations=len(operations)):
+            return [operation() for operation in operations]
+
+    def stats(self):
+        """Return the utilization and latency statistics for each bus
+
+        Returns
+        -------
+        dict
+            Dictionary of bus number / statistics dictionary pairs, giving the
+            number of ``transactions`` and ``operations``, the
+            ``utilization`` (fraction of the time the bus was held), and the
+            mean and maximum transaction ``latency`` and lock ``wait``
+            (seconds)
+        """
+        elapsed = max(time.monotonic() - self._since, 1e-9)
+        with self._guard:
+            stats = {bus: dict(values) for bus, values in self._stats.items()}
+        return {
+            bus: {
+                "transactions": values["transactions"],
+                "operations": values["operations"],
+                "utilization": values["busy"] / elapsed,
+                "mean_latency": values["busy"] / max(values["transactions"], 1),
+                "max_latency": values["max_latency"],
+                "mean_wait": values["wait"] / max(values["transactions"], 1),
+                "max_wait": values["max_wait"],
+            }
+            for bus, values in stats.items()
+        }
+
+    def reset_stats(self):
+        """Start the statistics afresh"""
+        with self._guard:
+            for stats in self._stats.values():
+                stats.update(dict.fromkeys(stats, 0))
+            self._since = time.monotonic()
+
+
+# The I2C bus manager shared by all of the devices
+I2C_BUSES = I2CBusManager()
+
+
 # ============================================================================#
 # Device classes:
 
 
+class SensorBase:
+    """Base Sensor Class
+
+    This base class lets the database aggregate every sample taken from a
+    sensor, not just the cached value at the top of the minute.  The database
+    fills ``recorders`` with a callable for each quantity (e.g., ``"temp"``)
+    measured by the sensor, and the sensor passes each fresh reading to
+    :meth:`_record`.
+    """
+
+    def __init__(self):
+        self.recorders = {}
+
+    def _record(self, quantity, value):
+        """Pass a fresh reading to the database, if it is listening
+
+        Parameters
+        ----------
+        quantity : str
+            The quantity measured (e.g., ``"temp"``, ``"humid"``, ``"lux"``)
+        value : float
+            The reading
+        """
+        recorder = self.recorders.get(quantity)
+        if recorder is not None:
+            recorder(value)
+
+
 # Implementation of the TSL2591 for the chicken-pi
-class TSL2591:
+class TSL2591(SensorBase):
     """Chicken-Pi Class for the TSL2591 luminosity sensor
 
-    [extended_summary]
+    The sensor is auto-ranged over the gain / integration time settings in
+    ``TSL2591_SETTINGS`` (see :meth:`read`); the setting used for the latest
+    reading is reported in :attr:`last_read`.
+
+    Parameters
+    ----------
+    bus : int, optional
+        The I2C bus on which this device is connected (Default: 3)
+    buses : :obj:`I2CBusManager`, optional
+        The I2C bus manager (Default: None, the shared ``I2C_BUSES``)
     """
 
-    def __init__(self, bus=3):
-        # Initialize the I2C bus.
-        self._i2c = adafruit_extended_bus.ExtendedI2C(bus)
+    def __init__(self, bus=3, buses=None):
+        super().__init__()
+
+        # Use the shared handle for the I2C bus
+        self.bus = bus
+        self.buses = buses or I2C_BUSES
+        self._i2c = self.buses.handle(bus)
+
+        # Define the attributes here
+        self._lux = -999
+        self._read_time = 0.0
+        self._setting = None
+        self._next_setting = TSL2591_DEFAULT_SETTING
+        self.last_read = {}
 
         # Initialize the sensor.
         try:
             self._sensor = adafruit_tsl2591.TSL2591(self._i2c)
         except ValueError:
             self._sensor = None
-
-        # Define the attribute here
-        self._lux = -999
+        else:
+            with self.buses.transaction(self.bus):
+                self._set_setting(TSL2591_DEFAULT_SETTING)
 
     # Define functions to increase or decrease the gain
     def decrease_gain(self):
-        """Decrease the gain of the TSL2591 sensor
+        """Decrease the sensitivity of the TSL2591 sensor by one setting
 
-        [extended_summary]
+        Steps down the integration time at maximum gain, else the gain.
         """
-        if self._sensor.gain == adafruit_tsl2591.GAIN_MAX:
-            self._sensor.gain = adafruit_tsl2591.GAIN_HIGH
-        elif self._sensor.gain == adafruit_tsl2591.GAIN_HIGH:
-            self._sensor.gain = adafruit_tsl2591.GAIN_MED
-        elif self._sensor.gain == adafruit_tsl2591.GAIN_MED:
-            self._sensor.gain = adafruit_tsl2591.GAIN_LOW
+        with self.buses.transaction(self.bus):
+            self._set_setting(max(self._setting - 1, 0))
+        self._next_setting = self._setting
 
     def increase_gain(self):
-        """Increase the gain of the TSL2591 sensor
+        """Increase the sensitivity of the TSL2591 sensor by one setting
 
-        [extended_summary]
+        Steps up the gain, then the integration time once at maximum gain.
         """
-        if self._sensor.gain == adafruit_tsl2591.GAIN_HIGH:
-            self._sensor.gain = adafruit_tsl2591.GAIN_MAX
-        elif self._sensor.gain == adafruit_tsl2591.GAIN_MED:
-            self._sensor.gain = adafruit_tsl2591.GAIN_HIGH
-        elif self._sensor.gain == adafruit_tsl2591.GAIN_LOW:
-            self._sensor.gain = adafruit_tsl2591.GAIN_MED
+        with self.buses.transaction(self.bus):
+            self._set_setting(min(self._setting + 1, len(TSL2591_SETTINGS) - 1))
+        self._next_setting = self._setting
 
     def read(self):
         """Read the TSL2591 sensor
 
-        [extended_summary]
+        The gain and integration time are auto-ranged.  The counts scale with
+        the gain times the integration time, so the setting for each reading
+        is predicted from the counts of the previous one; a typical reading
+        is then a single read of the channels, with no change of setting (and
+        so no wait for a fresh integration).  A reading that saturates, or is
+        too dim to be precise, is retaken at the setting predicted from it,
+        up to ``TSL2591_MAX_ATTEMPTS`` times in all.
+
+        The setting used, the number of attempts and the raw counts are
+        reported in :attr:`last_read`.
 
         Returns
         -------
         float
-            The calculated light level in LUX
+            The calculated light level in LUX; if no good reading could be
+            taken, the cached value
         """
-        good_read = False
+        if self._sensor is None:
+            self._lux = None
+            return self._lux
 
-        # Read and calculate the light level in lux.
-        while not good_read:
+        setting = self._next_setting
+        reading = None
+        for attempt in range(1, TSL2591_MAX_ATTEMPTS + 1):
             try:
-                # Infrared levels range from 0-65535 (16-bit)
-                infrared = self._sensor.infrared
-                # Visible-only levels range from 0-2147483647 (32-bit)
-                visible = self._sensor.visible
-                if infrared < 256 and visible < 256:
-                    self.increase_gain()
-                else:
-                    self._lux = self._sensor.lux
-                    good_read = True
-            except RuntimeError:
-                self.decrease_gain()
-            except AttributeError:
-                self._lux = None
-                good_read = True
-
+                channel_0, channel_1 = self._read_counts(setting)
+            except (RuntimeError, OSError):
+                continue
+            reading = (setting, channel_0, channel_1)
+            next_setting = self._range(setting, channel_0, channel_1)
+            if next_setting == setting:
+                break
+            setting = next_setting
+        self._next_setting = setting
+
+        if reading is None:
+            self.last_read = {"attempts": attempt}
+            return self._lux
+        gain, integration_ms = TSL2591_SETTINGS[reading[0]][1::2]
+        self.last_read = {
+            "gain": gain,
+            "integration_ms": integration_ms,
+            "attempts": attempt,
+            "counts": reading[1:],
+        }
+        # A saturated reading has no meaningful lux
+        if self._saturated(*reading):
+            return self._lux
+
+        self._lux = self.counts_to_lux(*reading)
+        self._read_time = time.time()
+        self._record("lux", self._lux)
         return self._lux
 
+    def read_lux(self):
+        """Read the light level, with the time it was measured
+
+        Returns
+        -------
+        lux : float
+            The light level in LUX (see :meth:`read`)
+        timestamp : float
+            The time of the measurement (seconds since the epoch); if no good
+            reading could be taken, the time of the cached value
+        """
+        lux = self.read()
+        return lux, self._read_time
+
+    def _set_setting(self, setting):
+        """Write a gain / integration time setting to the sensor
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS``
+        """
+        gain, _, integration_time, _ = TSL2591_SETTINGS[setting]
+        self._sensor.gain = gain
+        self._sensor.integration_time = integration_time
+        self._setting = setting
+
+    def _read_counts(self, setting):
+        """Read both channels at a given setting
+
+        If the setting must be changed, the read waits for the integration
+        in progress and one complete integration at the new setting, with the
+        bus released for the other devices meanwhile.
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS``
+
+        Returns
+        -------
+        tuple of int
+            The counts of channel 0 (full spectrum) and 1 (infrared)
+        """
+        if setting != self._setting:
+            with self.buses.transaction(self.bus):
+                self._set_setting(setting)
+            with self.buses.released(self.bus):
+                time.sleep(2 * TSL2591_SETTINGS[setting][3] / 1000)
+        with self.buses.transaction(self.bus):
+            return self._sensor.raw_luminosity
+
+    @staticmethod
+    def _max_counts(setting):
+        """Return the full-scale counts of a setting
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS``
+
+        Returns
+        -------
+        int
+            The full-scale counts (smaller for the 100 ms integration)
+        """
+        return 36863 if TSL2591_SETTINGS[setting][3] == 100 else 65535
+
+    def _saturated(self, setting, channel_0, channel_1):
+        """Whether a reading saturated either channel
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS``
+        channel_0, channel_1 : int
+            The counts of the two channels
+
+        Returns
+        -------
+        bool
+            True if the reading is saturated
+        """
+        max_counts = self._max_counts(setting)
+        return channel_0 >= max_counts or channel_1 >= max_counts
+
+    def _range(self, setting, channel_0, channel_1):
+        """Predict the best setting for the light level of a reading
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS`` of the reading
+        channel_0, channel_1 : int
+            The counts of the two channels
+
+        Returns
+        -------
+        int
+            The setting for the next reading; the same setting if the reading
+            is good
+        """
+        sensitivity = TSL2591_SETTINGS[setting][1] * TSL2591_SETTINGS[setting][3]
+        if self._saturated(setting, channel_0, channel_1):
+            # The true counts are at least full scale: cut by at least 10x
+            counts = 10 * self._max_counts(setting)
+        elif channel_0 < TSL2591_MIN_COUNTS and setting < len(TSL2591_SETTINGS) - 1:
+            counts = max(channel_0, 1)
+        else:
+            return setting
+
+        # The most sensitive setting predicted to stay within the target
+        best = 0
+        for i, (_, gain, _, integration_ms) in enumerate(TSL2591_SETTINGS):
+            predicted = counts * gain * integration_ms / sensitivity
+            if predicted <= TSL2591_TARGET_FRACTION * self._max_counts(i):
+                best = i
+        return best
+
+    @staticmethod
+    def counts_to_lux(setting, channel_0, channel_1):
+        """Calculate the light level from the counts of a reading
+
+        Parameters
+        ----------
+        setting : int
+            The index into ``TSL2591_SETTINGS`` of the reading
+        channel_0, channel_1 : int
+            The counts of channel 0 (full spectrum) and 1 (infrared)
+
+        Returns
+        -------
+        float
+            The light level in LUX
+        """
+        _, gain, _, integration_ms = TSL2591_SETTINGS[setting]
+        cpl = integration_ms * gain / TSL2591_LUX_DF
+        lux1 = (channel_0 - TSL2591_LUX_COEFB * channel_1) / cpl
+        lux2 = (TSL2591_LUX_COEFC * channel_0 - TSL2591_LUX_COEFD * channel_1) / cpl
+        return max(lux1, lux2, 0.0)
+
     @property
     def level(self):
         """level Return the light level as a class attribute
@@ -216,7 +659,7 @@ class TSL2591:
         return self.cache_level
 
 
-class TempHumid:
+class TempHumid(SensorBase):
     """Chicken-Pi Class for the various temp/humid sensors
 
     [extended_summary]
@@ -227,13 +670,18 @@ class TempHumid:
         The Temp/Humid sensor type to set up
     bus : int, optional
         The I2C bus on which this device is connected (Default: 1)
+    buses : :obj:`I2CBusManager`, optional
+        The I2C bus manager (Default: None, the shared ``I2C_BUSES``)
     """
 
-    def __init__(self, senstyp: str, bus=1):
+    def __init__(self, senstyp: str, bus=1, buses=None):
+        super().__init__()
         self.senstyp = senstyp
 
-        # Load the appropriate I2C Bus
-        self._i2c = adafruit_extended_bus.ExtendedI2C(bus)
+        # Use the shared handle for the appropriate I2C Bus
+        self.bus = bus
+        self.buses = buses or I2C_BUSES
+        self._i2c = self.buses.handle(bus)
 
         # Load the appropriate sensor class
         if senstyp == "SHT30":
@@ -246,6 +694,7 @@ class TempHumid:
         # Internal variables
         self._temp = -99
         self._relh = -99
+        self._read_time = 0.0
         self._last_reset = datetime.datetime.now()
 
     @property
@@ -259,14 +708,17 @@ class TempHumid:
         float
             The requested temperature (ºF)
         """
-        # Reset the sensor, if necessary
-        self.reset_sensor()
+        with self.buses.transaction(self.bus):
+            # Reset the sensor, if necessary
+            self.reset_sensor()
 
-        try:
-            self._temp = self.sensor.temperature * 9.0 / 5.0 + 32.0
-            return self._temp
-        except (RuntimeError, OSError):
-            return self.cache_temp
+            try:
+                self._temp = self.sensor.temperature * 9.0 / 5.0 + 32.0
+            except (RuntimeError, OSError):
+                return self.cache_temp
+        self._read_time = time.time()
+        self._record("temp", self._temp)
+        return self._temp
 
     @property
     def humid(self):
@@ -280,10 +732,57 @@ class TempHumid:
             The requested humidity (%)
         """
         try:
-            self._relh = self.sensor.relative_humidity
-            return self._relh
+            with self.buses.transaction(self.bus):
+                self._relh = self.sensor.relative_humidity
         except (RuntimeError, OSError):
             return self.cache_humid
+        self._read_time = time.time()
+        self._record("humid", self._relh)
+        return self._relh
+
+    def read_temp_humid(self):
+        """Measure the temperature and humidity in a single conversion
+
+        Both sensor types return the temperature and humidity from the same
+        conversion, so taking them together needs half the I2C traffic (and
+        conversion waits) of reading :attr:`temp` and :attr:`humid` in turn.
+
+        Returns
+        -------
+        temp : float
+            The temperature (ºF)
+        humid : float
+            The relative humidity (%)
+        timestamp : float
+            The time of the measurement (seconds since the epoch); if the
+            sensor could not be read, the cached values and their time
+        """
+        with self.buses.transaction(self.bus):
+            # Reset the sensor, if necessary
+            self.reset_sensor()
+
+            try:
+                if self.senstyp == "SHT30":
+                    temp, humid = self.sensor.measurements
+                else:
+                    # The public AHTx0 properties (``temperature`` and
+                    #  ``relative_humidity``) each trigger their own
+                    #  conversion, and the driver has no public way to read
+                    #  both from one.  So the conversion is run directly and
+                    #  both results read from its private attributes; the
+                    #  driver version is pinned (setup.cfg, requirements.txt)
+                    #  to a release where these exist.
+                    # pylint: disable=protected-access
+                    self.sensor._readdata()
+                    temp, humid = self.sensor._temp, self.sensor._humidity
+            except (RuntimeError, OSError):
+                return self.cache_temp, self.cache_humid, self._read_time
+        self._temp = temp * 9.0 / 5.0 + 32.0
+        self._relh = humid
+        self._read_time = time.time()
+        self._record("temp", self._temp)
+        self._record("humid", self._relh)
+        return self._temp, self._relh, self._read_time
 
     @property
     def cache_temp(self):
@@ -373,14 +872,31 @@ class ChickenDoor:
         """
 
 
-class RPiCPU:
+class RPiCPU(SensorBase):
     """RPiCPU [summary]
 
-    [extended_summary]
+    On Linux, the system temperature file is opened once and re-read in
+    place (with :func:`os.pread`) for each reading.  If the file does not
+    exist (e.g., in a container), a warning is logged and the temperature
+    is NaN.
     """
 
     def __init__(self):
-        pass
+        super().__init__()
+        self._fd = None
+        self._temp = None
+        self._linux = utils.get_system_type() == "Linux"
+        if self._linux:
+            try:
+                self._fd = os.open(CPU_TEMP_FILE, os.O_RDONLY)
+            except OSError as err:
+                logging.getLogger("chicken_log").warning(
+                    "Cannot read the CPU temperature from %s: %s", CPU_TEMP_FILE, err
+                )
+
+    def __del__(self):
+        if self._fd is not None:
+            os.close(self._fd)
 
     @property
     def temp(self):
@@ -393,38 +909,53 @@ class RPiCPU:
         float
             The CPU temperature in ºF, as reported by the system
         """
-        return self.get_cpu_temp()
+        self._temp = self.get_cpu_temp()
+        self._record("temp", self._temp)
+        return self._temp
+
+    @property
+    def cache_temp(self):
+        """Return the cached CPU temperature as a class attribute
+
+        Returns
+        -------
+        float
+            The cached CPU temperature (ºF)
+        """
+        return self._temp
 
     @property
     def data_entry(self):
         """Return the DATA_ENTRY object needed for the database
 
-        [extended_summary]
+        The cached value (kept fresh by the acquisition thread), so that
+        building a database row does not take an extra reading; the sensor is
+        only read if it has not been read yet.
 
         Returns
         -------
         float
             The CPU temperature (ºF)
         """
-        return self.temp
+        return self.temp if self._temp is None else self._temp
 
-    @staticmethod
-    def get_cpu_temp():
+    def get_cpu_temp(self):
         """Read the CPU temperature from system file
 
-        [extended_summary]
+        The sysfs file is regenerated on each read from its start, so
+        reading from offset 0 of the open file gives a fresh value.
 
         Returns
         -------
         float
-            CPU temperature in ºF
+            CPU temperature in ºF (NaN if the file could not be opened; None
+            if not on Linux)
         """
         # Check Pi CPU Temp:
-        if utils.get_system_type() == "Linux":
-            cputemp_fn = "/sys/class/thermal/thermal_zone0/temp"
-            with open(cputemp_fn, "r", encoding="utf-8") as sys_file:
-                return (float(sys_file.read()) / 1000.0) * 9.0 / 5.0 + 32.0
-        return None
+        if self._fd is None:
+            return float("nan") if self._linux else None
+        millidegrees = float(os.pread(self._fd, 16, 0))
+        return (millidegrees / 1000.0) * 9.0 / 5.0 + 32.0
 
 
 # Relay Classes ====================================================#
@@ -499,8 +1030,8 @@ class Old3ARelay(RelayBase):
         """
         super().__init__()
 
-        # Initialize the I2C device
-        self._i2c = adafruit_extended_bus.ExtendedI2C(1)
+        # Initialize the I2C device, on the shared handle for bus #1
+        self._i2c = I2C_BUSES.handle(1)
         self._device = adafruit_bus_device.i2c_device.I2CDevice(self._i2c, address)
 
         self.write()
@@ -517,7 +1048,8 @@ class Old3ARelay(RelayBase):
             List of the control bit + values from the 4 relays
         """
         # Read the current state of the relays
-        self._device.readinto(self._READ_BUF)
+        with I2C_BUSES.transaction(1):
+            self._device.readinto(self._READ_BUF)
         return self._READ_BUF
 
     def write(self):
@@ -529,7 +1061,7 @@ class Old3ARelay(RelayBase):
             self._WRITE_BUF[0] = self._RELAY_COMMAND_BIT
             for i, relay in enumerate(self.state, 1):
                 self._WRITE_BUF[i] = 0xFF if relay else 0x00
-            with self._device as i2c:
+            with I2C_BUSES.transaction(1), self._device as i2c:
                 i2c.write_then_readinto(self._WRITE_BUF, self._READ_BUF)
             self.good_write = True
         except OSError as error:
@@ -9,6 +9,7 @@ Dummy classes for the hardware devices on the Chicken Pi (for testing)
 """
 
 # Built-In Libraries
+import time
 
 # 3rd Party Libraries
 
@@ -54,6 +55,10 @@ class DummyTH:
         self.cache_humid = 99.0
         self.data_entry = (self.cache_temp, self.cache_humid)
 
+    def read_temp_humid(self):
+        """Return the dummy temperature and humidity, with the time now"""
+        return self.temp, self.humid, time.time()
+
 
 class DummyLux:
     """Dummy Lux Sensor Class
@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: export.py
+
+Bulk export of the Chicken-Pi database to CSV, JSON lines or Parquet
+
+The readings are streamed out one day at a time, so that exporting a year of
+data takes no more memory than a single day.  Run as::
+
+    chickenpi export --start 2022-01-01 --end 2022-12-31 -o coop_2022.csv
+
+Either the full-resolution readings or one of the rollup resolutions may be
+exported, with spurious values removed unless ``--keep-spurious`` is given.
+Writing Parquet requires the optional ``pyarrow`` package.
+
+"""
+
+# Built-In Libraries
+import abc
+import contextlib
+import csv
+import datetime
+import json
+import pathlib
+import sys
+
+# 3rd Party Libraries
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import journal
+from chicken import network
+from chicken import quality
+from chicken import rollup
+from chicken import storage
+from chicken import utils
+
+# Module Constants
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+RESOLUTION_NAMES = {"15min": 900, "1hour": 3600, "1day": 86400}
+
+__all__ = ["DayReader", "export_range", "add_export_arguments", "run_export"]
+
+
+class TextExport(abc.ABC):
+    """Stream rows to a text file
+
+    Parameters
+    ----------
+    file_object : file-like
+        The (text) output stream
+    """
+
+    def __init__(self, file_object):
+        self.file_object = file_object
+        self.names = None
+
+    def start(self, columns):
+        """Begin the output
+
+        Parameters
+        ----------
+        columns : dict
+            Column name / :obj:`numpy.dtype` pairs, in output order
+        """
+        self.names = list(columns)
+
+    @abc.abstractmethod
+    def write(self, columns):
+        """Write a batch of rows
+
+        Parameters
+        ----------
+        columns : list of list
+            The values of each column, with None for missing values
+        """
+
+    def close(self):
+        """Finish the output"""
+
+
+class CsvExport(TextExport):
+    """Stream rows to a CSV file
+
+    Missing and NaN values are written as empty fields.
+
+    Parameters
+    ----------
+    file_object : file-like
+        The (text) output stream
+    """
+
+    def __init__(self, file_object):
+        super().__init__(file_object)
+        self.writer = csv.writer(file_object)
+
+    def start(self, columns):
+        """Write the header line
+
+        Parameters
+        ----------
+        columns : dict
+            Column name / :obj:`numpy.dtype` pairs, in output order
+        """
+        super().start(columns)
+        self.writer.writerow(self.names)
+
+    def write(self, columns):
+        self.writer.writerows(
+            ["" if value is None else value for value in row] for row in zip(*columns)
+        )
+
+
+class JsonlExport(TextExport):
+    """Stream rows to a JSON lines file (one object per row)
+
+    Missing and NaN values are written as ``null``.
+
+    Parameters
+    ----------
+    file_object : file-like
+        The (text) output stream
+    """
+
+    def write(self, columns):
+        self.file_object.writelines(
+            json.dumps(dict(zip(self.names, row))) + "\n" for row in zip(*columns)
+        )
+
+
+class ParquetExport:
+    """Stream rows to a Parquet file, one row group per day
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The output file
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        except ModuleNotFoundError as error:
+            raise RuntimeError(
+                "Parquet export requires the optional `pyarrow` package"
+            ) from error
+        self.pyarrow = pyarrow
+        self.path = path
+        self.schema = None
+        self.writer = None
+
+    def start(self, columns):
+        """Open the output file with the schema of the columns
+
+        Parameters
+        ----------
+        columns : dict
+            Column name / :obj:`numpy.dtype` pairs, in output order
+        """
+        self.schema = self.pyarrow.schema(
+            [
+                (
+                    name,
+                    (
+                        self.pyarrow.string()
+                        if dtype.kind in "OSU"
+                        else self.pyarrow.from_numpy_dtype(dtype)
+                    ),
+                )
+                for name, dtype in columns.items()
+            ]
+        )
+        self.writer = self.pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def write(self, columns):
+        """Write a batch of rows as a row group
+
+        Parameters
+        ----------
+        columns : list of list
+            The values of each column, with None for missing values
+        """
+        self.writer.write_table(
+            self.pyarrow.Table.from_arrays(
+                [
+                    self.pyarrow.array(values, type=field.type)
+                    for values, field in zip(columns, self.schema)
+                ],
+                schema=self.schema,
+            )
+        )
+
+    def close(self):
+        """Finish the output file"""
+        if self.writer is not None:
+            self.writer.close()
+
+
+def column_values(values, dtype):
+    """Convert a column into a list of Python values for export
+
+    Parameters
+    ----------
+    values : :obj:`numpy.ndarray`
+        The column (possibly masked)
+    dtype : :obj:`numpy.dtype`
+        The dtype of the column in the export
+
+    Returns
+    -------
+    list
+        The values, with None for missing and NaN values
+    """
+    data = np.ma.getdata(values).astype(dtype, copy=False).tolist()
+    missing = np.ma.getmaskarray(values)
+    if dtype.kind == "f":
+        missing = missing | np.isnan(np.ma.getdata(values).astype(float))
+    if missing.any():
+        for i in np.flatnonzero(missing).tolist():
+            data[i] = None
+    return data
+
+
+class DayReader:
+    """Read the readings (or rollups) to export, one day at a time
+
+    The rollups stored when each day was finished had the spurious readings
+    removed (with the rules configured at the time).  These are exported as
+    they are, except when the spurious readings are kept, for which the
+    rollups are recomputed from the day's readings (while those are kept).
+
+    Parameters
+    ----------
+    store : :obj:`chicken.storage.StorageBase`
+        The storage backend holding the readings
+    columns : list of str, optional
+        The columns to export (``epoch`` is always included)
+        (Default: None, all columns)
+    resolution : int, optional
+        The rollup resolution (seconds) to export (Default: None, the
+        full-resolution readings)
+    rules : :obj:`chicken.quality.QualityRules`, optional
+        The rules for removing spurious readings (Default: None, export the
+        readings as recorded)
+    """
+
+    def __init__(self, store, columns=None, resolution=None, rules=None):
+        self.store = store
+        self.columns = columns
+        self.resolution = resolution
+        self.rules = rules
+
+    def read(self, date):
+        """Read one day of readings (or rollups) for export
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The readings, or None if there are none for the date
+        """
+        if self.resolution is not None:
+            return self._read_rollup(date)
+
+        # The quality bitmask is needed to clean any projection
+        columns = self.columns
+        if self.rules is not None and columns is not None:
+            columns = list(columns) + [quality.QUALITY_COLUMN]
+        table = self._read_readings(date, columns)
+        if table is not None and self.rules is not None:
+            self.rules.mask(table)
+        return table
+
+    def _read_rollup(self, date):
+        """Read (or compute) one day of rollups for export
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rollups, or None if there are no data for the date
+        """
+        path = rollup.rollup_path(f"{date:%Y%m%d}")
+        hdu = rollup.RESOLUTIONS[self.resolution]
+        if self.rules is not None and path.exists():
+            return self.store.day_cache.read(path, hdu=hdu)
+
+        table = self._read_readings(date)
+        if table is None or len(table) == 0:
+            # Only the (cleaned) rollups are kept for older days
+            return self.store.day_cache.read(path, hdu=hdu) if path.exists() else None
+        clean = None if self.rules is None else self.rules.mask
+        return rollup.RollupSet.from_table(table, clean)[self.resolution].as_table()
+
+    def _read_readings(self, date, columns=None):
+        """Read one day of full-resolution readings, including any journaled
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+        columns : list of str, optional
+            The columns to read (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The readings, or None if there are none for the date
+        """
+        day_start = int(np.datetime64(date, "s").astype(np.int64))
+        return self.store.read_range(
+            start=day_start,
+            stop=day_start + 86400,
+            columns=columns,
+            tail=journal_rows(self.store, date, columns),
+        )
+
+
+def export_range(reader, exporter, start, end):
+    """Export the readings for a range of dates, one day at a time
+
+    The columns of the first day exported define the output columns; columns
+    absent from a later day are written as missing values, and columns added
+    later are left out.  The (compactly encoded) network status columns are
+    written as their status and address strings.
+
+    Parameters
+    ----------
+    reader : :obj:`DayReader`
+        The reader of the readings (or rollups) to export
+    exporter : :obj:`CsvExport`, :obj:`JsonlExport` or :obj:`ParquetExport`
+        The output writer
+    start : :obj:`datetime.date`
+        The first date to export
+    end : :obj:`datetime.date`
+        The last date to export
+
+    Returns
+    -------
+    int
+        The number of rows exported
+    """
+    output, n_rows = None, 0
+    date = start
+    while date <= end:
+        table = reader.read(date)
+        date += datetime.timedelta(days=1)
+        if table is None or len(table) == 0:
+            continue
+
+        # Decode the network status codes (keeping any missing values)
+        values = {name: table[name] for name in table.colnames}
+        for name, decoded in network.decode_network_columns(table).items():
+            values[name] = np.ma.MaskedArray(
+                decoded, mask=np.ma.getmaskarray(table[name])
+            )
+
+        # The first day sets the output column names and dtypes
+        if output is None:
+            output = {
+                name: (
+                    np.dtype(str)
+                    if values[name].dtype.kind in "OSU"
+                    else values[name].dtype
+                )
+                for name in storage.project(table, reader.columns)
+            }
+            exporter.start(output)
+        exporter.write(
+            [
+                (
+                    column_values(values[name], dtype)
+                    if name in values
+                    else [None] * len(table)
+                )
+                for name, dtype in output.items()
+            ]
+        )
+        n_rows += len(table)
+    exporter.close()
+    return n_rows
+
+
+def journal_rows(store, date, columns=None):
+    """Read the rows of a day recorded since its last snapshot
+
+    While the Chicken-Pi is running, the current day's newest rows are only
+    in its journal (except for storage that holds the current day).
+
+    Parameters
+    ----------
+    store : :obj:`chicken.storage.StorageBase`
+        The storage backend holding the readings
+    date : :obj:`datetime.date`
+        The date
+    columns : list of str, optional
+        The columns to read (Default: None, all columns)
+
+    Returns
+    -------
+    :obj:`astropy.table.Table` or None
+        The journaled rows, or None if there are none
+    """
+    if store.holds_today:
+        return None
+    records, _ = journal.read_journal(
+        utils.Paths.data.joinpath(f"coop_{date:%Y%m%d}.journal")
+    )
+    if not records:
+        return None
+    network.encode_network_columns(records)
+    return astropy.table.Table(
+        {name: records[name] for name in storage.project(records.keys(), columns)}
+    )
+
+
+def open_text_output(output):
+    """Open the text output stream
+
+    Parameters
+    ----------
+    output : :obj:`pathlib.Path` or None
+        The output file, or None for standard output
+
+    Returns
+    -------
+    file-like
+        The (text) output stream, which does not close standard output
+    """
+    if output is None:
+        return open(
+            sys.stdout.fileno(), "w", encoding="utf-8", newline="", closefd=False
+        )
+    return open(output, "w", encoding="utf-8", newline="")
+
+
+def add_export_arguments(parser):
+    """Add the ``export`` subcommand arguments to a parser
+
+    Parameters
+    ----------
+    parser : :obj:`argparse.ArgumentParser`
+        The (sub)parser
+    """
+    parser.add_argument(
+        "--start",
+        required=True,
+        type=datetime.date.fromisoformat,
+        help="First date to export (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.date.fromisoformat,
+        default=datetime.date.today(),
+        help="Last date to export (YYYY-MM-DD) (Default: today)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Output file; `-` for standard output (Default: -)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(set(EXPORT_FORMATS.values())),
+        help="Output format (Default: from the output file extension, else csv)",
+    )
+    parser.add_argument(
+        "-c",
+        "--columns",
+        type=lambda arg: [name.strip() for name in arg.split(",") if name.strip()],
+        help="Comma-separated list of columns to export (Default: all)",
+    )
+    parser.add_argument(
+        "-r",
+        "--resolution",
+        choices=["raw"] + list(RESOLUTION_NAMES),
+        default="raw",
+        help="Export full-resolution readings or rollups (Default: raw)",
+    )
+    parser.add_argument(
+        "--keep-spurious",
+        action="store_true",
+        help=(
+            "Keep spurious readings (rollups are then recomputed from the "
+            "readings; older days only have rollups with them removed)"
+        ),
+    )
+
+
+def run_export(args):
+    """Run the ``export`` subcommand
+
+    Parameters
+    ----------
+    args : :obj:`argparse.Namespace`
+        The parsed command-line arguments (see :func:`add_export_arguments`)
+
+    Returns
+    -------
+    int
+        The exit status
+    """
+    db_config = (utils.load_yaml_config() or {}).get("database", {})
+    output = None if args.output == "-" else pathlib.Path(args.output)
+    export_format = args.format or (
+        EXPORT_FORMATS.get(output.suffix.lower(), "csv") if output else "csv"
+    )
+    if export_format == "parquet" and output is None:
+        print("Parquet output must be written to a file", file=sys.stderr)
+        return 1
+
+    # The GUI may be recording to the same data directory, so write nothing
+    #  to it (new status strings and quality bits are kept in memory)
+    store = storage.open_storage(db_config, readonly=True)
+    network.status_dictionary().readonly = True
+    quality.quality_bits().readonly = True
+    reader = DayReader(
+        store,
+        columns=args.columns,
+        resolution=RESOLUTION_NAMES.get(args.resolution),
+        rules=(
+            None
+            if args.keep_spurious
+            else quality.QualityRules(db_config.get("cleaning"))
+        ),
+    )
+    try:
+        with contextlib.ExitStack() as stack:
+            if export_format == "parquet":
+                exporter = ParquetExport(output)
+            else:
+                exporter = (CsvExport if export_format == "csv" else JsonlExport)(
+                    stack.enter_context(open_text_output(output))
+                )
+            n_rows = export_range(reader, exporter, args.start, args.end)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    print(f"Exported {n_rows} rows", file=sys.stderr)
+    return 0
@@ -23,10 +23,20 @@ from noaa_sdk import noaa
 
 # Internal Imports
 from chicken.database import ChickenDatabase
+from chicken.rollup import choose_resolution
 
 # Geometry
 matplotlib.use("TkAgg")
 
+# Module Constants -- The database columns plotted in the graphs
+PLOT_COLUMNS = [
+    "inside_temp",
+    "outside_temp",
+    "inside_humid",
+    "outside_humid",
+    "light_lux",
+]
+
 
 class GraphsWindow:
     """Graphs Window Class
@@ -102,8 +112,9 @@ class GraphsWindow:
         # Create the plot setup
         self.create_plot()
 
-        # Create the lookback info
+        # Create the lookback info, and the incremental query of the database
         self.lookback = 1
+        self.query = self.data.query_historical(self.lookback, columns=PLOT_COLUMNS)
         tk.Label(
             self.frame,
             text="Lookback Time:",
@@ -201,12 +212,20 @@ class GraphsWindow:
         for axis in self.axis_list:
             axis.clear()
 
-        # Retrieve the cleaned historical data from the Database object using
-        #  the current ``lookback`` time.
-        timestamps, data = self.data.retrieve_historical(self.lookback)
+        # For long lookbacks, use the coarsest rollup that still gives at least
+        #  one point per pixel; otherwise bring the cleaned historical data
+        #  from the Database object up to date (only new rows are retrieved).
+        resolution = choose_resolution(self.lookback * 86400, self.geom["GRAPHS_WIDE"])
+        if resolution is not None:
+            timestamps, data = self.data.retrieve_rollup(
+                self.lookback, resolution=resolution
+            )
+        else:
+            self.query.update(self.lookback)
+            timestamps, data = self.query.timestamps, self.query.window
 
         # If we have no data, display a notice stating such
-        if timestamps == []:
+        if len(timestamps) == 0:
             self.ax1.text(
                 0.5, 0.5, "No data yet, please wait...", ha="center", va="center"
             )
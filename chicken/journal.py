@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: journal.py
+
+Append-only write-ahead journal for the readings in the Chicken-Pi database
+
+"""
+
+# Built-In Libraries
+import json
+import os
+import struct
+import time
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+
+
+# Module Constants
+JOURNAL_MAGIC = b"CHKNJRNL"
+JOURNAL_STR_WIDTH = 32
+
+__all__ = ["Journal", "read_journal", "record_dtype"]
+
+
+class Journal:
+    """Append-only binary journal of database rows
+
+    Every row added to the database is written to the journal as a
+    fixed-size binary record, so that a crash or power cut loses at most the
+    rows that have not yet been synced to disk.  The records are described by
+    a NumPy structured dtype stored in the journal header, which allows the
+    whole journal to be replayed with a single vectorized read.
+
+    The file is flushed after every record, but the (expensive, on an SD card)
+    ``fsync`` is only issued every ``fsync_interval`` seconds.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the journal file
+    dtype : :obj:`numpy.dtype`
+        The structured dtype of the records (see :func:`record_dtype`)
+    fsync_interval : float, optional
+        Minimum number of seconds between ``fsync`` calls (Default: 60)
+    """
+
+    def __init__(self, path, dtype: np.dtype, fsync_interval=60.0):
+        self.path = path
+        self.dtype = dtype
+        self.fsync_interval = fsync_interval
+
+        # A single record, reused for every append, and a blank for defaults
+        self._record = np.zeros(1, dtype=dtype)
+        self._blank = np.zeros(1, dtype=dtype)[0]
+        self._header = self._make_header(dtype)
+        self._last_fsync = time.monotonic()
+        self._file = self._open()
+
+    def _open(self):
+        """Open the journal file for appending, writing the header if needed
+
+        Any partial record at the end of an existing journal (e.g., from a
+        power cut partway through a write) is truncated away.  An existing
+        journal with a different record dtype is started afresh, so callers
+        must replay it (:func:`read_journal`) before opening.
+
+        Returns
+        -------
+        file object
+            The journal file, opened in binary append mode
+        """
+        if self.path.exists() and self._read_header() == self._header:
+            # Remove any partial record at the end of the file
+            n_data = self.path.stat().st_size - len(self._header)
+            if n_data % self.dtype.itemsize:
+                os.truncate(
+                    self.path,
+                    len(self._header) + n_data - n_data % self.dtype.itemsize,
+                )
+        else:
+            with open(self.path, "wb") as journal:
+                journal.write(self._header)
+                self._sync(journal)
+
+        # In append mode, every write goes to the end of the file, even after
+        #  the file has been truncated (see :meth:`truncate`)
+        # pylint: disable-next=consider-using-with
+        return open(self.path, "ab")
+
+    def _read_header(self):
+        """Read the header bytes of the existing journal file
+
+        Returns
+        -------
+        bytes
+            The first ``len(self._header)`` bytes of the file
+        """
+        with open(self.path, "rb") as journal:
+            return journal.read(len(self._header))
+
+    @staticmethod
+    def _make_header(dtype: np.dtype):
+        """Build the journal header for a record dtype
+
+        The header is the magic string, followed by the length of and the
+        JSON-encoded description of the record dtype.
+
+        Parameters
+        ----------
+        dtype : :obj:`numpy.dtype`
+            The structured dtype of the records
+
+        Returns
+        -------
+        bytes
+            The header
+        """
+        descr = json.dumps(dtype.descr).encode("utf-8")
+        return JOURNAL_MAGIC + struct.pack("<I", len(descr)) + descr
+
+    def append(self, row: dict):
+        """Write a row to the end of the journal
+
+        Parameters
+        ----------
+        row : dict
+            Dictionary of column name / value pairs.  Columns not in the
+            journal's record dtype are ignored; missing columns are zeroed.
+        """
+        record = self._record[0]
+        for name in self.dtype.names:
+            value = row.get(name, self._blank[name])
+            if isinstance(value, str):
+                value = value.encode("utf-8", "replace")
+            record[name] = value
+        self._file.write(self._record.tobytes())
+        self._file.flush()
+
+        # Only fsync at the requested interval
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync(self._file)
+
+    def truncate(self):
+        """Discard all records, leaving only the header
+
+        Used once the rows in the journal have been compacted into a FITS
+        snapshot.
+        """
+        self._file.truncate(len(self._header))
+        self._file.seek(len(self._header))
+        self._sync(self._file)
+
+    def close(self, remove=False):
+        """Close the journal file
+
+        Parameters
+        ----------
+        remove : bool, optional
+            Also delete the journal file from disk?  (Default: False)
+        """
+        if not self._file.closed:
+            self._sync(self._file)
+            self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+    def _sync(self, journal):
+        """Flush and ``fsync`` the journal file
+
+        Parameters
+        ----------
+        journal : file object
+            The open journal file
+        """
+        journal.flush()
+        os.fsync(journal.fileno())
+        self._last_fsync = time.monotonic()
+
+
+def record_dtype(names, dtypes):
+    """Construct the journal record dtype for a set of columns
+
+    Strings are stored as fixed-width byte strings of ``JOURNAL_STR_WIDTH``
+    characters; all other types are stored as their little-endian NumPy
+    equivalent.
+
+    Parameters
+    ----------
+    names : list of str
+        The column names
+    dtypes : list of :obj:`numpy.dtype`
+        The dtype of each column (``object`` denotes a string column)
+
+    Returns
+    -------
+    :obj:`numpy.dtype`
+        The structured record dtype
+    """
+    return np.dtype(
+        [
+            (
+                name,
+                (
+                    f"S{JOURNAL_STR_WIDTH}"
+                    if np.dtype(dtype).kind in "OSU"
+                    else np.dtype(dtype).newbyteorder("<")
+                ),
+            )
+            for name, dtype in zip(names, dtypes)
+        ]
+    )
+
+
+def read_journal(path):
+    """Replay a journal file into column arrays
+
+    The records are read with a single ``numpy.fromfile`` call; any partial
+    record at the end of the file is ignored.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the journal file
+
+    Returns
+    -------
+    columns : dict
+        Dictionary of column name / :obj:`numpy.ndarray` pairs; string columns
+        are decoded to unicode.  Empty if the journal is missing or corrupt.
+    dtype : :obj:`numpy.dtype` or None
+        The record dtype of the journal
+    """
+    if not path.exists():
+        return {}, None
+
+    with open(path, "rb") as journal:
+        if journal.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            return {}, None
+        (n_descr,) = struct.unpack("<I", journal.read(4))
+        descr = json.loads(journal.read(n_descr).decode("utf-8"))
+        dtype = np.dtype([tuple(field) for field in descr])
+        n_records = (
+            path.stat().st_size - len(JOURNAL_MAGIC) - 4 - n_descr
+        ) // dtype.itemsize
+        records = np.fromfile(journal, dtype=dtype, count=n_records)
+
+    columns = {
+        name: (
+            np.char.decode(records[name], "utf-8", "replace")
+            if dtype[name].kind == "S"
+            else records[name]
+        )
+        for name in dtype.names
+    }
+    return columns, dtype
@@ -19,6 +19,7 @@ import tkinter as tk
 
 # Internal Imports
 from chicken.control import ControlWindow
+from chicken import export
 from chicken import utils
 
 
@@ -73,8 +74,19 @@ def entry_point():
         action="store_true",
         help="Use verbose (DEBUG level) logging",
     )
+    subparsers = parser.add_subparsers(dest="command")
+    export.add_export_arguments(
+        subparsers.add_parser(
+            "export",
+            help="Export the stored data to CSV, JSON lines or Parquet",
+            description="Export the stored data, one day at a time",
+        )
+    )
     args = parser.parse_args()
 
+    if args.command == "export":
+        sys.exit(export.run_export(args))
+
     # Giddy Up!
     sys.exit(main(args.verbose))
 
@@ -9,19 +9,27 @@ Various network status and email control functions
 """
 
 # Built-In Libraries
+import functools
+import ipaddress
+import json
 import logging
 import os
 
 # 3rd Party Libraries
+import numpy as np
 import requests
 import urllib3
 
 # Internal Imports
 from chicken import utils
 
-
 WLAN = "en0" if utils.get_system_type() == "Darwin" else "wlan0"
 
+# Module Constants -- Compact database encoding of the network status
+NO_IPV4 = "-----"
+STATUS_CODES = ["UNKNOWN", "OFF", "ON"]
+STATUS_DICTIONARY = "network_status_codes.json"
+
 
 class NetworkStatus:
     """Class for network status and update methods
@@ -37,6 +45,7 @@ class NetworkStatus:
         self.wan_ipv4 = "-----"
         self.wifi_status = "UNKNOWN"
         self.inet_status = "UNKNOWN"
+        self.wifi_dbm = np.nan
 
     def update_lan(self):
         """Update the LAN status variables
@@ -44,6 +53,7 @@ class NetworkStatus:
         [extended_summary]
         """
         self.lan_ipv4 = self.get_local_ipv4()
+        self.wifi_dbm = np.nan
         if self.contact_server("192.168.0.1"):
             self.wifi_status = "ON"
 
@@ -55,9 +65,31 @@ class NetworkStatus:
                 except IndexError:
                     qual = "-- dBm"
                 self.wifi_status = f"ON: {qual}"
+                self.wifi_dbm = parse_dbm(qual)
         else:
             self.wifi_status = "OFF"
 
+    def as_row(self):
+        """Return the network status in its compact database encoding
+
+        The status strings are stored as small integer codes, the IPv4
+        addresses as ``uint32``, and the WiFi signal level as a number.  Use
+        :func:`decode_network_columns` to recover the strings for display.
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / value pairs
+        """
+        dictionary = status_dictionary()
+        return {
+            "wifi_status": dictionary.encode(self.wifi_status.split(":")[0]),
+            "wifi_dbm": self.wifi_dbm,
+            "inet_status": dictionary.encode(self.inet_status),
+            "lan_ipv4": encode_ipv4(self.lan_ipv4),
+            "wan_ipv4": encode_ipv4(self.wan_ipv4),
+        }
+
     def update_wan(self):
         """Update the WAN status variables
 
@@ -148,3 +180,234 @@ class NetworkStatus:
             )
             public_ipv4 = "-----"
         return public_ipv4
+
+
+class StatusDictionary:
+    """Dictionary of the network status strings and their integer codes
+
+    The standard statuses (``STATUS_CODES``) have fixed codes.  Any other
+    status string is assigned the next free code, and the additions are
+    saved to a JSON file in the data directory so that the codes stay the
+    same across restarts.  A process only reading the data directory (e.g.,
+    ``chicken.export``) sets ``readonly``, and keeps its additions in memory.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the JSON file of additional status strings
+    readonly : bool, optional
+        Never write to the JSON file (Default: False)
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.names = list(STATUS_CODES)
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as file_object:
+                self.names += json.load(file_object)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def encode(self, status):
+        """Return the code for a status string, adding it if unrecognized
+
+        Parameters
+        ----------
+        status : str
+            The status string
+
+        Returns
+        -------
+        int
+            The status code
+        """
+        status = status.strip()
+        if status not in self.codes:
+            self.codes[status] = len(self.names)
+            self.names.append(status)
+            if not self.readonly:
+                with open(self.path, "w", encoding="utf-8") as file_object:
+                    json.dump(self.names[len(STATUS_CODES) :], file_object)
+        return self.codes[status]
+
+    def decode(self, codes):
+        """Return the status strings for an array of codes
+
+        Parameters
+        ----------
+        codes : array_like
+            The status codes
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The status strings (``UNKNOWN`` for unrecognized codes)
+        """
+        names = np.array(self.names + ["UNKNOWN"])
+        codes = np.asarray(codes, dtype=int)
+        return names[np.where((codes >= 0) & (codes < len(self.names)), codes, -1)]
+
+
+@functools.lru_cache(maxsize=None)
+def _status_dictionary(path):
+    """Return the (cached) status dictionary stored at ``path``"""
+    return StatusDictionary(path)
+
+
+def status_dictionary():
+    """Return the status dictionary for the current data directory
+
+    Returns
+    -------
+    :obj:`StatusDictionary`
+        The (shared) status dictionary
+    """
+    return _status_dictionary(utils.Paths.data.joinpath(STATUS_DICTIONARY))
+
+
+def encode_ipv4(address):
+    """Encode an IPv4 address string as an unsigned 32-bit integer
+
+    Parameters
+    ----------
+    address : str
+        The dotted-quad address
+
+    Returns
+    -------
+    int
+        The address as an integer (0 if the string is not a valid address)
+    """
+    try:
+        return int(ipaddress.IPv4Address(address.strip()))
+    except ValueError:
+        return 0
+
+
+def decode_ipv4(values):
+    """Decode an array of ``uint32`` IPv4 addresses into strings
+
+    Parameters
+    ----------
+    values : array_like
+        The addresses as integers
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        The dotted-quad address strings (``NO_IPV4`` for 0)
+    """
+    octets = np.asarray(values, dtype=">u4")[..., np.newaxis].view(np.uint8)
+    quads = octets[..., 0].astype(str)
+    for i in range(1, 4):
+        quads = np.char.add(np.char.add(quads, "."), octets[..., i].astype(str))
+    return np.where(np.asarray(values) == 0, NO_IPV4, quads)
+
+
+def parse_dbm(text):
+    """Parse a WiFi signal level (e.g., ``-52 dBm``) into a number
+
+    Parameters
+    ----------
+    text : str
+        The signal level string reported by ``iwconfig``
+
+    Returns
+    -------
+    float
+        The signal level (dBm), or NaN if it cannot be parsed
+    """
+    try:
+        return float(text.split()[0])
+    except (IndexError, ValueError):
+        return np.nan
+
+
+def encode_network_columns(columns):
+    """Convert legacy (string) network columns to the compact encoding
+
+    Legacy tables stored the network status as strings, with the WiFi signal
+    level embedded in ``wifi_status`` (e.g., ``ON: -52 dBm``).  The strings
+    are converted one unique value at a time, so this is fast even for many
+    days of readings.
+
+    Parameters
+    ----------
+    columns : :obj:`astropy.table.Table` or dict
+        The Table, or dictionary of column name / array pairs, to convert
+        (modified in place)
+
+    Returns
+    -------
+    bool
+        Whether any columns were converted
+    """
+    dictionary = status_dictionary()
+    converters = {
+        "wifi_status": lambda value: dictionary.encode(value.split(":")[0]),
+        "inet_status": dictionary.encode,
+        "lan_ipv4": encode_ipv4,
+        "wan_ipv4": encode_ipv4,
+    }
+    dtypes = {
+        "wifi_status": np.uint8,
+        "inet_status": np.uint8,
+        "lan_ipv4": np.uint32,
+        "wan_ipv4": np.uint32,
+    }
+    changed = False
+    for name, converter in converters.items():
+        if name not in columns.keys():
+            continue
+        values = np.asarray(columns[name])
+        if values.dtype.kind not in "OSU":
+            continue
+        unique, inverse = np.unique(values.astype(str), return_inverse=True)
+        if name == "wifi_status" and "wifi_dbm" not in columns.keys():
+            dbm = np.array(
+                [parse_dbm(value.partition(":")[2]) for value in unique],
+                dtype=np.float32,
+            )
+            columns["wifi_dbm"] = dbm[inverse]
+        codes = np.array([converter(value) for value in unique], dtype=dtypes[name])
+        columns[name] = codes[inverse]
+        changed = True
+    return changed
+
+
+def decode_network_columns(columns):
+    """Decode the compact network columns into strings for display
+
+    Parameters
+    ----------
+    columns : :obj:`astropy.table.Table` or dict
+        The Table, or dictionary of column name / array pairs, of readings
+
+    Returns
+    -------
+    dict
+        Dictionary of column name / string array pairs for the network
+        columns present
+    """
+    dictionary = status_dictionary()
+    decoded = {}
+    if "wifi_status" in columns.keys():
+        decoded["wifi_status"] = dictionary.decode(columns["wifi_status"])
+        if "wifi_dbm" in columns.keys():
+            dbm = np.asarray(columns["wifi_dbm"], dtype=float)
+            decoded["wifi_status"] = np.where(
+                np.isnan(dbm),
+                decoded["wifi_status"],
+                np.char.add(
+                    np.char.add(decoded["wifi_status"], ": "),
+                    np.char.add(
+                        np.round(np.nan_to_num(dbm)).astype(int).astype(str), " dBm"
+                    ),
+                ),
+            )
+    if "inet_status" in columns.keys():
+        decoded["inet_status"] = dictionary.decode(columns["inet_status"])
+    for name in ["lan_ipv4", "wan_ipv4"]:
+        if name in columns.keys():
+            decoded[name] = decode_ipv4(columns[name])
+    return decoded
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: quality.py
+
+Data-quality rules and per-row quality bitmask for the Chicken-Pi database
+
+Each row of the database carries a ``quality`` bitmask, computed as the row
+is recorded, with one bit per checked column that is set when that column's
+reading is spurious.  The rules are read from the ``cleaning`` key of the
+``database`` section of ``config.yaml``::
+
+    cleaning:
+      sentinels: [-99, -999]
+      rules:
+        temp: {min: -20, max: 150, max_rate: 5}
+        light_lux: {min: 0.05}
+
+``sentinels`` are placeholder values that are never valid readings (the
+sensor classes start from -99 or -999 before their first reading).  Each
+rule applies to the floating-point columns whose names contain its key (the
+longest matching key wins, and an exact match beats them all), and may set
+a ``min`` and ``max`` valid value and a ``max_rate`` (change per minute
+from the previous valid reading).
+
+The bit assigned to each column is kept in a JSON file in the data
+directory, so that the bitmasks keep their meaning across restarts and
+configuration changes.
+
+"""
+
+# Built-In Libraries
+import functools
+import json
+import math
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import utils
+
+# Module Constants
+QUALITY_COLUMN = "quality"
+QUALITY_BITS = "quality_bits.json"
+# SQLite stores signed 64-bit integers, so leave the top bit unused
+QUALITY_MAX_BITS = 63
+DEFAULT_SENTINELS = [-99, -999]
+DEFAULT_RULES = {
+    "temp": {"min": -20},
+    "humid": {"min": -20},
+    "light_lux": {"min": 0.05},
+}
+
+__all__ = ["QualityRules", "QualityBits", "quality_bits", "QUALITY_COLUMN"]
+
+
+class QualityBits:
+    """Registry of the quality-bitmask bit assigned to each column
+
+    Each column is assigned the next free bit the first time it is checked,
+    and the assignments are saved to a JSON file in the data directory.  A
+    process only reading the data directory (e.g., ``chicken.export``) sets
+    ``readonly``, and keeps its assignments in memory.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the JSON file of bit assignments
+    readonly : bool, optional
+        Never write to the JSON file (Default: False)
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.bits = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as file_object:
+                self.bits = json.load(file_object)
+
+    def bit(self, column):
+        """Return the bit for a column, assigning one if needed
+
+        Parameters
+        ----------
+        column : str
+            The column name
+
+        Returns
+        -------
+        int or None
+            The bit number, or None if all bits are taken
+        """
+        if column not in self.bits:
+            if len(self.bits) >= QUALITY_MAX_BITS:
+                return None
+            self.bits[column] = len(self.bits)
+            if not self.readonly:
+                with open(self.path, "w", encoding="utf-8") as file_object:
+                    json.dump(self.bits, file_object)
+        return self.bits[column]
+
+
+@functools.lru_cache(maxsize=None)
+def _quality_bits(path):
+    """Return the (cached) bit registry stored at ``path``"""
+    return QualityBits(path)
+
+
+def quality_bits():
+    """Return the bit registry for the current data directory
+
+    Returns
+    -------
+    :obj:`QualityBits`
+        The (shared) bit registry
+    """
+    return _quality_bits(utils.Paths.data.joinpath(QUALITY_BITS))
+
+
+class QualityRules:
+    """The set of data-quality rules, applied to whole columns at once
+
+    Parameters
+    ----------
+    config : dict, optional
+        The ``cleaning`` section of the database configuration (Default:
+        None, the ``DEFAULT_RULES`` and ``DEFAULT_SENTINELS``)
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.sentinels = np.array(config.get("sentinels", DEFAULT_SENTINELS), float)
+        self.rules = config.get("rules", DEFAULT_RULES)
+        # The previous valid (epoch, value) of each column, for ``flag_row``
+        self.last_valid = {}
+        self._rule_cache = {}
+        # The (column, bit, rule) checks for each set of row columns
+        self._row_checks = {}
+
+    def rule_for(self, column):
+        """Return the rule that applies to a column
+
+        Parameters
+        ----------
+        column : str
+            The column name
+
+        Returns
+        -------
+        dict or None
+            The rule, or None if no rule applies
+        """
+        if column not in self._rule_cache:
+            if column in self.rules:
+                rule = self.rules[column]
+            else:
+                keys = [key for key in self.rules if key in column]
+                rule = self.rules[max(keys, key=len)] if keys else None
+            self._rule_cache[column] = rule
+        return self._rule_cache[column]
+
+    def checked_columns(self, columns):
+        """Return the columns checked by the rules, with their bits
+
+        Parameters
+        ----------
+        columns : dict or :obj:`astropy.table.Table`
+            Column name / array pairs
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / bit number pairs
+        """
+        checked = {}
+        for name in columns.keys():
+            if name == QUALITY_COLUMN or np.asarray(columns[name]).dtype.kind != "f":
+                continue
+            if self.rule_for(name) is None:
+                continue
+            bit = quality_bits().bit(name)
+            if bit is not None:
+                checked[name] = bit
+        return checked
+
+    def evaluate(self, columns, last_valid=None):
+        """Compute the quality bitmask for each row
+
+        Parameters
+        ----------
+        columns : dict or :obj:`astropy.table.Table`
+            Column name / array pairs, including ``epoch``, in time order
+        last_valid : dict, optional
+            The valid (epoch, value) of each column preceding these rows, for
+            the rate-of-change limits; updated in place (Default: None)
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The ``uint64`` bitmask for each row
+        """
+        epoch = np.asarray(columns["epoch"], dtype=float)
+        quality = np.zeros(len(epoch), dtype=np.uint64)
+        last_valid = {} if last_valid is None else last_valid
+        for name, bit in self.checked_columns(columns).items():
+            rule = self.rule_for(name)
+            values = np.asarray(columns[name], dtype=float)
+            bad = np.isin(values, self.sentinels)
+            if rule.get("min") is not None:
+                bad |= values < rule["min"]
+            if rule.get("max") is not None:
+                bad |= values > rule["max"]
+            if rule.get("max_rate"):
+                bad = self._check_rate(
+                    epoch, values, bad, rule["max_rate"], last_valid.get(name)
+                )
+            quality[bad] |= np.uint64(1 << bit)
+
+            # Remember the last valid reading
+            valid = np.flatnonzero(~bad & np.isfinite(values))
+            if valid.size:
+                last_valid[name] = (epoch[valid[-1]], values[valid[-1]])
+        return quality
+
+    @staticmethod
+    def _check_rate(epoch, values, bad, max_rate, previous=None):
+        """Flag readings changing too fast from the previous valid reading
+
+        Each reading is compared with the last valid one before it.  Since
+        flagging a reading changes which readings are valid, the check is
+        repeated (a few times at most) until the flags settle; in practice
+        an isolated spike settles on the second pass.
+
+        Parameters
+        ----------
+        epoch : :obj:`numpy.ndarray`
+            The ``epoch`` of each reading
+        values : :obj:`numpy.ndarray`
+            The readings
+        bad : :obj:`numpy.ndarray`
+            The readings already flagged by the other rules
+        max_rate : float
+            The largest valid change per minute
+        previous : tuple, optional
+            The (epoch, value) of the valid reading before these
+            (Default: None)
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The updated flags
+        """
+        index = np.arange(len(values))
+        checked = bad
+        for _ in range(3):
+            # Index of the last valid reading before each reading (-1: none)
+            valid = ~checked & np.isfinite(values)
+            last = np.maximum.accumulate(np.where(valid, index, -1))
+            before = np.concatenate([[-1], last[:-1]])
+
+            prev_epoch = np.where(before >= 0, epoch[before], np.nan)
+            prev_value = np.where(before >= 0, values[before], np.nan)
+            if previous is not None:
+                prev_epoch[before < 0], prev_value[before < 0] = previous
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rate = np.abs(values - prev_value) / (epoch - prev_epoch) * 60
+            flagged = bad | (rate > max_rate)
+            if np.array_equal(flagged, checked):
+                break
+            checked = flagged
+        return checked
+
+    def flag_row(self, row, names):
+        """Compute the quality bitmask of a single new row
+
+        This applies the same rules as :meth:`evaluate`, one value at a time,
+        since NumPy's per-call overhead dominates for a single row.
+
+        Parameters
+        ----------
+        row : dict
+            Dictionary of column name / value pairs, including ``epoch``
+        names : tuple of str
+            The floating-point columns of the row
+
+        Returns
+        -------
+        int
+            The quality bitmask
+        """
+        if names not in self._row_checks:
+            columns = {name: np.empty(0) for name in names}
+            self._row_checks[names] = [
+                (name, bit, self.rule_for(name))
+                for name, bit in self.checked_columns(columns).items()
+            ]
+        sentinels = set(self.sentinels.tolist())
+        epoch = float(row["epoch"])
+        quality = 0
+        for name, bit, rule in self._row_checks[names]:
+            value = row.get(name)
+            if value is None:
+                continue
+            value = float(value)
+            if math.isnan(value):
+                continue
+            bad = (
+                value in sentinels
+                or (rule.get("min") is not None and value < rule["min"])
+                or (rule.get("max") is not None and value > rule["max"])
+            )
+            previous = self.last_valid.get(name)
+            if not bad and rule.get("max_rate") and previous is not None:
+                if epoch != previous[0]:
+                    rate = abs(value - previous[1]) / (epoch - previous[0]) * 60
+                    bad = rate > rule["max_rate"]
+            if bad:
+                quality |= 1 << bit
+            else:
+                self.last_valid[name] = (epoch, value)
+        return quality
+
+    def add_quality_column(self, columns):
+        """Add the quality bitmask to columns recorded without one
+
+        Parameters
+        ----------
+        columns : dict or :obj:`astropy.table.Table`
+            Column name / array pairs, modified in place
+
+        Returns
+        -------
+        bool
+            True if the column was added
+        """
+        if QUALITY_COLUMN in columns.keys() or "epoch" not in columns.keys():
+            return False
+        columns[QUALITY_COLUMN] = self.evaluate(columns)
+        return True
+
+    def mask(self, columns):
+        """Convert the readings flagged in the quality bitmask into NaN
+
+        Rows recorded without a bitmask are checked against the rules first.
+
+        Parameters
+        ----------
+        columns : dict or :obj:`astropy.table.Table`
+            Column name / array pairs, modified in place
+        """
+        if QUALITY_COLUMN in columns.keys():
+            quality = np.ma.getdata(columns[QUALITY_COLUMN]).astype(np.uint64)
+            # Rows recorded before the bitmask existed (e.g., joined with
+            #  older days) are checked against the rules
+            missing = np.ma.getmaskarray(columns[QUALITY_COLUMN])
+            if missing.any():
+                quality[missing] = self.evaluate(
+                    {
+                        name: np.ma.getdata(columns[name])[missing]
+                        for name in columns.keys()
+                        if name != QUALITY_COLUMN
+                    }
+                )
+        elif "epoch" in columns.keys():
+            quality = self.evaluate(columns)
+        else:
+            return
+        if not quality.any():
+            return
+        for name, bit in list(quality_bits().bits.items()):
+            if name in columns.keys() and columns[name].dtype.kind == "f":
+                flagged = (quality & np.uint64(1 << bit)) != 0
+                if flagged.any():
+                    columns[name][flagged] = np.nan
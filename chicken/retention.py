@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: retention.py
+
+Retention policy for the files in the Chicken-Pi data directory
+
+"""
+
+# Built-In Libraries
+import datetime
+import logging
+import os
+import threading
+import time
+
+# 3rd Party Libraries
+
+# Internal Imports
+from chicken import archive
+from chicken import columnfiles
+from chicken import utils
+
+# Module Constants
+RETENTION_NICENESS = 19
+
+__all__ = ["RetentionPolicy"]
+
+
+class RetentionPolicy:
+    """Retention policy for the readings in the data directory
+
+    The full-resolution (minute) readings are kept for ``raw_days`` days,
+    after which only the day's downsampled rollups are kept; the rollups are
+    in turn kept for ``rollup_years`` years.  A value of 0 keeps the data
+    forever.
+
+    The policy is applied by a background job running on a low-priority
+    thread (see :meth:`start`), which makes sure each expiring day has its
+    rollup file before deleting the raw readings (from the daily FITS and
+    column files, the monthly archives and the storage backend).
+
+    Parameters
+    ----------
+    logger : :obj:`logging.Logger`
+        The logging object into which to place logs
+    raw_days : int, optional
+        Number of days to keep the raw readings (Default: 0, forever)
+    rollup_years : int, optional
+        Number of years to keep the rollups (Default: 0, forever)
+    """
+
+    def __init__(self, logger: logging.Logger, raw_days=0, rollup_years=0):
+        self.logger = logger
+        self.raw_days = raw_days
+        self.rollup_years = rollup_years
+        self.thread = None
+
+    @property
+    def enabled(self):
+        """Whether the policy ever deletes anything
+
+        Returns
+        -------
+        bool
+            True if either the raw readings or the rollups expire
+        """
+        return bool(self.raw_days or self.rollup_years)
+
+    def start(self, date, storage, ensure_rollup):
+        """Apply the policy on a low-priority background thread
+
+        Nothing is started if the policy is disabled or the previous job is
+        still running.
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the current date
+        storage : :obj:`chicken.storage.StorageBase`
+            The storage backend
+        ensure_rollup : callable
+            Function taking a YYYYMMDD date string that makes sure the rollup
+            file for that date exists, returning whether it is complete
+        """
+        if not self.enabled or (self.thread is not None and self.thread.is_alive()):
+            return
+        self.thread = threading.Thread(
+            target=self._run,
+            args=(date, storage, ensure_rollup),
+            name="chicken-retention",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def _run(self, date, storage, ensure_rollup):
+        """Lower the priority of the current thread, then apply the policy
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the current date
+        storage : :obj:`chicken.storage.StorageBase`
+            The storage backend
+        ensure_rollup : callable
+            Function making sure the rollup file for a date exists
+        """
+        try:
+            # On Linux, the niceness of a single thread can be set by its id
+            os.setpriority(
+                os.PRIO_PROCESS, threading.get_native_id(), RETENTION_NICENESS
+            )
+        except (AttributeError, OSError):
+            pass
+        try:
+            self.apply(date, storage, ensure_rollup)
+        # Log any error, rather than lose it with the thread
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.logger.error(
+                "While applying the retention policy, threw exception: %s %s",
+                error,
+                error.__class__.__name__,
+            )
+
+    def apply(self, date, storage, ensure_rollup):
+        """Apply the policy, deleting expired raw readings and rollups
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the current date
+        storage : :obj:`chicken.storage.StorageBase`
+            The storage backend
+        ensure_rollup : callable
+            Function making sure the rollup file for a date exists
+
+        Returns
+        -------
+        dict
+            The number of raw days and rollup days deleted, the bytes
+            reclaimed and the wall time (seconds) taken
+        """
+        t_start = time.perf_counter()
+        today = datetime.datetime.strptime(date, "%Y%m%d")
+        report = {"raw_days": 0, "rollup_days": 0, "bytes": 0}
+
+        if self.raw_days:
+            raw_before = today - datetime.timedelta(days=self.raw_days)
+            expired = {}
+            for path in utils.Paths.data.glob("coop_????????.fits"):
+                expired.setdefault(path.stem.split("_")[1], []).append(path)
+            for path in utils.Paths.data.glob("coop_??????.archive"):
+                for archived in archive.MonthlyArchive(path).dates:
+                    expired.setdefault(archived, [])
+            expired = {
+                day: paths
+                for day, paths in expired.items()
+                if day < raw_before.strftime("%Y%m%d")
+            }
+
+            # Downsample each day before its raw readings are deleted, and
+            #  keep the raw readings if the rollup cannot be (re)written
+            for day in sorted(expired):
+                if not ensure_rollup(day):
+                    self.logger.warning(
+                        "Keeping the raw readings for %s: no complete rollup", day
+                    )
+                    del expired[day]
+                    continue
+                for path in expired[day]:
+                    report["bytes"] += path.stat().st_size
+                    path.unlink()
+                report["bytes"] += columnfiles.remove_columns(day)
+            for path in sorted(utils.Paths.data.glob("coop_??????.archive")):
+                n_start = path.stat().st_size
+                monthly = archive.MonthlyArchive(path)
+                monthly.remove_days(expired)
+                report["bytes"] += n_start - (
+                    path.stat().st_size if path.exists() else 0
+                )
+            report["raw_days"] = len(expired)
+            # Keep the days' summaries, but stop queries from looking for them
+            storage.catalog.set_stored(expired, None)
+            # The storage backend works in (local wall-clock) epoch seconds
+            report["bytes"] += storage.prune(
+                int((raw_before - datetime.datetime(1970, 1, 1)).total_seconds())
+            )
+
+        if self.rollup_years:
+            try:
+                rollup_before = today.replace(year=today.year - self.rollup_years)
+            except ValueError:
+                # February 29th
+                rollup_before = today.replace(
+                    year=today.year - self.rollup_years, day=28
+                )
+            for path in utils.Paths.data.glob("coop_????????_rollup.fits"):
+                if path.stem.split("_")[1] < rollup_before.strftime("%Y%m%d"):
+                    report["bytes"] += path.stat().st_size
+                    path.unlink()
+                    report["rollup_days"] += 1
+
+        report["seconds"] = time.perf_counter() - t_start
+        self.logger.info(
+            "Retention: deleted %d raw day(s) and %d rollup day(s), "
+            "reclaiming %d bytes in %.2f s",
+            report["raw_days"],
+            report["rollup_days"],
+            report["bytes"],
+            report["seconds"],
+        )
+        return report
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: rollup.py
+
+Downsampled (rollup) statistics of the readings in the Chicken-Pi database
+
+"""
+
+# Built-In Libraries
+import os
+import warnings
+
+# 3rd Party Libraries
+import astropy.io.fits
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import utils
+
+# Module Constants -- Rollup resolutions (seconds) and their FITS extensions
+RESOLUTIONS = {900: "ROLLUP_15MIN", 3600: "ROLLUP_1HOUR", 86400: "ROLLUP_1DAY"}
+
+__all__ = ["Rollup", "RollupSet", "choose_resolution", "is_complete", "rollup_path"]
+
+
+class Rollup:
+    """Downsampled statistics of the readings at a single resolution
+
+    The readings are accumulated into time bins of ``seconds`` length as they
+    are ingested.  For each bin, the mean, minimum and maximum of every sensor
+    column (ignoring NaN) are kept, along with the fraction of samples for
+    which each outlet was energized.  Only the currently open bin is
+    accumulated; closed bins are kept as a short list of rows.
+
+    Parameters
+    ----------
+    seconds : int
+        The width of each bin (seconds)
+    sensor_names : list of str
+        The names of the sensor (float) columns
+    outlet_names : list of str
+        The names of the outlet (bool) columns
+    """
+
+    def __init__(self, seconds, sensor_names, outlet_names):
+        self.seconds = seconds
+        self.sensor_names = list(sensor_names)
+        self.outlet_names = list(outlet_names)
+
+        # Output column names and dtypes
+        self.names = ["epoch", "n_samples"]
+        for name in self.sensor_names:
+            self.names += [name, f"{name}_min", f"{name}_max"]
+        self.names += self.outlet_names
+        self.dtypes = [np.int64, np.int32] + [float] * (len(self.names) - 2)
+
+        # Closed bins, and the accumulators for the open bin
+        self._rows = []
+        self._bin = None
+        self._reset()
+
+    def _reset(self):
+        """Reset the accumulators for the open bin"""
+        n_sensors = len(self.sensor_names)
+        self._count = 0
+        self._n_valid = np.zeros(n_sensors)
+        self._sum = np.zeros(n_sensors)
+        self._min = np.full(n_sensors, np.inf)
+        self._max = np.full(n_sensors, -np.inf)
+        self._n_on = np.zeros(len(self.outlet_names))
+
+    def ingest(self, epoch, values, outlets):
+        """Accumulate a batch of readings into the bins
+
+        Parameters
+        ----------
+        epoch : :obj:`numpy.ndarray`
+            The (sorted) epoch of each reading, shape (N,)
+        values : :obj:`numpy.ndarray`
+            The sensor values (NaN for invalid), shape (N, n_sensors)
+        outlets : :obj:`numpy.ndarray`
+            The outlet states, shape (N, n_outlets)
+        """
+        bins = epoch - epoch % self.seconds
+        edges = np.flatnonzero(bins[1:] != bins[:-1]) + 1
+        for low, high in zip(np.r_[0, edges], np.r_[edges, len(epoch)]):
+            if bins[low] != self._bin:
+                self.close()
+                self._bin = int(bins[low])
+            chunk = values[low:high]
+            valid = ~np.isnan(chunk)
+            self._count += high - low
+            self._n_valid += valid.sum(axis=0)
+            self._sum += np.where(valid, chunk, 0).sum(axis=0)
+            # fmin/fmax ignore NaN values
+            self._min = np.fmin(self._min, np.fmin.reduce(chunk, axis=0))
+            self._max = np.fmax(self._max, np.fmax.reduce(chunk, axis=0))
+            self._n_on += outlets[low:high].sum(axis=0)
+
+    def close(self):
+        """Close the open bin, adding it to the list of closed bins"""
+        if self._bin is not None and self._count:
+            self._rows.append(self._open_row())
+        self._bin = None
+        self._reset()
+
+    def _open_row(self):
+        """Construct the output row for the open bin
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / value pairs
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._sum / self._n_valid
+        minimum = np.where(self._n_valid > 0, self._min, np.nan)
+        maximum = np.where(self._n_valid > 0, self._max, np.nan)
+
+        row = {"epoch": self._bin, "n_samples": self._count}
+        for i, name in enumerate(self.sensor_names):
+            row[name] = mean[i]
+            row[f"{name}_min"] = minimum[i]
+            row[f"{name}_max"] = maximum[i]
+        for i, name in enumerate(self.outlet_names):
+            row[name] = self._n_on[i] / self._count
+        return row
+
+    def as_table(self, include_open=True):
+        """Return the bins as an AstroPy Table
+
+        Parameters
+        ----------
+        include_open : bool, optional
+            Include the (partial) open bin?  (Default: True)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table`
+            The Table of bins, one row per bin
+        """
+        rows = list(self._rows)
+        if include_open and self._bin is not None and self._count:
+            rows.append(self._open_row())
+        return astropy.table.Table(
+            rows=[[row[name] for name in self.names] for row in rows] or None,
+            names=self.names,
+            dtype=self.dtypes,
+        )
+
+
+class RollupSet:
+    """The set of rollups (at each resolution) for a day of readings
+
+    Parameters
+    ----------
+    sensor_names : list of str
+        The names of the sensor (float) columns
+    outlet_names : list of str
+        The names of the outlet (bool) columns
+    """
+
+    def __init__(self, sensor_names, outlet_names):
+        self.sensor_names = list(sensor_names)
+        self.outlet_names = list(outlet_names)
+        self.rollups = {
+            seconds: Rollup(seconds, self.sensor_names, self.outlet_names)
+            for seconds in RESOLUTIONS
+        }
+
+    def __getitem__(self, seconds):
+        return self.rollups[seconds]
+
+    @classmethod
+    def for_columns(cls, names, dtypes):
+        """Create the rollups appropriate for a set of database columns
+
+        Float columns are treated as sensor columns (except for the per-minute
+        ``_min`` and ``_max`` statistics), and ``outlet_N`` columns as outlets.
+
+        Parameters
+        ----------
+        names : list of str
+            The column names
+        dtypes : list of :obj:`numpy.dtype`
+            The dtype of each column
+
+        Returns
+        -------
+        :obj:`RollupSet`
+            The (empty) rollups
+        """
+        return cls(
+            [
+                name
+                for name, dtype in zip(names, dtypes)
+                if np.dtype(dtype).kind == "f" and not name.endswith(("_min", "_max"))
+            ],
+            [name for name in names if name.startswith("outlet_")],
+        )
+
+    @classmethod
+    def from_table(cls, table, clean=None):
+        """Compute the rollups for a complete day of readings
+
+        Parameters
+        ----------
+        table : :obj:`astropy.table.Table`
+            The readings for the day, sorted by ``epoch``
+        clean : callable, optional
+            Function that cleans a dictionary of column name / array pairs in
+            place before they are ingested (Default: None)
+
+        Returns
+        -------
+        :obj:`RollupSet`
+            The rollups, with every bin closed
+        """
+        rollups = cls.for_columns(
+            table.colnames, [table[name].dtype for name in table.colnames]
+        )
+        columns = {
+            name: np.array(table[name])
+            for name in table.colnames
+            if table[name].dtype.kind not in "OSU"
+        }
+        if clean is not None:
+            clean(columns)
+        rollups.ingest(columns)
+        for rollup in rollups.rollups.values():
+            rollup.close()
+        return rollups
+
+    def ingest(self, columns):
+        """Accumulate a batch of (cleaned) readings into every rollup
+
+        Parameters
+        ----------
+        columns : dict or :obj:`astropy.table.Table`
+            Column name / array pairs for the readings, sorted by ``epoch``
+        """
+        epoch = np.asarray(columns["epoch"], dtype=np.int64)
+        if not epoch.size:
+            return
+        values = np.column_stack(
+            [np.asarray(columns[name], dtype=float) for name in self.sensor_names]
+            or [np.empty((epoch.size, 0))]
+        )
+        outlets = np.column_stack(
+            [np.asarray(columns[name], dtype=bool) for name in self.outlet_names]
+            or [np.empty((epoch.size, 0), dtype=bool)]
+        )
+        for rollup in self.rollups.values():
+            rollup.ingest(epoch, values, outlets)
+
+    def write(self, path):
+        """Close all bins and write the rollups to a multi-extension FITS file
+
+        The file is written to a temporary file and synced before being moved
+        into place, so a power cut never leaves a partial rollup file (which
+        the retention policy would take as a good copy of the day).
+
+        Parameters
+        ----------
+        path : :obj:`pathlib.Path`
+            The path of the output file
+        """
+        hdus = [astropy.io.fits.PrimaryHDU()]
+        for seconds, rollup in self.rollups.items():
+            rollup.close()
+            hdu = astropy.io.fits.table_to_hdu(rollup.as_table())
+            hdu.name = RESOLUTIONS[seconds]
+            hdus.append(hdu)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "wb") as file_object:
+            astropy.io.fits.HDUList(hdus).writeto(file_object)
+            file_object.flush()
+            os.fsync(file_object.fileno())
+        os.replace(tmp_path, path)
+
+
+def rollup_path(date):
+    """Return the path of the rollup file for a given date
+
+    Parameters
+    ----------
+    date : str
+        The YYYYMMDD string of the date
+
+    Returns
+    -------
+    :obj:`pathlib.Path`
+        The path of the rollup file
+    """
+    return utils.Paths.data.joinpath(f"coop_{date}_rollup.fits")
+
+
+def is_complete(path):
+    """Whether a rollup file is complete, with every resolution readable
+
+    Used before the raw readings for a day are deleted, as a file cut short
+    (e.g., by a power cut) may still open.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path of the rollup file
+
+    Returns
+    -------
+    bool
+        True if the file holds the full table for each of ``RESOLUTIONS``
+    """
+    try:
+        size = path.stat().st_size
+        # AstroPy only warns about some truncated files
+        with warnings.catch_warnings(), astropy.io.fits.open(path) as hdus:
+            warnings.simplefilter("ignore")
+            for name in RESOLUTIONS.values():
+                info = hdus[name].fileinfo()
+                if info["datLoc"] + info["datSpan"] > size:
+                    return False
+                _ = hdus[name].data
+    except (OSError, KeyError, TypeError, ValueError):
+        return False
+    return True
+
+
+def choose_resolution(span, n_pixels):
+    """Choose the coarsest rollup resolution with at least one point per pixel
+
+    Parameters
+    ----------
+    span : float
+        The time span to be displayed (seconds)
+    n_pixels : int
+        The number of pixels across which the span will be displayed
+
+    Returns
+    -------
+    int or None
+        The rollup resolution (seconds), or None if only the full-resolution
+        data have enough points
+    """
+    for seconds in sorted(RESOLUTIONS, reverse=True):
+        if span / seconds >= n_pixels:
+            return seconds
+    return None
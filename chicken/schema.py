@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: schema.py
+
+Versioned registry of the Chicken-Pi database table schemas
+
+The columns of the database follow the sensors found at startup, so adding a
+sensor (or a sensor falling back to its dummy) changes the schema of the
+daily tables.  Each distinct schema (the ordered column names and dtypes) is
+registered once and given a version number, kept in a JSON file in the data
+directory; the catalog records the version of each stored day.
+
+Tables of different versions are aligned onto their union schema by
+:func:`align_columns`.  Columns missing from a table are filled with
+zero-copy broadcast views (NaN for floating-point columns, masked for the
+others), so the only copy is the final concatenation.
+
+"""
+
+# Built-In Libraries
+import datetime
+import functools
+import json
+import os
+import threading
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import utils
+
+# Module Constants
+SCHEMA_FILENAME = "schemas.json"
+
+__all__ = [
+    "SchemaRegistry",
+    "schema_registry",
+    "dtype_code",
+    "union_schema",
+    "missing_column",
+    "align_columns",
+]
+
+
+class SchemaRegistry:
+    """Registry of the versions of the database table schema
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the JSON file of schema versions
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.versions = []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as file_object:
+                self.versions = json.load(file_object)
+        # Look up versions by their (hashable) columns
+        self._index = {
+            tuple(map(tuple, entry["columns"])): entry["version"]
+            for entry in self.versions
+        }
+
+    def register(self, names, dtypes):
+        """Return the version of a schema, registering it if new
+
+        Parameters
+        ----------
+        names : list of str
+            The column names, in order
+        dtypes : list of :obj:`numpy.dtype`
+            The dtype of each column
+
+        Returns
+        -------
+        int
+            The schema version
+        """
+        columns = tuple((name, dtype_code(dtype)) for name, dtype in zip(names, dtypes))
+        with self._lock:
+            if columns not in self._index:
+                version = len(self.versions) + 1
+                self.versions.append(
+                    {
+                        "version": version,
+                        "registered": datetime.datetime.now().isoformat(
+                            timespec="seconds"
+                        ),
+                        "columns": [list(column) for column in columns],
+                    }
+                )
+                self._index[columns] = version
+                tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as file_object:
+                    json.dump(self.versions, file_object, indent=1)
+                os.replace(tmp_path, self.path)
+            return self._index[columns]
+
+    def columns(self, version):
+        """Return the columns of a schema version
+
+        Parameters
+        ----------
+        version : int
+            The schema version
+
+        Returns
+        -------
+        list of tuple
+            The (name, :obj:`numpy.dtype`) pairs, in order
+        """
+        return [
+            (name, np.dtype(code))
+            for name, code in self.versions[version - 1]["columns"]
+        ]
+
+    def union(self, versions):
+        """Return the union of several schema versions
+
+        Parameters
+        ----------
+        versions : iterable of int
+            The schema versions
+
+        Returns
+        -------
+        list of tuple
+            The (name, :obj:`numpy.dtype`) pairs (see :func:`union_schema`)
+        """
+        return union_schema([self.columns(version) for version in sorted(versions)])
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_registry(path):
+    """Return the (cached) schema registry stored at ``path``"""
+    return SchemaRegistry(path)
+
+
+def schema_registry():
+    """Return the schema registry for the current data directory
+
+    Returns
+    -------
+    :obj:`SchemaRegistry`
+        The (shared) schema registry
+    """
+    return _schema_registry(utils.Paths.data.joinpath(SCHEMA_FILENAME))
+
+
+def dtype_code(dtype):
+    """Return the registry code of a column dtype
+
+    String columns (held as ``object`` arrays in memory, and as fixed-width
+    strings on disk) are all recorded as ``U``, regardless of width.
+
+    Parameters
+    ----------
+    dtype : :obj:`numpy.dtype`
+        The column dtype
+
+    Returns
+    -------
+    str
+        The dtype code, in native byte order
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind in "OSU":
+        return "U"
+    return dtype.newbyteorder("=").str
+
+
+def union_schema(schemas):
+    """Merge several schemas into one holding all of their columns
+
+    The columns are ordered as in the last (newest) schema, followed by any
+    columns found only in the earlier ones.  Where the dtypes of a column
+    differ, they are promoted to a common dtype if possible, else the newest
+    is used.
+
+    Parameters
+    ----------
+    schemas : list of list of tuple
+        The (name, :obj:`numpy.dtype`) pairs of each schema, oldest first
+
+    Returns
+    -------
+    list of tuple
+        The (name, :obj:`numpy.dtype`) pairs of the union
+    """
+    dtypes = {}
+    for schema in reversed(schemas):
+        for name, dtype in schema:
+            if name not in dtypes:
+                dtypes[name] = np.dtype(dtype)
+            elif dtype_code(dtypes[name]) != dtype_code(dtype):
+                try:
+                    dtypes[name] = np.result_type(dtypes[name], dtype)
+                except TypeError:
+                    pass
+    return list(dtypes.items())
+
+
+def missing_column(dtype, n_rows):
+    """Return a placeholder for a column missing from a table
+
+    No memory is allocated for the rows: the placeholder is a broadcast
+    (read-only) view of a single value.
+
+    Parameters
+    ----------
+    dtype : :obj:`numpy.dtype`
+        The dtype of the column
+    n_rows : int
+        The number of rows
+
+    Returns
+    -------
+    :obj:`numpy.ndarray` or :obj:`numpy.ma.MaskedArray`
+        NaN for floating-point columns, else a fully masked column
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return np.broadcast_to(np.array(np.nan, dtype=dtype), (n_rows,))
+    return np.ma.MaskedArray(
+        np.broadcast_to(np.zeros((), dtype=dtype), (n_rows,)),
+        mask=np.broadcast_to(np.True_, (n_rows,)),
+    )
+
+
+def align_columns(pieces, schema=None):
+    """Concatenate tables of (possibly) different schemas, in one copy
+
+    Parameters
+    ----------
+    pieces : list of dict
+        Dictionaries of column name / :obj:`numpy.ndarray` pairs
+    schema : list of tuple, optional
+        The (name, :obj:`numpy.dtype`) pairs giving the order and dtypes of
+        the output; any other columns of the pieces follow them (Default:
+        None, the union of the pieces' schemas)
+
+    Returns
+    -------
+    dict
+        Dictionary of column name / :obj:`numpy.ndarray` pairs; columns with
+        missing values are masked (except floating-point columns, where NaN
+        marks them)
+    """
+    schemas = [
+        [(name, values.dtype) for name, values in arrays.items()] for arrays in pieces
+    ]
+    schema = union_schema(schemas if schema is None else schemas + [schema])
+    joined = {}
+    for name, dtype in schema:
+        parts = []
+        for arrays in pieces:
+            part = arrays.get(name)
+            if part is None:
+                part = missing_column(dtype, len(arrays["epoch"]))
+            elif part.dtype != dtype and dtype.kind not in "OSU":
+                part = part.astype(dtype)
+            parts.append(part)
+        if all(part.dtype.kind in "OSU" for part in parts):
+            # Let NumPy choose the width of the strings
+            parts = [
+                part.astype(str) if part.dtype.kind == "O" else part for part in parts
+            ]
+        if any(isinstance(part, np.ma.MaskedArray) for part in parts):
+            joined[name] = np.ma.concatenate(parts)
+        else:
+            joined[name] = np.concatenate(parts)
+    return joined
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: stats.py
+
+Grouped statistics over the stored history of the Chicken-Pi database
+
+Questions like "the hours ``outlet_1`` was on each day this month" or "the
+nightly minimum ``inside_temp``" are answered by streaming over the stored
+days one at a time, reading only the column needed and reducing each day to
+a handful of numbers with NumPy.  The results for completed days never
+change, so they are cached.
+
+"""
+
+# Built-In Libraries
+import collections
+import datetime
+import threading
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import quality
+
+# Module Constants
+GROUP_SECONDS = {"day": 86400, "hour": 3600}
+STATISTICS = ("mean", "min", "max", "sum", "count", "hours")
+STATS_CACHE_ENTRIES = 4096
+
+__all__ = [
+    "HistoryStats",
+    "StatsQuery",
+    "night_offset",
+    "GROUP_SECONDS",
+    "STATISTICS",
+]
+
+
+StatsQuery = collections.namedtuple(
+    "StatsQuery", ["column", "statistic", "by", "hours"], defaults=["mean", "day", None]
+)
+StatsQuery.__doc__ = """The statistic of a column to compute for each group
+
+Parameters
+----------
+column : str
+    The column name (e.g., ``inside_temp`` or ``outlet_1``)
+statistic : str, optional
+    ``mean``, ``min``, ``max``, ``sum``, ``count`` (the number of valid
+    readings) or ``hours`` (the hours for which the column was True, or its
+    sum times the reading cadence for numeric columns) (Default: ``mean``)
+by : str, optional
+    Group by ``day`` or ``hour`` (Default: ``day``)
+hours : tuple of int, optional
+    Only include readings between these (start, end) hours of the day; the
+    range may wrap around midnight, e.g., ``(20, 6)`` for the night, in which
+    case each ``day`` group is the night starting on that date
+    (Default: None, all hours)
+"""
+
+
+class HistoryStats:
+    """Grouped statistics of a column over the stored history
+
+    Parameters
+    ----------
+    database : :obj:`chicken.database.ChickenDatabase`
+        The database to query
+    max_entries : int, optional
+        The number of (day, query) results to keep in the cache
+        (Default: ``STATS_CACHE_ENTRIES``)
+    """
+
+    def __init__(self, database, max_entries=STATS_CACHE_ENTRIES):
+        self.database = database
+        self.max_entries = max_entries
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def aggregate(self, query, lookback=1, start=None, stop=None):
+        """Compute a statistic of a column, grouped by day or hour
+
+        Readings flagged as spurious are excluded.
+
+        Parameters
+        ----------
+        query : :obj:`StatsQuery`
+            The column, statistic, grouping and hours of the day
+        lookback : int, optional
+            Number of days to look back, including today; ignored if
+            ``start`` is given (Default: 1)
+        start : :obj:`datetime.date`, optional
+            The first date to include (Default: None)
+        stop : :obj:`datetime.date`, optional
+            The last date to include (Default: None, today)
+
+        Returns
+        -------
+        timestamps : :obj:`numpy.ndarray`
+            The ``datetime64[s]`` timestamps of the start of each group (for
+            nights, the start hour on each date)
+        values : :obj:`numpy.ndarray`
+            The (float) statistic for each group; NaN where there are no
+            valid readings
+        """
+        if query.statistic not in STATISTICS:
+            raise ValueError(f"Unknown statistic: {query.statistic}")
+        if query.by not in GROUP_SECONDS:
+            raise ValueError(f"Unknown grouping: {query.by}")
+        today = self.database.date
+        stop = stop or today
+        start = start or today - datetime.timedelta(days=lookback - 1)
+
+        # Make sure any day still being written in the background is on disk
+        self.database.wait_for_day_write()
+        if query.hours is not None:
+            query = query._replace(hours=tuple(query.hours))
+        offset = night_offset(query.by, query.hours)
+        timestamps, values = [], []
+        date = start
+        while date <= stop:
+            # A night ends on the following date
+            last = date + datetime.timedelta(days=1 if offset else 0)
+            day_values = self._day_values(date, query, complete=last < today)
+            day_start = np.datetime64(date, "s") + offset
+            timestamps.append(
+                day_start + np.arange(day_values.size) * GROUP_SECONDS[query.by]
+            )
+            values.append(day_values)
+            date += datetime.timedelta(days=1)
+        if not values:
+            return np.array([], dtype="datetime64[s]"), np.array([])
+        return np.concatenate(timestamps), np.concatenate(values)
+
+    def _day_values(self, date, query, complete=True):
+        """Return the statistic for one day, from the cache if possible
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+        query : :obj:`StatsQuery`
+            See :meth:`aggregate`
+        complete : bool, optional
+            Whether the day is finished, so its result may be cached
+            (Default: True)
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The statistic for each group of the day
+        """
+        if not complete:
+            return self._compute(date, query)
+
+        # The catalog entries change if the days are ever rewritten
+        key = (date.strftime("%Y%m%d"), query)
+        version = tuple(
+            (entry.get("rows"), entry.get("last"))
+            for entry in (
+                self.database.storage.catalog.entries.get(
+                    read_date.strftime("%Y%m%d"), {}
+                )
+                for read_date in read_dates(date, query)
+            )
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+        values = self._compute(date, query)
+        values.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = (version, values)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return values
+
+    def _compute(self, date, query):
+        """Compute the statistic for one day from its readings
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+        query : :obj:`StatsQuery`
+            See :meth:`aggregate`
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            The statistic for each group of the day
+        """
+        n_groups = 86400 // GROUP_SECONDS[query.by]
+        readings = self._read_readings(date, query)
+        if readings is None:
+            return np.full(n_groups, np.nan)
+        epoch, values = readings
+        cadence = float(np.median(np.diff(epoch))) if epoch.size > 1 else 0.0
+        group, valid = group_readings(epoch, values, date, query)
+        return reduce_groups(
+            query.statistic, group[valid], values[valid], n_groups, cadence
+        )
+
+    def _read_readings(self, date, query):
+        """Read the (cleaned) readings needed for one day's groups
+
+        Parameters
+        ----------
+        date : :obj:`datetime.date`
+            The date
+        query : :obj:`StatsQuery`
+            See :meth:`aggregate`
+
+        Returns
+        -------
+        tuple of :obj:`numpy.ndarray` or None
+            The epoch and (float) value of each reading, sorted by epoch, or
+            None if there are none
+        """
+        epochs, columns = [], []
+        for read_date in read_dates(date, query):
+            table = self.database.read_table_from_fits(
+                read_date.strftime("%Y%m%d"),
+                columns=[query.column, quality.QUALITY_COLUMN],
+            )
+            if table is None or query.column not in table.colnames or not table:
+                continue
+            self.database.quality.mask(table)
+            epochs.append(np.asarray(table["epoch"], dtype=np.int64))
+            columns.append(
+                np.ma.filled(np.ma.asarray(table[query.column]).astype(float), np.nan)
+            )
+        if not epochs:
+            return None
+        epoch, values = np.concatenate(epochs), np.concatenate(columns)
+        order = np.argsort(epoch, kind="stable")
+        return epoch[order], values[order]
+
+
+def read_dates(date, query):
+    """Return the dates whose readings are needed for one day's groups
+
+    Parameters
+    ----------
+    date : :obj:`datetime.date`
+        The date
+    query : :obj:`StatsQuery`
+        See :meth:`HistoryStats.aggregate`
+
+    Returns
+    -------
+    list of :obj:`datetime.date`
+        The date, and the following date for a night
+    """
+    if night_offset(query.by, query.hours):
+        return [date, date + datetime.timedelta(days=1)]
+    return [date]
+
+
+def group_readings(epoch, values, date, query):
+    """Assign each reading of a day to its group
+
+    Nights are grouped from their start hour, so each is in one group.
+
+    Parameters
+    ----------
+    epoch : :obj:`numpy.ndarray`
+        The (sorted) epoch of each reading
+    values : :obj:`numpy.ndarray`
+        The (float) value of each reading
+    date : :obj:`datetime.date`
+        The date
+    query : :obj:`StatsQuery`
+        See :meth:`HistoryStats.aggregate`
+
+    Returns
+    -------
+    group : :obj:`numpy.ndarray`
+        The group of each reading
+    valid : :obj:`numpy.ndarray`
+        Whether each reading is included
+    """
+    offset = night_offset(query.by, query.hours)
+    day_start = int(np.datetime64(date, "s").astype(np.int64))
+    valid = np.isfinite(values)
+    if query.hours is not None:
+        start, end = query.hours
+        hour = (epoch - day_start) // 3600 % 24
+        if start <= end:
+            valid &= (hour >= start) & (hour < end)
+        else:
+            valid &= (hour >= start) | (hour < end)
+    group = (epoch - day_start - offset) // GROUP_SECONDS[query.by]
+    if offset:
+        valid &= group == 0
+    return np.clip(group, 0, 86400 // GROUP_SECONDS[query.by] - 1), valid
+
+
+def reduce_groups(statistic, group, values, n_groups, cadence):
+    """Reduce the included readings of a day to the statistic of each group
+
+    Parameters
+    ----------
+    statistic : str
+        See :class:`StatsQuery`
+    group : :obj:`numpy.ndarray`
+        The (sorted) group of each reading
+    values : :obj:`numpy.ndarray`
+        The (finite) value of each reading
+    n_groups : int
+        The number of groups in the day
+    cadence : float
+        The interval between readings (seconds), for ``hours``
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        The statistic for each group; NaN where there are no readings
+    """
+    result = np.full(n_groups, np.nan)
+    counts = np.bincount(group, minlength=n_groups)
+    filled = counts > 0
+    if statistic == "count":
+        return counts.astype(float)
+    if statistic in ("mean", "sum", "hours"):
+        sums = np.bincount(group, weights=values, minlength=n_groups)
+        if statistic == "mean":
+            result[filled] = sums[filled] / counts[filled]
+        else:
+            scale = cadence / 3600 if statistic == "hours" else 1
+            result[filled] = sums[filled] * scale
+        return result
+
+    # Groups are contiguous in the sorted readings
+    first = np.searchsorted(group, np.flatnonzero(filled))
+    reduce = np.minimum if statistic == "min" else np.maximum
+    result[filled] = reduce.reduceat(values, first)
+    return result
+
+
+def night_offset(by, hours):
+    """Return the offset of a night's groups from the start of its date
+
+    Parameters
+    ----------
+    by, hours
+        See :class:`StatsQuery`
+
+    Returns
+    -------
+    int
+        The seconds from midnight to the start hour, for ``day`` groups of an
+        hour range wrapping around midnight (a night); else 0
+    """
+    if by != "day" or hours is None or hours[0] <= hours[1]:
+        return 0
+    return hours[0] * 3600
@@ -10,8 +10,8 @@ Status display window, updates frequently with current values
 
 # Built-In Libraries
 import logging
+import math
 import tkinter as tk
-import time
 
 # 3rd Party Libraries
 
@@ -132,49 +132,56 @@ class StatusWindow:
         self.dev_outlet_data.append(self.make_statistic_data(row=dev_row + 2, column=3))
         self.dev_door_data = self.make_statistic_data(row=dev_row + 3, column=1)
 
-    def update(self, now, sensors, relays, network):
+        # The second of the previous update, so each interval fires once
+        self._last_second = None
+
+    def update(self, now, acquisition, relays, network):
         """Update the information in this Window
 
-        [extended_summary]
+        The sensor values shown are the latest published by the background
+        acquisition threads, so updating the window never waits on a sensor.
 
         Parameters
         ----------
         now : :obj:`datetime.datetime`
             The current time at the update
-        sensors : dict
-            The dictionary containing the sensor objects
+        acquisition : :obj:`chicken.acquire.AcquisitionService`
+            The sensor acquisition service
         relays : `chicken_devices.Relay`
             The Relay class
+        network : :obj:`chicken.network.NetworkStatus`
+            The network status object
         """
         # Get the current time, and write
         self.display_time.config(text=now.strftime("%A, %B %-d, %Y    %-I:%M:%S %p"))
 
-        # Set data update intervals
-        short_interval = now.second % 15 == 0
-        long_interval = now.second % 60 == 0
+        # Set data update intervals (each fires once, although this method
+        #  is called more than once a second)
+        second = now.replace(microsecond=0)
+        new_second = second != self._last_second
+        self._last_second = second
+        short_interval = new_second and now.second % 15 == 0
+        long_interval = new_second and now.second % 60 == 0
 
-        # Write the various environment statuses at different intervals
+        # Write the latest environment readings (no sensor is queried here)
         if short_interval:
-            # File read
-            self.env_cpu_data.config(text=self.format_cpu_str(sensors["cpu"].temp))
-        if long_interval:
-            # I2C Query
-            self.env_inside_data.config(
-                text=self.format_temp_humid_str(
-                    sensors["inside"].temp, sensors["inside"].humid
-                )
+            self.env_cpu_data.config(
+                text=self.format_cpu_str(self.latest(acquisition, "cpu", "temp"))
             )
-            self.env_outside_data.config(
-                text=self.format_temp_humid_str(
-                    sensors["outside"].temp, sensors["outside"].humid
+            for name, label in [
+                ("inside", self.env_inside_data),
+                ("outside", self.env_outside_data),
+                ("box", self.env_pi_data),
+            ]:
+                label.config(
+                    text=self.format_temp_humid_str(
+                        self.latest(acquisition, name, "temp"),
+                        self.latest(acquisition, name, "humid"),
+                    )
                 )
+            self.env_light_data.config(
+                text=self.format_lux_str(self.latest(acquisition, "light", "lux"))
             )
-            self.env_pi_data.config(
-                text=self.format_temp_humid_str(
-                    sensors["box"].temp, sensors["box"].humid
-                )
-            )
-            self.env_light_data.config(text=self.format_lux_str(sensors["light"].level))
 
         # Write the various device statuses at different intervals
         if short_interval:
@@ -192,9 +199,27 @@ class StatusWindow:
             self.net_internet_data.config(text=network.inet_status)
             self.net_wanip_data.config(text=network.wan_ipv4)
 
-        # For short update interval, wait an additional 0.5 s before returning
-        if short_interval:
-            time.sleep(0.5)
+    @staticmethod
+    def latest(acquisition, name, quantity):
+        """Return the latest value of a sensor quantity, if still fresh
+
+        Parameters
+        ----------
+        acquisition : :obj:`chicken.acquire.AcquisitionService`
+            The sensor acquisition service
+        name : str
+            The name of the sensor
+        quantity : str
+            The quantity (e.g., ``"temp"``)
+
+        Returns
+        -------
+        float or None
+            The latest value, or None if the reading is missing or stale
+        """
+        if acquisition.is_stale(name):
+            return None
+        return acquisition.snapshot.value(name, quantity)
 
     # Label Creator Methods
     def make_section_label(self, text, row):
@@ -300,6 +325,8 @@ class StatusWindow:
         str
             The properly formatted string
         """
+        if temp is None or humid is None:
+            return "-" * 5
         return f"{temp:.1f}\xb0F, {humid:.1f}%"
 
     @staticmethod
@@ -340,7 +367,7 @@ class StatusWindow:
         """
         return (
             f"{cputemp:0.0f}\xb0F (<185\xb0F)"
-            if cputemp is not None
+            if cputemp is not None and not math.isnan(cputemp)
             else "----- (<185\xb0F)"
         )
 
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/__init__.py
+
+Long-term storage backends for the readings in the Chicken-Pi database
+
+Each backend is in its own module:
+
+    * :mod:`chicken.storage.base`: the interface (:class:`StorageBase`) and
+      helpers for the tables
+    * :mod:`chicken.storage.cache`: the cache of decoded past-day tables
+    * :mod:`chicken.storage.fits`: daily FITS files (the original format)
+    * :mod:`chicken.storage.memmap`: daily FITS files plus memory-mapped
+      column files
+    * :mod:`chicken.storage.sqlite`: a SQLite database, indexed on ``epoch``
+
+The backend is selected in ``config.yaml`` (see :func:`open_storage`).
+
+"""
+
+# Built-In Libraries
+
+# 3rd Party Libraries
+
+# Internal Imports
+from chicken.storage.base import (
+    StorageBase,
+    add_epoch_column,
+    join_tables,
+    project,
+    read_fits_columns,
+)
+from chicken.storage.cache import DAY_CACHE_MB, DayTableCache
+from chicken.storage.fits import FitsStorage
+from chicken.storage.memmap import MemmapStorage
+from chicken.storage.sqlite import SQLITE_BATCH_ROWS, SQLiteStorage
+
+# Module Constants
+
+__all__ = [
+    "StorageBase",
+    "FitsStorage",
+    "SQLiteStorage",
+    "MemmapStorage",
+    "DayTableCache",
+    "add_epoch_column",
+    "read_fits_columns",
+    "join_tables",
+    "project",
+    "open_storage",
+]
+
+
+def open_storage(config=None, readonly=False):
+    """Open the storage backend selected in the configuration file
+
+    The ``database`` section of ``config.yaml`` selects the backend with the
+    ``backend`` key (``fits``, ``memmap`` or ``sqlite``; Default: ``fits``),
+    and turns on
+    the monthly archives with the ``archive_after_days`` key.
+
+    Parameters
+    ----------
+    config : dict, optional
+        The ``database`` section of the configuration file (Default: None)
+    readonly : bool, optional
+        Only read the stored data, for a process other than the one
+        recording it, e.g., ``chicken.export`` (Default: False)
+
+    Returns
+    -------
+    :obj:`StorageBase`
+        The storage backend
+    """
+    config = config or {}
+    backend = config.get("backend", "fits").lower()
+    cache_bytes = config.get("day_cache_mb", DAY_CACHE_MB) * 2**20
+    archive_after_days = config.get("archive_after_days", 0)
+    if backend == "fits":
+        return FitsStorage(
+            cache_bytes=cache_bytes,
+            archive_after_days=archive_after_days,
+            readonly=readonly,
+        )
+    if backend == "memmap":
+        return MemmapStorage(
+            cache_bytes=cache_bytes,
+            archive_after_days=archive_after_days,
+            readonly=readonly,
+        )
+    if backend == "sqlite":
+        return SQLiteStorage(
+            batch_rows=config.get("sqlite_batch_rows", SQLITE_BATCH_ROWS),
+            cache_bytes=cache_bytes,
+            archive_after_days=archive_after_days,
+            readonly=readonly,
+        )
+    raise ValueError(f"Unknown database backend: {backend}")
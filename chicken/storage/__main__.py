@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/__main__.py
+
+Import the existing daily FITS files into the SQLite database
+
+Run as ``python -m chicken.storage`` before switching the ``backend`` to
+``sqlite`` in ``config.yaml``.
+
+"""
+
+# Internal Imports
+from chicken.storage.sqlite import import_fits_to_sqlite
+
+import_fits_to_sqlite()
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/base.py
+
+The interface of the storage backends, and helpers for their tables
+
+"""
+
+# Built-In Libraries
+import abc
+
+# 3rd Party Libraries
+import astropy.io.fits
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import network
+from chicken import schema
+
+# Module Constants
+
+__all__ = [
+    "StorageBase",
+    "add_epoch_column",
+    "read_fits_columns",
+    "join_tables",
+    "project",
+]
+
+
+class StorageBase(abc.ABC):
+    """Base Storage Class
+
+    The storage backend holds the readings from past days (and, for some
+    backends, the current day) and answers time-range queries on them.  The
+    current day's readings are also kept in memory and journaled by the
+    :class:`chicken.database.ChickenDatabase`, which hands each new row to
+    :meth:`append` and each completed (or snapshotted) day to
+    :meth:`write_day`.
+
+    All times are given as the database ``epoch`` values (integer local
+    wall-clock seconds since 1970-01-01).
+    """
+
+    # Does ``read_range`` return the current day's rows (from ``append``)?
+    holds_today = False
+
+    def append(self, columns):
+        """Add newly recorded rows to the storage
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of column name / :obj:`numpy.ndarray` pairs
+        """
+
+    @abc.abstractmethod
+    def write_day(self, date, table: astropy.table.Table):
+        """Store the complete table of readings for a day
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        """
+
+    @abc.abstractmethod
+    def read_range(self, start=None, stop=None, columns=None, tail=None):
+        """Read the rows with ``start <= epoch < stop``
+
+        Parameters
+        ----------
+        start : int, optional
+            The first epoch to return (Default: None, from the beginning)
+        stop : int, optional
+            The epoch at which to stop (Default: None, through the end)
+        columns : list of str, optional
+            The columns to return (``epoch`` is always included)
+            (Default: None, all columns)
+        tail : :obj:`astropy.table.Table`, optional
+            Rows to add after the stored rows (e.g., the current day's rows
+            from memory), so that the result is assembled in a single copy
+            (Default: None)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rows, sorted by ``epoch`` (a new Table, safe to modify), or
+            None if no rows are stored in the range
+        """
+
+    def compact(self, date):
+        """Compact the storage of old days (run on the background writer)
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the current date
+        """
+
+    def prune(self, before):  # pylint: disable=unused-argument
+        """Delete the stored rows with ``epoch < before``
+
+        Only needed for backends that hold rows outside of the daily files
+        (which are pruned by :mod:`chicken.retention`); by default, nothing
+        is deleted.
+
+        Parameters
+        ----------
+        before : int
+            The first epoch to keep
+
+        Returns
+        -------
+        int
+            The number of bytes reclaimed on disk
+        """
+        return 0
+
+    def flush(self):
+        """Commit any buffered rows to the storage"""
+
+    def close(self):
+        """Flush and release the storage"""
+        self.flush()
+
+
+def add_epoch_column(table: astropy.table.Table):
+    """Add the ``epoch`` column to a legacy table, if missing
+
+    The epoch values are computed from the ``date`` and ``time`` columns with
+    vectorized string operations.
+
+    Parameters
+    ----------
+    table : :obj:`astropy.table.Table`
+        The table to upgrade (modified in place)
+
+    Returns
+    -------
+    bool
+        Whether the column was added
+    """
+    if "epoch" in table.colnames or "date" not in table.colnames:
+        return False
+    isotimes = np.char.add(
+        np.char.add(np.asarray(table["date"], dtype=str), "T"),
+        np.asarray(table["time"], dtype=str),
+    )
+    table.add_column(
+        isotimes.astype("datetime64[s]").astype(np.int64),
+        name="epoch",
+        index=table.colnames.index("time") + 1,
+    )
+    return True
+
+
+def read_fits_columns(path, hdu=None, columns=None):
+    """Read selected columns of a FITS binary table through a memory map
+
+    The file is memory-mapped, and only the requested columns are converted
+    (byte-swapped or decoded from bytes) into in-memory arrays; the other
+    columns (e.g., the outlet states) are never decoded.  Legacy files are
+    upgraded in memory: the ``epoch`` column is computed from the ``date``
+    and ``time`` columns, and string network columns are encoded.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`
+        The path to the FITS file
+    hdu : str, optional
+        The name of the FITS extension to read (Default: None, the first
+        table extension)
+    columns : list of str, optional
+        The columns to read (``epoch`` is always included)
+        (Default: None, all columns)
+
+    Returns
+    -------
+    :obj:`astropy.table.Table`
+        The Table of the requested columns that exist in the file
+    """
+    with astropy.io.fits.open(path, memmap=True) as hdul:
+        data = hdul[1 if hdu is None else hdu].data
+        names = data.columns.names
+
+        # Legacy files need the date and time to compute the epoch, and the
+        #  WiFi status string for the signal level
+        extra = []
+        if "epoch" not in names:
+            extra += ["date", "time"]
+        if "wifi_dbm" not in names:
+            extra += ["wifi_status"]
+        table = astropy.table.Table()
+        for name in project(names, None if columns is None else list(columns) + extra):
+            column = np.asarray(data[name])
+            if column.dtype.kind == "S":
+                column = np.char.decode(column, "utf-8")
+            table[name] = column.astype(column.dtype.newbyteorder("="))
+
+    # Upgrade legacy columns, then drop any extra columns read for the purpose
+    if add_epoch_column(table) | network.encode_network_columns(table):
+        if columns is not None:
+            table = table[project(table, columns)]
+    return table
+
+
+def join_tables(pieces, columns=None):
+    """Join the pieces of a range query into a single Table
+
+    Pieces with different columns (e.g., from before and after a sensor was
+    added) are aligned onto the union of their columns, with the gaps
+    filled by NaN or masked values.
+
+    Parameters
+    ----------
+    pieces : list of tuple
+        The (arrays, shared) pairs, in order, where ``arrays`` is a dictionary
+        of column name / :obj:`numpy.ndarray` pairs; shared arrays (e.g., from
+        a cache) are never returned without copying
+    columns : list of tuple, optional
+        The (name, :obj:`numpy.dtype`) pairs giving the order and dtypes of
+        the joined columns, e.g., from the schema registry; columns of the
+        pieces not listed are added after them (Default: None)
+
+    Returns
+    -------
+    :obj:`astropy.table.Table` or None
+        The joined Table, or None if there are no pieces
+    """
+    if not pieces:
+        return None
+    if len(pieces) == 1:
+        arrays, shared = pieces[0]
+        if shared:
+            arrays = {name: values.copy() for name, values in arrays.items()}
+        return astropy.table.Table(arrays, copy=False)
+    names = list(pieces[0][0])
+    if columns is not None or any(list(arrays) != names for arrays, _ in pieces[1:]):
+        # The columns changed between days; align them in the same single copy
+        return astropy.table.Table(
+            schema.align_columns([arrays for arrays, _ in pieces], columns),
+            copy=False,
+        )
+    joined = {}
+    for name in names:
+        parts = [arrays[name] for arrays, _ in pieces]
+        if any(isinstance(part, np.ma.MaskedArray) for part in parts):
+            joined[name] = np.ma.concatenate(parts)
+        else:
+            joined[name] = np.concatenate(parts)
+    return astropy.table.Table(joined, copy=False)
+
+
+def project(available, columns):
+    """Select the requested columns that exist, always including ``epoch``
+
+    Parameters
+    ----------
+    available : iterable of str
+        The names of the stored columns, in storage order
+    columns : list of str or None
+        The requested columns (None for all)
+
+    Returns
+    -------
+    list of str
+        The column names to read, in storage order
+    """
+    available = list(getattr(available, "colnames", available))
+    if columns is None:
+        return available
+    wanted = set(columns) | {"epoch"}
+    return [name for name in available if name in wanted]
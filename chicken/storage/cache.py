@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/cache.py
+
+Least-recently-used cache of the decoded past-day tables
+
+"""
+
+# Built-In Libraries
+import collections
+import os
+import threading
+
+# 3rd Party Libraries
+import astropy.table
+
+# Internal Imports
+from chicken import network
+from chicken.storage.base import add_epoch_column, project, read_fits_columns
+
+# Module Constants
+DAY_CACHE_MB = 32
+
+__all__ = ["DayTableCache", "DAY_CACHE_MB"]
+
+
+class DayTableCache:
+    """Least-recently-used cache of decoded past-day tables
+
+    The daily FITS files for days before today do not change, so there is no
+    need to re-read and re-parse them every time the graphs are refreshed.
+    Tables are keyed by path and validated against the file modification
+    time, so a file that is rewritten is read in afresh.  The least recently
+    used tables are evicted once the cache exceeds its memory budget.
+
+    Tables returned from the cache are shared; callers must not modify them.
+    Tables from different extensions of the same file are cached separately.
+    The cache may be used from several threads (e.g., the retention job).
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The memory budget for cached tables (Default: ``DAY_CACHE_MB`` MiB)
+    readonly : bool, optional
+        Never write to the files, even to upgrade legacy files on first read
+        (Default: False)
+    """
+
+    def __init__(self, max_bytes=DAY_CACHE_MB * 2**20, readonly=False):
+        self.max_bytes = max_bytes
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+        self.n_bytes = 0
+        self._tables = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def stats(self):
+        """Summary of the cache performance and contents
+
+        Returns
+        -------
+        dict
+            The number of hits, misses, cached tables and bytes used
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "tables": len(self._tables),
+            "bytes": self.n_bytes,
+        }
+
+    def read(self, path, hdu=None, columns=None):
+        """Return the Table stored at ``path``, reading from disk if needed
+
+        If only some ``columns`` are requested, they are served from the
+        cached full Table if there is one, and otherwise read lazily from the
+        file (see :func:`read_fits_columns`) and cached on their own.
+
+        Parameters
+        ----------
+        path : :obj:`pathlib.Path`
+            The path to the FITS file
+        hdu : str, optional
+            The name of the FITS extension to read (Default: None, the first
+            table extension)
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The Table, or None if the file does not exist
+        """
+        full_key = (path, hdu, None)
+        key = (path, hdu, None if columns is None else tuple(sorted(columns)))
+
+        # Serve a projection from the full Table if it is cached and current
+        with self._lock:
+            if columns is not None and self._is_current(full_key, path):
+                self.hits += 1
+                self._tables.move_to_end(full_key)
+                table = self._tables[full_key][1]
+                return table[project(table, columns)]
+
+        def load():
+            if columns is not None:
+                return read_fits_columns(path, hdu=hdu, columns=columns)
+            table = astropy.table.Table.read(path, hdu=hdu, character_as_bytes=False)
+
+            # Upgrade legacy files (without the ``epoch`` column, or with string
+            #  network columns) on first read, through a temporary file so
+            #  other readers never see a partial file
+            upgraded = add_epoch_column(table) | network.encode_network_columns(table)
+            if upgraded and not self.readonly:
+                tmp_path = path.with_name(f"{path.name}.tmp")
+                table.write(tmp_path, format="fits", overwrite=True)
+                os.replace(tmp_path, path)
+            return table
+
+        return self.fetch(key, path, load)
+
+    def fetch(self, key, path, load):
+        """Return the Table cached under ``key``, loading it if needed
+
+        The cached Table is valid as long as the file at ``path`` has not been
+        modified since it was loaded.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key of the Table
+        path : :obj:`pathlib.Path`
+            The path to the file from which the Table is loaded
+        load : callable
+            Function (of no arguments) returning the Table, or None
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The Table, or None if the file does not exist
+        """
+        with self._lock:
+            # Cache hit if the file has not changed since it was read
+            if self._is_current(key, path):
+                self.hits += 1
+                self._tables.move_to_end(key)
+                return self._tables[key][1]
+
+            self.misses += 1
+            self._discard(key)
+            try:
+                table = load()
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                # The file was removed (e.g., by the retention job)
+                return None
+            if table is None:
+                return None
+            n_bytes = sum(column.nbytes for column in table.itercols())
+            self._tables[key] = (mtime, table, n_bytes)
+            self.n_bytes += n_bytes
+
+            # Evict least recently used tables, but always keep the newest one
+            while self.n_bytes > self.max_bytes and len(self._tables) > 1:
+                self._discard(next(iter(self._tables)))
+            return table
+
+    def _is_current(self, key, path):
+        """Check whether a Table is cached and its file is unchanged
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key of the Table
+        path : :obj:`pathlib.Path`
+            The path to the file from which the Table was loaded
+
+        Returns
+        -------
+        bool
+            Whether the cached Table is current
+        """
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return key in self._tables and self._tables[key][0] == mtime
+
+    def _discard(self, key):
+        """Remove a table from the cache, if present
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key of the table
+        """
+        if key in self._tables:
+            self.n_bytes -= self._tables.pop(key)[2]
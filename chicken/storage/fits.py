@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/fits.py
+
+Storage backend in daily FITS files
+
+"""
+
+# Built-In Libraries
+import datetime
+import os
+
+# 3rd Party Libraries
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import archive
+from chicken import catalog
+from chicken import schema
+from chicken import utils
+from chicken.storage.base import StorageBase, join_tables, project
+from chicken.storage.cache import DAY_CACHE_MB, DayTableCache
+
+# Module Constants
+
+__all__ = ["FitsStorage"]
+
+
+class FitsStorage(StorageBase):
+    """Storage in daily FITS binary tables (``coop_YYYYMMDD.fits``)
+
+    This is the original storage format of the Chicken-Pi.  Range queries
+    read in (through a :obj:`DayTableCache`) every daily file that overlaps
+    the range, as listed in the catalog of stored days (``catalog``, see
+    :mod:`chicken.catalog`), which is updated as each day is written.
+
+    Optionally, daily files older than ``archive_after_days`` are compacted
+    into compressed monthly archives (see :mod:`chicken.archive`); days are
+    read transparently from either.
+
+    Parameters
+    ----------
+    cache_bytes : int, optional
+        The memory budget of the day-table cache (Default: ``DAY_CACHE_MB`` MiB)
+    archive_after_days : int, optional
+        The age (days) after which daily files are archived, or 0 to never
+        archive them (Default: 0)
+    readonly : bool, optional
+        Only read the stored data, for a process other than the one
+        recording it (Default: False)
+    """
+
+    def __init__(
+        self, cache_bytes=DAY_CACHE_MB * 2**20, archive_after_days=0, readonly=False
+    ):
+        self.day_cache = DayTableCache(max_bytes=cache_bytes, readonly=readonly)
+        self.archive_after_days = archive_after_days
+        self.readonly = readonly
+        self.catalog = catalog.DayCatalog(readonly=readonly)
+        if not self.catalog.path.exists():
+            self.catalog.rebuild(self.read_day)
+
+    @staticmethod
+    def day_path(date):
+        """Return the path of the FITS file for a date
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+
+        Returns
+        -------
+        :obj:`pathlib.Path`
+            The path of the daily FITS file
+        """
+        return utils.Paths.data.joinpath(f"coop_{date}.fits")
+
+    def write_day(self, date, table: astropy.table.Table):
+        """Write the table of readings for a day to its FITS file
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        """
+        # Write to a temporary file first, so readers never see a partial file
+        path = self.day_path(date)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        table.write(tmp_path, format="fits", overwrite=True)
+        os.replace(tmp_path, path)
+        self.catalog.add_day(date, table)
+
+    def read_day(self, date, columns=None):
+        """Read the (cached) table of readings for a day
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The shared cached Table (do not modify), or None if no data exist
+        """
+        table = self.day_cache.read(self.day_path(date), columns=columns)
+        if table is not None:
+            return table
+
+        # Fall back to the monthly archive
+        path = archive.archive_path(date)
+        return self.day_cache.fetch(
+            (path, date, None if columns is None else tuple(sorted(columns))),
+            path,
+            lambda: archive.MonthlyArchive(path).read_day(date, columns=columns),
+        )
+
+    def compact(self, date):
+        """Move the daily files older than ``archive_after_days`` to archives
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the current date
+        """
+        if not self.archive_after_days:
+            return
+        before = datetime.datetime.strptime(date, "%Y%m%d") - datetime.timedelta(
+            days=self.archive_after_days
+        )
+        archived = archive.archive_days(before.strftime("%Y%m%d"))
+        self.catalog.set_stored(archived, catalog.STORED_ARCHIVE)
+
+    def read_range(self, start=None, stop=None, columns=None, tail=None):
+        """Read the rows with ``start <= epoch < stop`` from the daily files
+
+        Parameters
+        ----------
+        start : int, optional
+            The first epoch to return (Default: None, from the earliest day)
+        stop : int, optional
+            The epoch at which to stop (Default: None, through the last day)
+        columns : list of str, optional
+            The columns to return (``epoch`` is always included)
+            (Default: None, all columns)
+        tail : :obj:`astropy.table.Table`, optional
+            Rows to add after the stored rows (e.g., the current day's rows
+            from memory), so that the result is assembled in a single copy
+            (Default: None)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rows, sorted by ``epoch``, or None if there are none
+        """
+        # Cull each day to the range before joining, so only wanted rows move
+        pieces = []
+        days = self.catalog.stored_days(start, stop)
+        for date in days:
+            arrays, shared = self._open_day(date, columns)
+            if not arrays or arrays["epoch"].size == 0:
+                continue
+
+            # Sort on the epoch column, only if needed (should already be okay)
+            epoch = arrays["epoch"]
+            if np.any(epoch[1:] < epoch[:-1]):
+                order = np.argsort(epoch, kind="stable")
+                arrays = {name: values[order] for name, values in arrays.items()}
+                epoch = arrays["epoch"]
+                shared = False
+
+            low = 0 if start is None else np.searchsorted(epoch, start, side="left")
+            high = (
+                len(epoch)
+                if stop is None
+                else np.searchsorted(epoch, stop, side="left")
+            )
+            if high > low:
+                pieces.append(
+                    (
+                        {name: values[low:high] for name, values in arrays.items()},
+                        shared,
+                    )
+                )
+        if tail is not None and len(tail):
+            pieces.append(
+                ({name: np.asarray(tail[name]) for name in tail.colnames}, False)
+            )
+        return join_tables(pieces, self._range_schema(days, columns))
+
+    def _range_schema(self, days, columns=None):
+        """Return the union of the registered schemas of some stored days
+
+        Parameters
+        ----------
+        days : list of str
+            The YYYYMMDD strings of the dates
+        columns : list of str, optional
+            The columns to include (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        list of tuple or None
+            The (name, :obj:`numpy.dtype`) pairs, or None if the days share a
+            single schema (or any day's schema is unknown)
+        """
+        versions = {self.catalog.entries[date].get("schema") for date in days}
+        if len(versions) < 2 or None in versions:
+            return None
+        union = schema.schema_registry().union(versions)
+        wanted = project([name for name, _ in union], columns)
+        return [(name, dtype) for name, dtype in union if name in wanted]
+
+    def _open_day(self, date, columns=None):
+        """Open the columns of readings for a day, for :meth:`read_range`
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        arrays : dict or None
+            Dictionary of column name / :obj:`numpy.ndarray` pairs, or None
+            if no data exist
+        shared : bool
+            Whether the arrays are shared (cached), and so must be copied
+            before they are handed to the caller
+        """
+        # Not ``self.read_day``, which subclasses may build on this method
+        table = FitsStorage.read_day(self, date, columns=columns)
+        if table is None:
+            return None, True
+        return {name: np.asarray(table[name]) for name in table.colnames}, True
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/memmap.py
+
+Storage backend in daily FITS files plus memory-mapped column files
+
+"""
+
+# Built-In Libraries
+
+# 3rd Party Libraries
+import astropy.table
+
+# Internal Imports
+from chicken import columnfiles
+from chicken.storage.fits import FitsStorage
+
+# Module Constants
+
+__all__ = ["MemmapStorage"]
+
+
+class MemmapStorage(FitsStorage):
+    """Storage in daily FITS files plus memory-mapped column files
+
+    Alongside each daily FITS file, the day is written as a column file of
+    fixed-width, native-endian blocks (see :mod:`chicken.columnfiles`).  Reads
+    memory-map these files rather than decoding the FITS file: the data are
+    paged in from the page cache (which the kernel shares and reclaims)
+    instead of being copied onto the heap, and only the columns asked for
+    are ever touched.  A query within a single day returns views of the
+    files; a query across days is assembled with a single copy.
+
+    Days without a column file (e.g., recorded before switching backends) are
+    read from their FITS file, and (unless ``readonly``) their column file
+    written for next time; archived days are read from the monthly archives.
+
+    Parameters
+    ----------
+    cache_bytes : int, optional
+        The memory budget of the day-table cache, used for the FITS files
+        (Default: ``DAY_CACHE_MB`` MiB)
+    archive_after_days : int, optional
+        The age (days) after which daily files are archived, or 0 to never
+        archive them (Default: 0)
+    readonly : bool, optional
+        Only read the stored data, for a process other than the one
+        recording it (Default: False)
+    """
+
+    def write_day(self, date, table: astropy.table.Table):
+        """Write the table of readings for a day to its FITS and column files
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        """
+        super().write_day(date, table)
+        if len(table):
+            columnfiles.write_columns(date, table)
+
+    def read_day(self, date, columns=None):
+        """Read the table of readings for a day, memory-mapped if possible
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The readings (do not modify), or None if no data exist
+        """
+        arrays = self._open_day(date, columns)[0]
+        return None if arrays is None else astropy.table.Table(arrays, copy=False)
+
+    def _open_day(self, date, columns=None):
+        """Memory-map the column file for a day, writing it if missing
+
+        A ``readonly`` store reads a day without a column file from its FITS
+        file instead.
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        columns : list of str, optional
+            The columns to read (``epoch`` is always included)
+            (Default: None, all columns)
+
+        Returns
+        -------
+        arrays : dict or None
+            Dictionary of column name / :obj:`numpy.ndarray` pairs, or None
+            if no data exist
+        shared : bool
+            Whether the arrays are shared (cached), and so must be copied
+            before they are handed to the caller
+        """
+        mapped = columnfiles.read_columns(date, columns=columns)
+        if mapped is not None:
+            # Each copy-on-write map is private to this call, so needs no copy
+            return mapped, False
+
+        # Convert a daily FITS file; archived days are read as they are
+        table = self.day_cache.read(self.day_path(date))
+        if not self.readonly and table is not None and len(table):
+            columnfiles.write_columns(date, table)
+            return columnfiles.read_columns(date, columns=columns), False
+        return super()._open_day(date, columns=columns)
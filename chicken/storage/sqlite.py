@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: storage/sqlite.py
+
+Storage backend in a SQLite database, indexed on ``epoch``
+
+"""
+
+# Built-In Libraries
+import functools
+import sqlite3
+import threading
+
+# 3rd Party Libraries
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import archive
+from chicken import network
+from chicken import utils
+from chicken.storage.base import add_epoch_column, join_tables, project
+from chicken.storage.cache import DAY_CACHE_MB
+from chicken.storage.fits import FitsStorage
+
+# Module Constants
+SQLITE_BATCH_ROWS = 15
+SQLITE_FILENAME = "chicken.sqlite3"
+SQLITE_TYPES = {"f": "REAL", "i": "INTEGER", "u": "INTEGER", "b": "BOOLEAN"}
+SQLITE_DTYPES = {"REAL": float, "INTEGER": np.int64, "BOOLEAN": bool, "TEXT": str}
+
+__all__ = ["SQLiteStorage", "column_from_sql", "import_fits_to_sqlite"]
+
+
+class SQLiteStorage(FitsStorage):
+    """Storage in a SQLite database, indexed on ``epoch``
+
+    Every row is inserted into the ``readings`` table of the SQLite database
+    in the data directory as it is recorded, so that arbitrary time ranges
+    (and subsets of columns) are retrieved with a single indexed query.  The
+    ``epoch`` column is the INTEGER PRIMARY KEY (i.e., the rowid), so the
+    rows are stored in time order and range queries are B-tree lookups.
+
+    The database is opened in WAL mode, and inserts are batched into one
+    transaction every ``batch_rows`` rows to limit SD-card writes.  A
+    ``readonly`` store opens the database read-only (or, if there is none
+    yet, an empty in-memory database), so it never creates or alters it.  The
+    daily FITS files are still written (as journal snapshots and for the
+    rollups), so the FITS backend can be switched back to at any time.
+
+    Parameters
+    ----------
+    path : :obj:`pathlib.Path`, optional
+        The path to the SQLite database file (Default: ``SQLITE_FILENAME`` in
+        the data directory)
+    batch_rows : int, optional
+        The number of rows to buffer before committing them
+        (Default: ``SQLITE_BATCH_ROWS``)
+    cache_bytes : int, optional
+        The memory budget of the day-table cache (Default: ``DAY_CACHE_MB`` MiB)
+    archive_after_days : int, optional
+        The age (days) after which daily FITS files are archived, or 0 to
+        never archive them (Default: 0)
+    readonly : bool, optional
+        Only read the stored data, for a process other than the one
+        recording it (Default: False)
+    """
+
+    holds_today = True
+
+    def __init__(
+        self,
+        path=None,
+        batch_rows=SQLITE_BATCH_ROWS,
+        cache_bytes=DAY_CACHE_MB * 2**20,
+        archive_after_days=0,
+        readonly=False,
+    ):
+        super().__init__(
+            cache_bytes=cache_bytes,
+            archive_after_days=archive_after_days,
+            readonly=readonly,
+        )
+        self.path = path or utils.Paths.data.joinpath(SQLITE_FILENAME)
+        self.batch_rows = batch_rows
+        # The connection is shared with the background writer thread
+        self.connection = self._connect()
+        self._lock = threading.RLock()
+
+        # Column name / declared type pairs of the ``readings`` table
+        self.schema = self._read_schema()
+
+        # Rows waiting to be inserted, all sharing the same column names
+        self._pending_names = None
+        self._pending = []
+
+    def _connect(self):
+        """Open the connection to the database
+
+        Returns
+        -------
+        :obj:`sqlite3.Connection`
+            The connection
+        """
+        if self.readonly:
+            if not self.path.exists():
+                return sqlite3.connect(":memory:", check_same_thread=False)
+            return sqlite3.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        # Let deleted pages be returned to the filesystem (new databases only)
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _read_schema(self):
+        """Read the columns of the ``readings`` table
+
+        Returns
+        -------
+        dict
+            Dictionary of column name / declared SQLite type pairs (empty if
+            the table does not yet exist)
+        """
+        return {
+            row[1]: row[2]
+            for row in self.connection.execute("PRAGMA table_info(readings)")
+        }
+
+    def _ensure_columns(self, columns):
+        """Create the ``readings`` table, or add any new columns to it
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of column name / :obj:`numpy.ndarray` pairs
+        """
+        new = {
+            name: (
+                "INTEGER PRIMARY KEY"
+                if name == "epoch"
+                else SQLITE_TYPES.get(np.asarray(values).dtype.kind, "TEXT")
+            )
+            for name, values in columns.items()
+            if name not in self.schema
+        }
+        if not self.schema:
+            definitions = ", ".join(
+                f'"{name}" {sql_type}' for name, sql_type in new.items()
+            )
+            self.connection.execute(f"CREATE TABLE readings ({definitions})")
+        else:
+            for name, sql_type in new.items():
+                self.connection.execute(
+                    f'ALTER TABLE readings ADD COLUMN "{name}" {sql_type}'
+                )
+        self.connection.commit()
+        self.schema = self._read_schema()
+
+    def append(self, columns):
+        """Buffer newly recorded rows, inserting them once a batch is full
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of column name / :obj:`numpy.ndarray` pairs
+        """
+        with self._lock:
+            names = tuple(columns)
+            if names != self._pending_names:
+                self.flush()
+                self._ensure_columns(columns)
+                self._pending_names = names
+            # ``tolist()`` converts to native Python types, as sqlite3 requires
+            self._pending.extend(
+                zip(*[np.asarray(columns[name]).tolist() for name in names])
+            )
+            if len(self._pending) >= self.batch_rows:
+                self.flush()
+
+    def flush(self):
+        """Insert the buffered rows in a single transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            names = ", ".join(f'"{name}"' for name in self._pending_names)
+            marks = ", ".join("?" * len(self._pending_names))
+            with self.connection:
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO readings ({names}) VALUES ({marks})",
+                    self._pending,
+                )
+            self._pending = []
+
+    def write_day(self, date, table: astropy.table.Table):
+        """Write the FITS file for a day, and make sure its rows are indexed
+
+        Rows already in the database are replaced, so this is safe to call
+        for a day whose rows were inserted as they were recorded.
+
+        Parameters
+        ----------
+        date : str
+            The YYYYMMDD string of the date
+        table : :obj:`astropy.table.Table`
+            The readings for the day
+        """
+        # The FITS file is written without holding the lock, so that rows
+        #  appended meanwhile (on the GUI thread) are not held up
+        super().write_day(date, table)
+        with self._lock:
+            self.append({name: np.asarray(table[name]) for name in table.colnames})
+            self.flush()
+
+    def read_range(self, start=None, stop=None, columns=None, tail=None):
+        """Read the rows with ``start <= epoch < stop`` in one indexed query
+
+        Parameters
+        ----------
+        start : int, optional
+            The first epoch to return (Default: None, from the beginning)
+        stop : int, optional
+            The epoch at which to stop (Default: None, through the end)
+        columns : list of str, optional
+            The columns to return (``epoch`` is always included)
+            (Default: None, all columns)
+        tail : :obj:`astropy.table.Table`, optional
+            Rows to add after the stored rows (e.g., the current day's rows
+            from memory), so that the result is assembled in a single copy
+            (Default: None)
+
+        Returns
+        -------
+        :obj:`astropy.table.Table` or None
+            The rows, sorted by ``epoch``, or None if there are none
+        """
+        with self._lock:
+            self.flush()
+            names = project(self.schema, columns)
+            selection = ", ".join(f'"{name}"' for name in names)
+            rows = (
+                self.connection.execute(
+                    f"SELECT {selection} FROM readings "
+                    "WHERE epoch >= ? AND epoch < ? ORDER BY epoch",
+                    (
+                        np.iinfo(np.int64).min if start is None else int(start),
+                        np.iinfo(np.int64).max if stop is None else int(stop),
+                    ),
+                ).fetchall()
+                if self.schema
+                else []
+            )
+
+        # Convert to NumPy arrays
+        pieces = []
+        if rows:
+            pieces.append(
+                (
+                    {
+                        name: column_from_sql(values, self.schema[name])
+                        for name, values in zip(names, zip(*rows))
+                    },
+                    False,
+                )
+            )
+        if tail is not None and len(tail):
+            pieces.append(
+                ({name: np.asarray(tail[name]) for name in tail.colnames}, False)
+            )
+        return join_tables(pieces)
+
+    def prune(self, before):
+        """Delete the rows with ``epoch < before``, a day at a time
+
+        The lock is released between days, so that recording new rows is
+        never held up for long.
+
+        Parameters
+        ----------
+        before : int
+            The first epoch to keep
+
+        Returns
+        -------
+        int
+            The number of bytes reclaimed on disk
+        """
+        n_start = self._disk_bytes()
+        with self._lock:
+            if not self.schema:
+                return 0
+            (oldest,) = self.connection.execute(
+                "SELECT MIN(epoch) FROM readings"
+            ).fetchone()
+        if oldest is None:
+            return 0
+        for stop in range(int(oldest) + 86400, int(before) + 86400, 86400):
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "DELETE FROM readings WHERE epoch < ?", (min(stop, int(before)),)
+                )
+        with self._lock:
+            self.connection.execute("PRAGMA incremental_vacuum")
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return n_start - self._disk_bytes()
+
+    def _disk_bytes(self):
+        """Return the size on disk of the database (and its WAL) files
+
+        Returns
+        -------
+        int
+            The total size (bytes)
+        """
+        return sum(
+            path.stat().st_size
+            for path in [self.path, self.path.with_name(f"{self.path.name}-wal")]
+            if path.exists()
+        )
+
+    def import_fits(self, paths=None):
+        """Import existing daily FITS files into the SQLite database
+
+        Parameters
+        ----------
+        paths : list of :obj:`pathlib.Path`, optional
+            The files to import (Default: None, all ``coop_YYYYMMDD.fits``
+            files and monthly archives in the data directory)
+
+        Returns
+        -------
+        int
+            The number of rows imported
+        """
+        readers = []
+        if paths is None:
+            paths = sorted(utils.Paths.data.glob("coop_????????.fits"))
+            for path in sorted(utils.Paths.data.glob("coop_??????.archive")):
+                monthly = archive.MonthlyArchive(path)
+                readers += [
+                    functools.partial(monthly.read_day, date) for date in monthly.dates
+                ]
+        readers += [
+            functools.partial(astropy.table.Table.read, path, character_as_bytes=False)
+            for path in paths
+        ]
+        n_rows = 0
+        for read_table in readers:
+            table = read_table()
+            add_epoch_column(table)
+            network.encode_network_columns(table)
+            self.append({name: np.asarray(table[name]) for name in table.colnames})
+            n_rows += len(table)
+        self.flush()
+        return n_rows
+
+    def close(self):
+        """Flush any buffered rows and close the database connection"""
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+
+def column_from_sql(values, sql_type):
+    """Convert a column of values from SQLite into a NumPy array
+
+    NULL values become NaN in ``REAL`` columns.  In other columns (which
+    hold NULL for rows stored before the column was added) they are masked.
+
+    Parameters
+    ----------
+    values : tuple
+        The values of the column
+    sql_type : str
+        The declared type of the column
+
+    Returns
+    -------
+    :obj:`numpy.ndarray` or :obj:`numpy.ma.MaskedArray`
+        The column
+    """
+    dtype = SQLITE_DTYPES[sql_type]
+    if sql_type == "REAL" or None not in values:
+        return np.array(values, dtype=dtype)
+    fill = "" if dtype is str else 0
+    return np.ma.MaskedArray(
+        np.array([fill if value is None else value for value in values], dtype=dtype),
+        mask=[value is None for value in values],
+    )
+
+
+def import_fits_to_sqlite():
+    """Import all existing daily FITS files into the SQLite database
+
+    Run as ``python -m chicken.storage`` before switching the ``backend`` to
+    ``sqlite`` in ``config.yaml``.
+    """
+    storage = SQLiteStorage()
+    n_rows = storage.import_fits()
+    storage.close()
+    print(f"Imported {n_rows} rows into {storage.path}")
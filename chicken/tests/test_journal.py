@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: tests/test_journal.py
+
+Tests of the write-ahead journal of the Chicken-Pi database
+
+"""
+
+# Built-In Libraries
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import journal
+
+# Module Constants
+NAMES = ["epoch", "inside_temp", "outlet_1", "wifi_status"]
+DTYPES = [np.int64, np.float64, bool, object]
+
+
+def make_journal(path):
+    """Open a journal with a typical record dtype"""
+    return journal.Journal(
+        path, journal.record_dtype(NAMES, DTYPES), fsync_interval=3600
+    )
+
+
+def make_row(epoch):
+    """Return a database row for a given epoch"""
+    return {
+        "epoch": epoch,
+        "inside_temp": 60.0 + epoch % 10,
+        "outlet_1": bool(epoch % 2),
+        "wifi_status": "ON",
+    }
+
+
+def test_replay(tmp_path):
+    """Appended rows are replayed in order"""
+    path = tmp_path / "coop_20260101.journal"
+    day_journal = make_journal(path)
+    for epoch in range(5):
+        day_journal.append(make_row(epoch))
+    day_journal.close()
+
+    columns, dtype = journal.read_journal(path)
+    assert dtype.names == tuple(NAMES)
+    np.testing.assert_array_equal(columns["epoch"], np.arange(5))
+    np.testing.assert_array_equal(columns["inside_temp"], 60.0 + np.arange(5))
+    assert list(columns["wifi_status"]) == ["ON"] * 5
+
+
+def test_truncate_then_append(tmp_path):
+    """Rows appended after a truncation follow the header, with no gap"""
+    path = tmp_path / "coop_20260101.journal"
+    day_journal = make_journal(path)
+    for epoch in range(5):
+        day_journal.append(make_row(epoch))
+    day_journal.truncate()
+    day_journal.append(make_row(1792199400))
+    day_journal.close()
+
+    columns, _ = journal.read_journal(path)
+    np.testing.assert_array_equal(columns["epoch"], [1792199400])
+
+    # Likewise for a journal reopened (appended to) after a restart
+    day_journal = make_journal(path)
+    day_journal.truncate()
+    day_journal.append(make_row(1792199460))
+    day_journal.close()
+
+    columns, _ = journal.read_journal(path)
+    np.testing.assert_array_equal(columns["epoch"], [1792199460])
+
+
+def test_partial_record(tmp_path):
+    """A record torn by a power cut is dropped when the journal is reopened"""
+    path = tmp_path / "coop_20260101.journal"
+    day_journal = make_journal(path)
+    for epoch in range(3):
+        day_journal.append(make_row(epoch))
+    day_journal.close()
+    with open(path, "ab") as file_object:
+        file_object.write(b"\x01\x02\x03")
+
+    day_journal = make_journal(path)
+    day_journal.append(make_row(3))
+    day_journal.close()
+
+    columns, _ = journal.read_journal(path)
+    np.testing.assert_array_equal(columns["epoch"], np.arange(4))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: tests/test_rollup.py
+
+Tests of the downsampled (rollup) statistics of the Chicken-Pi database
+
+"""
+
+# Built-In Libraries
+
+# 3rd Party Libraries
+import astropy.table
+import numpy as np
+
+# Internal Imports
+from chicken import rollup
+
+
+def write_rollup(path):
+    """Write the rollups for a day of readings, one per minute"""
+    epoch = np.arange(0, 86400, 60, dtype=np.int64)
+    table = astropy.table.Table(
+        {
+            "epoch": epoch,
+            "inside_temp": 60.0 + np.sin(epoch / 3600),
+            "outlet_1": epoch % 7200 < 3600,
+        }
+    )
+    rollup.RollupSet.from_table(table).write(path)
+
+
+def test_complete(tmp_path):
+    """A freshly written rollup file is complete"""
+    path = tmp_path / "coop_20240101_rollup.fits"
+    write_rollup(path)
+    assert rollup.is_complete(path)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_truncated(tmp_path):
+    """A rollup file cut short anywhere is not complete"""
+    path = tmp_path / "coop_20240101_rollup.fits"
+    write_rollup(path)
+    data = path.read_bytes()
+    for size in (0, 2880, len(data) // 2, len(data) - 2880):
+        path.write_bytes(data[:size])
+        assert not rollup.is_complete(path)
+
+
+def test_missing(tmp_path):
+    """A missing rollup file is not complete"""
+    assert not rollup.is_complete(tmp_path / "coop_20240101_rollup.fits")
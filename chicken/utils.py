@@ -9,6 +9,7 @@ Utility functions
 """
 
 # Built-In Libraries
+import functools
 import os
 import pathlib
 
@@ -45,21 +46,58 @@ def load_yaml_config():
         return yaml.safe_load(stream)
 
 
+@functools.lru_cache(maxsize=None)
+def get_system_info():
+    """Return the identification of the host system
+
+    The system does not change while the program runs, so this is computed
+    once and shared.  :func:`os.uname` is a system call (unlike
+    :func:`platform.uname` on older Pythons, it never runs a subprocess).
+
+    Returns
+    -------
+    :obj:`os.uname_result`
+        The ``sysname``, ``nodename``, ``release``, ``version`` and
+        ``machine`` of the host
+    """
+    return os.uname()
+
+
 def get_system_type():
-    """get_system_type _summary_
+    """Return the operating system name of the host
 
-    _extended_summary_
+    Enables testing on both Raspberry Pi and Mac.
 
     Returns
     -------
-    _type_
-        _description_
+    str
+        The operating system name, as from ``uname`` (e.g., ``Linux`` or
+        ``Darwin``)
+    """
+    return get_system_info().sysname
+
+
+def sensor_columns(name, sensor):
+    """Return the database columns recorded for a sensor
+
+    Parameters
+    ----------
+    name : str
+        The name of the sensor (key in the ``sensors`` dictionary)
+    sensor : object
+        The sensor object
+
+    Returns
+    -------
+    dict
+        Dictionary of quantity / column name pairs
     """
-    # Enable testing on both Raspberry Pi and Mac
-    if os.path.exists("/usr/bin/uname"):
-        uname = "/usr/bin/uname"
-    elif os.path.exists("/bin/uname"):
-        uname = "/bin/uname"
-    else:
-        uname = ""
-    return (os.popen(f"{uname} -a").read()).split()[0]
+    # Temp/humid sensors (real or dummy) cache a humidity, the others don't;
+    #  `data_entry` is not used, since for some sensors it takes a reading
+    if hasattr(sensor, "cache_humid"):
+        return {"temp": f"{name}_temp", "humid": f"{name}_humid"}
+    if name == "light":
+        return {"lux": f"{name}_lux"}
+    if name == "cpu":
+        return {"temp": f"{name}_temp"}
+    return {}
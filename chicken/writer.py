@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: chicken
+    FILE: writer.py
+
+Background thread for the slow disk writes of the Chicken-Pi database
+
+"""
+
+# Built-In Libraries
+import concurrent.futures
+import logging
+import queue
+import threading
+
+# 3rd Party Libraries
+
+# Internal Imports
+
+
+# Module Constants
+WRITER_QUEUE_SIZE = 4
+
+__all__ = ["BackgroundWriter"]
+
+
+class BackgroundWriter:
+    """Dedicated thread for writing completed data to disk
+
+    Writing out a day's FITS file and rollups takes long enough to freeze the
+    GUI if done on the Tk event loop.  Instead, each write is submitted to
+    this writer as a job, and run in order on a dedicated thread.  The queue
+    of jobs is bounded, so that a stalled disk applies back-pressure rather
+    than piling up copies of the data in memory.
+
+    The thread is a daemon thread (non-daemon threads are joined *before*
+    ``atexit`` handlers run), so :meth:`close` must be called at exit to make
+    sure all pending jobs have been written.
+
+    Each submitted job returns a :obj:`concurrent.futures.Future`, so that a
+    reader can wait for one particular write (e.g., the day table it needs)
+    without waiting for every slower job queued behind it.
+
+    Parameters
+    ----------
+    logger : :obj:`logging.Logger`
+        The logging object into which to place logs
+    max_pending : int, optional
+        The maximum number of jobs waiting in the queue; :meth:`submit`
+        blocks while the queue is full  (Default: ``WRITER_QUEUE_SIZE``)
+    """
+
+    def __init__(self, logger: logging.Logger, max_pending=WRITER_QUEUE_SIZE):
+        self.logger = logger
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(
+            target=self._run, name="chicken-writer", daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def pending(self):
+        """The number of jobs submitted but not yet completed
+
+        Returns
+        -------
+        int
+            The number of pending jobs
+        """
+        return self.queue.unfinished_tasks
+
+    def submit(self, func, *args, **kwargs):
+        """Submit a job to be run on the writer thread
+
+        Parameters
+        ----------
+        func : callable
+            The function to run
+        *args, **kwargs
+            The arguments to pass to ``func``
+
+        Returns
+        -------
+        :obj:`concurrent.futures.Future`
+            Completed (with the return value of ``func``, or None if it threw
+            an exception) once the job has run
+        """
+        future = concurrent.futures.Future()
+        if not self.thread.is_alive():
+            # Run synchronously if the writer has been closed
+            future.set_result(self._call(func, args, kwargs))
+            return future
+        self.queue.put((func, args, kwargs, future))
+        return future
+
+    def flush(self):
+        """Block until every submitted job has been completed"""
+        self.queue.join()
+
+    def close(self):
+        """Complete every submitted job, then stop the writer thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def _run(self):
+        """Run the submitted jobs, in order, until told to stop"""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                func, args, kwargs, future = job
+                future.set_result(self._call(func, args, kwargs))
+            finally:
+                self.queue.task_done()
+
+    def _call(self, func, args, kwargs):
+        """Run a single job, logging (rather than raising) any error
+
+        Parameters
+        ----------
+        func : callable
+            The function to run
+        args : tuple
+            The positional arguments to pass to ``func``
+        kwargs : dict
+            The keyword arguments to pass to ``func``
+
+        Returns
+        -------
+        object
+            The return value of ``func`` (None if it threw an exception)
+        """
+        try:
+            return func(*args, **kwargs)
+        # An error must not stop the thread, or every later write is lost
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.logger.error(
+                "While writing to disk, the background writer threw exception: %s %s",
+                error,
+                error.__class__.__name__,
+            )
+            return None
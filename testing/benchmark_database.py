@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: testing
+    FILE: benchmark_database.py
+
+Benchmark the per-append latency of ``ChickenDatabase.add_row_to_table``
+across a full simulated day, using the dummy devices and a scratch data
+directory (the real ``chicken/data`` is not touched).
+
+Usage:
+    python testing/benchmark_database.py
+
+"""
+
+# Built-In Libraries
+import datetime
+import logging
+import pathlib
+import tempfile
+import time
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import database
+from chicken import dummy
+from chicken import utils
+from chicken.network import NetworkStatus
+
+
+def simulate_day(db, sensors, relays, net, day=None):
+    """Append one day of readings, timing each append
+
+    Parameters
+    ----------
+    db : :obj:`chicken.database.ChickenDatabase`
+        The database under test
+    sensors : dict
+        The (dummy) sensor objects
+    relays : :obj:`chicken.dummy.Relay`
+        The (dummy) relay object
+    net : :obj:`chicken.network.NetworkStatus`
+        The network status object
+    day : :obj:`datetime.date`, optional
+        The day to simulate (Default: None, today)
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        Latency of each append (seconds)
+    """
+    start = datetime.datetime.combine(day or datetime.date.today(), datetime.time())
+    latency = np.empty(database.ROWS_PER_DAY)
+    for i in range(database.ROWS_PER_DAY):
+        nowobj = start + datetime.timedelta(seconds=i * database.SAMPLE_CADENCE_SECONDS)
+        t_0 = time.perf_counter()
+        db.add_row_to_table(nowobj, sensors, relays, net)
+        latency[i] = time.perf_counter() - t_0
+    return latency
+
+
+def main():
+    """Run the benchmark and print latency by hour of the simulated day"""
+    logger = logging.getLogger("benchmark")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        utils.Paths.data = pathlib.Path(tmpdir)
+        sensors, _ = dummy.set_up_sensors()
+        relays = dummy.Relay()
+        db = database.ChickenDatabase(logger, sensors, relays)
+        latency = simulate_day(db, sensors, relays, NetworkStatus(logger))
+
+    per_hour = latency.reshape(24, -1) * 1e6
+    print(f"{'Hour':>4s} {'Median (us)':>12s} {'Max (us)':>10s}")
+    for hour, values in enumerate(per_hour):
+        print(f"{hour:4d} {np.median(values):12.1f} {values.max():10.1f}")
+    print(
+        f"Last hour / first hour median ratio: "
+        f"{np.median(per_hour[-1]) / np.median(per_hour[0]):.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: testing
+    FILE: benchmark_readpath.py
+
+Benchmark the resident memory and latency of a 7-day historical query for
+the ``fits`` and ``memmap`` storage backends, using the dummy devices and a
+scratch data directory (the real ``chicken/data`` is not touched).
+
+Each backend is measured in a fresh Python process, so that neither sees the
+other's caches or heap.
+
+Usage:
+    python testing/benchmark_readpath.py
+
+"""
+
+# Built-In Libraries
+import datetime
+import logging
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken import database
+from chicken import dummy
+from chicken import utils
+from chicken.network import NetworkStatus
+
+# Module Constants
+BACKENDS = ["fits", "memmap"]
+LOOKBACK_DAYS = 7
+N_REPEATS = 20
+
+
+def rss_mib():
+    """Return the current resident set size of this process
+
+    Returns
+    -------
+    float
+        The resident set size (MiB)
+    """
+    with open("/proc/self/statm", "r", encoding="utf-8") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def make_data(data_dir):
+    """Record ``LOOKBACK_DAYS + 1`` days of minute readings, ending at midnight
+
+    The ``memmap`` backend writes both the daily FITS files and the column
+    files, so the same directory serves both backends.
+
+    Parameters
+    ----------
+    data_dir : :obj:`pathlib.Path`
+        The scratch data directory
+    """
+    logger = logging.getLogger("benchmark")
+    utils.Paths.data = data_dir
+    sensors, _ = dummy.set_up_sensors()
+    relays = dummy.Relay()
+    net = NetworkStatus(logger)
+    db = database.ChickenDatabase(
+        logger, sensors, relays, {"database": {"backend": "memmap"}}
+    )
+    stop = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    nowobj = stop - datetime.timedelta(days=LOOKBACK_DAYS + 1)
+    while nowobj < stop:
+        db.add_row_to_table(nowobj, sensors, relays, net)
+        nowobj += datetime.timedelta(seconds=database.SAMPLE_CADENCE_SECONDS)
+    db.close()
+
+
+def measure(data_dir, backend):
+    """Time repeated 7-day queries and report the memory they take
+
+    Parameters
+    ----------
+    data_dir : :obj:`pathlib.Path`
+        The scratch data directory
+    backend : str
+        The storage backend to query
+    """
+    logger = logging.getLogger("benchmark")
+    utils.Paths.data = data_dir
+    sensors, _ = dummy.set_up_sensors()
+    relays = dummy.Relay()
+    db = database.ChickenDatabase(
+        logger, sensors, relays, {"database": {"backend": backend}}
+    )
+    rss_start = rss_mib()
+
+    t_0 = time.perf_counter()
+    _, table = db.retrieve_historical(LOOKBACK_DAYS)
+    first = time.perf_counter() - t_0
+    rss_first = rss_mib()
+
+    latency = np.empty(N_REPEATS)
+    for i in range(N_REPEATS):
+        t_0 = time.perf_counter()
+        _, table = db.retrieve_historical(LOOKBACK_DAYS)
+        latency[i] = time.perf_counter() - t_0
+    rss_after = rss_mib()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{backend:>8s} {len(table):6d} {first * 1e3:10.1f} "
+        f"{np.median(latency) * 1e3:11.1f} {rss_first - rss_start:10.1f} "
+        f"{rss_after - rss_start:10.1f} {peak:9.1f}"
+    )
+    db.close()
+
+
+def main():
+    """Build the scratch data, then measure each backend in a subprocess"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        make_data(pathlib.Path(tmpdir))
+        print(
+            f"{'Backend':>8s} {'Rows':>6s} {'First (ms)':>10s} {'Median (ms)':>11s} "
+            f"{'dRSS1 (MiB)':>10s} {'dRSS (MiB)':>10s} {'Peak (MiB)':>9s}"
+        )
+        for backend in BACKENDS:
+            subprocess.run(
+                [sys.executable, __file__, tmpdir, backend],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(pathlib.Path(sys.argv[1]), sys.argv[2])
+    else:
+        main()
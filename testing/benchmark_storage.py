@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: testing
+    FILE: benchmark_storage.py
+
+Benchmark suite for the Chicken-Pi storage layer, runnable headless with the
+dummy devices and a scratch data directory (the real ``chicken/data`` is not
+touched).  It measures:
+
+    * ``add_row_to_table`` per-append latency across a full simulated day
+    * ``write_table_to_fits`` time for the full day
+    * ``retrieve_historical`` latency for lookbacks of 1-7, 90 and 365 days
+    * peak resident memory (RSS)
+
+Past days are synthesized from the simulated day (shifted in time, with
+noise added to the sensor readings) and written through the storage backend,
+so that the long lookbacks read realistic files.  The results are emitted as
+JSON, so runs of different versions (e.g., on the actual Pi) can be compared.
+
+Usage:
+    python testing/benchmark_storage.py [--backend fits] [--days 365]
+        [--repeats 5] [--output results.json]
+
+"""
+
+# Built-In Libraries
+import argparse
+import datetime
+import json
+import logging
+import pathlib
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from benchmark_database import simulate_day  # Sibling script in ``testing``
+from chicken import database
+from chicken import dummy
+from chicken import utils
+from chicken.network import NetworkStatus
+
+# Module Constants
+LOOKBACKS = [1, 2, 3, 4, 5, 6, 7, 90, 365]
+NOISY_COLUMNS = ("temp", "humid", "lux")
+
+
+def peak_rss_mib():
+    """Return the peak resident set size of this process so far
+
+    Returns
+    -------
+    float
+        The peak resident set size (MiB)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes, macOS bytes
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def summarize(seconds):
+    """Summarize a set of timings
+
+    Parameters
+    ----------
+    seconds : array_like
+        The timings (seconds)
+
+    Returns
+    -------
+    dict
+        The count, median, 95th and 99th percentiles, and maximum (ms)
+    """
+    msec = np.asarray(seconds) * 1e3
+    return {
+        "n": int(msec.size),
+        "median_ms": float(np.median(msec)),
+        "p95_ms": float(np.percentile(msec, 95)),
+        "p99_ms": float(np.percentile(msec, 99)),
+        "max_ms": float(msec.max()),
+    }
+
+
+def synthesize_days(db, template, n_days, rng):
+    """Write ``n_days`` past days of readings, derived from a template day
+
+    Parameters
+    ----------
+    db : :obj:`chicken.database.ChickenDatabase`
+        The database under test
+    template : :obj:`astropy.table.Table`
+        The readings for the current (simulated) day
+    n_days : int
+        The number of days before the current day to write
+    rng : :obj:`numpy.random.Generator`
+        The random number generator for the noise
+    """
+    today = db.date
+    for offset in range(1, n_days + 1):
+        day = today - datetime.timedelta(days=offset)
+        table = template.copy()
+        table["epoch"] -= offset * 86400
+        table["date"] = day.strftime("%Y-%m-%d")
+        for name in table.colnames:
+            if table[name].dtype.kind == "f" and any(
+                key in name for key in NOISY_COLUMNS
+            ):
+                table[name] += rng.normal(0, 0.5, len(table)).astype(table[name].dtype)
+        db.storage.write_day(day.strftime("%Y%m%d"), table)
+
+
+def time_retrieval(db, lookback, repeats):
+    """Time ``retrieve_historical`` for a lookback
+
+    Parameters
+    ----------
+    db : :obj:`chicken.database.ChickenDatabase`
+        The database under test
+    lookback : int
+        Number of days to look back
+    repeats : int
+        The number of repeated (warm) queries to time
+
+    Returns
+    -------
+    dict
+        The number of rows, the first (cold) query time and the summary of
+        the repeated query times
+    """
+    t_0 = time.perf_counter()
+    _, table = db.retrieve_historical(lookback)
+    first = time.perf_counter() - t_0
+    latency = []
+    for _ in range(repeats):
+        t_0 = time.perf_counter()
+        db.retrieve_historical(lookback)
+        latency.append(time.perf_counter() - t_0)
+    return {
+        "rows": len(table),
+        "first_ms": first * 1e3,
+        **summarize(latency),
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def run(backend="fits", n_days=max(LOOKBACKS), repeats=5, seed=0):
+    """Run the benchmark suite
+
+    Parameters
+    ----------
+    backend : str, optional
+        The storage backend to benchmark (Default: ``fits``)
+    n_days : int, optional
+        The number of past days to synthesize (Default: the longest lookback)
+    repeats : int, optional
+        The number of repeated queries per lookback (Default: 5)
+    seed : int, optional
+        Seed for the synthetic noise (Default: 0)
+
+    Returns
+    -------
+    dict
+        The results, ready to be dumped as JSON
+    """
+    logger = logging.getLogger("benchmark")
+    results = {
+        "meta": {
+            "backend": backend,
+            "days": n_days,
+            "repeats": repeats,
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        }
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        utils.Paths.data = pathlib.Path(tmpdir)
+        sensors, _ = dummy.set_up_sensors()
+        relays = dummy.Relay()
+        db = database.ChickenDatabase(
+            logger, sensors, relays, {"database": {"backend": backend}}
+        )
+        latency = simulate_day(
+            db, sensors, relays, NetworkStatus(logger), datetime.date.today()
+        )
+        per_hour = np.median(latency.reshape(24, -1), axis=1) * 1e6
+        results["add_row_to_table"] = {
+            **summarize(latency),
+            "first_hour_median_us": float(per_hour[0]),
+            "last_hour_median_us": float(per_hour[-1]),
+            "peak_rss_mib": peak_rss_mib(),
+        }
+
+        t_0 = time.perf_counter()
+        db.write_table_to_fits()
+        db.writer.flush()
+        results["write_table_to_fits"] = {
+            "rows": len(db.table),
+            "ms": (time.perf_counter() - t_0) * 1e3,
+        }
+
+        t_0 = time.perf_counter()
+        synthesize_days(db, db.table, n_days, np.random.default_rng(seed))
+        results["synthesize_seconds"] = time.perf_counter() - t_0
+
+        results["retrieve_historical"] = {
+            str(lookback): time_retrieval(db, lookback, repeats)
+            for lookback in LOOKBACKS
+            if lookback <= n_days + 1
+        }
+        db.close()
+    results["peak_rss_mib"] = peak_rss_mib()
+    return results
+
+
+def main():
+    """Parse the command line, run the suite and emit the JSON results"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Chicken-Pi storage layer"
+    )
+    parser.add_argument(
+        "--backend", default="fits", help="Storage backend (Default: fits)"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=max(LOOKBACKS),
+        help=f"Number of past days to synthesize (Default: {max(LOOKBACKS)})",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="Repeated queries per lookback (Default: 5)",
+    )
+    parser.add_argument(
+        "--output", help="File for the JSON results (Default: standard output)"
+    )
+    args = parser.parse_args()
+
+    results = run(backend=args.backend, n_days=args.days, repeats=args.repeats)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
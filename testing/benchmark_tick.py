@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+    MODULE: testing
+    FILE: benchmark_tick.py
+
+Benchmark the latency of the sensor access in each 0.5-second GUI tick,
+before and after moving the sensor reads to background acquisition threads.
+
+The Tk windows are not created (so this runs headless); instead each tick
+performs the sensor accesses that ``ControlWindow.update`` makes through the
+``StatusWindow`` and the outlet controls.  The sensors are simulated, with a
+fixed time per I2C transaction and an occasional hung read.
+
+    * inline: the tick reads the sensors itself, at the intervals the GUI
+      used to (CPU every 15 s; temp/humid and light every 60 s; the coop
+      temperature for each outlet at the top of the minute)
+    * snapshot: the sensors are polled by an :obj:`AcquisitionService`, and
+      the tick reads only the latest values from its snapshot
+
+Usage:
+    python testing/benchmark_tick.py [--minutes 10]
+
+"""
+
+# Built-In Libraries
+import argparse
+import logging
+import random
+import time
+
+# 3rd Party Libraries
+import numpy as np
+
+# Internal Imports
+from chicken.acquire import AcquisitionService
+
+# Module Constants
+I2C_SECONDS = 0.015
+LUX_SECONDS = 0.110
+HANG_SECONDS = 1.0
+HANG_PROBABILITY = 0.01
+TICK_SECONDS = 0.5
+
+
+class SlowTH:
+    """Simulated temp/humid sensor, taking ``I2C_SECONDS`` per reading"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.cache_temp = self.cache_humid = -99
+        self.data_entry = (self.cache_temp, self.cache_humid)
+
+    def _read(self, value):
+        hang = self.rng.random() < HANG_PROBABILITY
+        time.sleep(HANG_SECONDS if hang else I2C_SECONDS)
+        return value
+
+    @property
+    def temp(self):
+        """Temperature reading"""
+        return self._read(70.0)
+
+    @property
+    def humid(self):
+        """Humidity reading"""
+        return self._read(40.0)
+
+
+class SlowLux(SlowTH):
+    """Simulated light sensor, taking ``LUX_SECONDS`` per reading"""
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.data_entry = -999
+
+    @property
+    def level(self):
+        """Light level reading"""
+        time.sleep(LUX_SECONDS)
+        return 1000.0
+
+
+class FileCPU:
+    """Simulated CPU temperature, read from a (fast) system file"""
+
+    data_entry = -99
+
+    @property
+    def temp(self):
+        """CPU temperature reading"""
+        return 120.0
+
+
+def make_sensors(seed=0):
+    """Create the simulated sensors
+
+    Parameters
+    ----------
+    seed : int, optional
+        Seed for the hung-read simulation (Default: 0)
+
+    Returns
+    -------
+    dict
+        Dictionary containing the sensor objects
+    """
+    rng = random.Random(seed)
+    return {
+        "box": SlowTH(rng),
+        "inside": SlowTH(rng),
+        "outside": SlowTH(rng),
+        "light": SlowLux(rng),
+        "cpu": FileCPU(),
+    }
+
+
+def inline_tick(sensors, second):
+    """The sensor accesses of one tick, reading the sensors directly
+
+    Parameters
+    ----------
+    sensors : dict
+        Dictionary containing the sensor objects
+    second : int
+        The second of the minute
+    """
+    if second % 15 == 0:
+        _ = sensors["cpu"].temp
+    if second % 60 == 0:
+        for name in ["inside", "outside", "box"]:
+            _ = (sensors[name].temp, sensors[name].humid)
+        _ = sensors["light"].level
+        # Each outlet's demand read the coop temperature
+        for _ in range(4):
+            _ = sensors["inside"].temp
+
+
+def snapshot_tick(acquisition, second):
+    """The sensor accesses of one tick, reading the acquisition snapshot
+
+    Parameters
+    ----------
+    acquisition : :obj:`chicken.acquire.AcquisitionService`
+        The (running) acquisition service
+    second : int
+        The second of the minute
+    """
+    snapshot = acquisition.snapshot
+    if second % 15 == 0:
+        for name, quantities in [
+            ("cpu", ["temp"]),
+            ("inside", ["temp", "humid"]),
+            ("outside", ["temp", "humid"]),
+            ("box", ["temp", "humid"]),
+            ("light", ["lux"]),
+        ]:
+            if not acquisition.is_stale(name):
+                _ = [snapshot.value(name, quantity) for quantity in quantities]
+    if second % 60 == 0:
+        for _ in range(4):
+            _ = snapshot.value("inside", "temp")
+
+
+def run(mode, minutes):
+    """Time every tick for a number of (compressed) minutes
+
+    Ticks are not spaced out in real time; the simulated clock advances by
+    ``TICK_SECONDS`` per tick.
+
+    Parameters
+    ----------
+    mode : str
+        ``inline`` or ``snapshot``
+    minutes : int
+        The number of simulated minutes
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        The latency of each tick (seconds)
+    """
+    sensors = make_sensors()
+    acquisition = None
+    if mode == "snapshot":
+        acquisition = AcquisitionService(
+            sensors, logging.getLogger("benchmark"), {"cpu": 0.5}
+        )
+        acquisition.start()
+        time.sleep(0.5)
+    n_ticks = int(minutes * 60 / TICK_SECONDS)
+    latency = np.empty(n_ticks)
+    for i in range(n_ticks):
+        second = int(i * TICK_SECONDS) % 60
+        t_0 = time.perf_counter()
+        if acquisition is None:
+            inline_tick(sensors, second)
+        else:
+            snapshot_tick(acquisition, second)
+        latency[i] = time.perf_counter() - t_0
+        if acquisition is not None:
+            # Give the polling threads the (compressed) time between ticks
+            time.sleep(0.002)
+    if acquisition is not None:
+        acquisition.stop()
+    return latency
+
+
+def main():
+    """Measure and print the tick latency for both modes"""
+    parser = argparse.ArgumentParser(description="Benchmark the GUI tick latency")
+    parser.add_argument(
+        "--minutes",
+        type=int,
+        default=10,
+        help="Number of simulated minutes (Default: 10)",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'Mode':>8s} {'Ticks':>6s} {'Median (us)':>11s} {'p99 (ms)':>9s} "
+        f"{'Max (ms)':>9s} {'>100 ms':>7s}"
+    )
+    for mode in ["inline", "snapshot"]:
+        latency = run(mode, args.minutes)
+        print(
+            f"{mode:>8s} {latency.size:6d} {np.median(latency) * 1e6:11.1f} "
+            f"{np.percentile(latency, 99) * 1e3:9.2f} {latency.max() * 1e3:9.2f} "
+            f"{int((latency > 0.1).sum()):7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()